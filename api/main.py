@@ -1,11 +1,13 @@
-from typing import AsyncGenerator
+from datetime import date
+from typing import AsyncGenerator, AsyncIterator
 import sys
 from pathlib import Path
 
-from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
+from redis.asyncio import Redis
 from sqladmin import Admin
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,6 +16,15 @@ sys.path.insert(0, str(project_root))
 
 from app.config_data.config import load_config
 from app.database.engine import get_engine, get_session_pool
+from app.database.replicas import get_routing_session_pool, replica_router
+from app.services.admin.bookings_export import (
+    EXPORT_FORMATS,
+    ExportError,
+    export_filename,
+    stream_bookings_export,
+    validate_export,
+)
+from app.utils.metrics import metrics
 from api.auth import get_auth_backend
 from api.model_views import (
     UserAdmin,
@@ -30,10 +41,18 @@ from api.model_views import (
 
 config = load_config()
 
-engine = get_engine(db_url=config.db.url, echo=False)
+engine = get_engine(db_url=config.db.url, echo=False, name="api")
+
+metrics.configure(redis=Redis(host=config.redis.host, port=config.redis.port))
 
 session_pool = get_session_pool(engine)
 
+if config.db.replica_urls:
+    # sqladmin list pages and the exports read from the replicas
+    replica_router.configure(
+        [get_engine(db_url=url, echo=False, name="api-replica") for url in config.db.replica_urls],
+        window=config.db.read_your_writes_window)
+
 app = FastAPI()
 
 app.add_middleware(SessionMiddleware, secret_key=config.sqladmin.secret_key)
@@ -42,7 +61,7 @@ templates = Jinja2Templates(directory=project_root / "api" / "templates")
 
 auth_backend = get_auth_backend(secret_key=config.sqladmin.secret_key)
 
-admin = Admin(app, engine, authentication_backend=auth_backend)
+admin = Admin(app, engine, session_maker=get_routing_session_pool(engine), authentication_backend=auth_backend)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -77,6 +96,39 @@ async def login(request: Request):
     return templates.TemplateResponse("error.html", {"request": request, "message": "Invalid credentials"}, status_code=401)
 
 
+@app.get("/metrics")
+async def read_metrics():
+    """Metrics of the bot and API processes in the Prometheus text format."""
+    await metrics.flush()
+    return PlainTextResponse(await metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/export/bookings")
+async def export_bookings(request: Request, start_date: date, end_date: date, format: str = "csv"):
+    """
+    Streams the bookings between start_date and end_date (inclusive) as CSV or NDJSON,
+    e.g. /export/bookings?start_date=2024-01-01&end_date=2024-12-31&format=ndjson. Requires the admin login.
+    """
+    authenticated = await auth_backend.authenticate(request)
+    if authenticated is not True:
+        return authenticated
+    try:
+        validate_export(start_date, end_date, format)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The session is opened by the response body itself, so it stays open while the rows are streamed
+    async def content() -> AsyncIterator[bytes]:
+        async with replica_router.read_session_pool(session_pool)() as session:
+            async for chunk in stream_bookings_export(session, start_date, end_date, format):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(start_date, end_date, format)}"'})
+
+
 @app.post("/logout")
 async def logout(request: Request):
     await auth_backend.logout(request)
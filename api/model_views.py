@@ -2,6 +2,7 @@ from sqladmin import ModelView
 from wtforms import DateTimeField # type: ignore
 from wtforms.validators import Optional # type: ignore
 from datetime import datetime
+from app.config_data.config import load_config
 from app.database.models import (
     User,
     UserRoleAssignment,
@@ -13,6 +14,10 @@ from app.database.models import (
     DeskAssignment,
     Booking,
 )
+from app.database.orm_queries import orm_record_booking_cancellations, orm_record_booking_change
+
+
+config = load_config()
 
 
 class UserAdmin(ModelView, model=User):
@@ -383,4 +388,24 @@ class BookingAdmin(ModelView, model=Booking):
         Booking.updated_at,
     ]
     
-    column_default_sort = "telegram_id"
\ No newline at end of file
+    column_default_sort = "telegram_id"
+
+
+    async def on_model_change(self, data, model, is_created, request) -> None:
+        """Remembers the key of the edited booking before the edit."""
+        if not is_created:
+            request.state.previous_booking = (model.date, model.desk_id, model.telegram_id)
+
+
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        """Counts the created or moved booking in booking_daily_stats, like the bot's booking writes do."""
+        previous = None if is_created else request.state.previous_booking
+        async with self.session_maker() as session:
+            await orm_record_booking_change(session, model, previous, config.bot_operation.timezone)
+
+
+    async def after_model_delete(self, model, request) -> None:
+        """Counts the deleted booking as a cancellation in booking_daily_stats."""
+        async with self.session_maker() as session:
+            await orm_record_booking_cancellations(
+                session, [(model.date, model.desk_id, model.telegram_id)], config.bot_operation.timezone)
@@ -27,9 +27,17 @@ from app.keyboards.set_menu import set_main_menu
 from app.scenes.setup import register_scenes
 from app.middlewares.user_middleware import UserMiddleware
 # from app.middlewares.config_middleware import ConfigMiddleware
-from app.middlewares.db_middleware import DataBaseSession
+from app.middlewares.db_middleware import DataBaseSession, SessionReleaseMiddleware
+from app.middlewares.query_stats_middleware import QueryStatsMiddleware, HandlerNameMiddleware
+from app.middlewares.metrics_middleware import MetricsMiddleware, TelegramMetricsMiddleware
 from app.database.engine import get_engine, get_session_pool
+from app.database.occupancy import occupancy_matrix
+from app.database.registration_cache import registration_cache
+from app.database.replicas import replica_router
+from app.database.view_cache import view_cache
 from app.routers import router
+from app.utils.metrics import metrics
+from app.utils.webhook import run_webhook
 
 
 from app.utils.logger import Logger
@@ -47,6 +55,9 @@ def setup_bot() -> Tuple[Bot, RedisStorage]:
     redis = Redis(host=config.redis.host, port=config.redis.port)
     key_builder = DefaultKeyBuilder(with_destiny=True)
     storage = RedisStorage(redis=redis, key_builder=key_builder)
+    registration_cache.configure(redis=redis) # Share users' registration statuses between bot processes
+    view_cache.configure(redis=redis) # Share rendered bookings lists between bot processes
+    metrics.configure(redis=redis) # Aggregate metrics of all processes, exported by the API at /metrics
     bot = Bot(
         token=config.bot.token,
         default=DefaultBotProperties(
@@ -54,6 +65,8 @@ def setup_bot() -> Tuple[Bot, RedisStorage]:
             link_preview_is_disabled=False,
             link_preview_prefer_large_media=True,
             link_preview_show_above_text=False)) # Show link previews below text
+    bot.session.middleware(SessionReleaseMiddleware()) # Return DB connections to the pool before Telegram API calls
+    bot.session.middleware(TelegramMetricsMiddleware())
     return bot, storage
 
 
@@ -65,7 +78,9 @@ def setup_dispatcher(bot, storage) -> Dispatcher:
     dp = Dispatcher(
         bot=bot,
         storage=storage,
-        events_isolation=SimpleEventIsolation(),
+        # Bot replicas and worker processes must not handle updates of the same chat at the same time,
+        # so they serialize them with Redis locks. A single polling process can use in-memory locks
+        events_isolation=storage.create_isolation() if config.webhook.enabled or config.workers.count > 1 else SimpleEventIsolation(),
     )
     dp.include_router(router)
     register_dialogs(router) # Initialize all dialog modules
@@ -75,18 +90,36 @@ def setup_dispatcher(bot, storage) -> Dispatcher:
     return dp
 
 
-def setup_database() -> async_sessionmaker[AsyncSession]:
-    engine = get_engine(db_url=config.db.url, echo=False)
+def setup_database(redis: Redis) -> async_sessionmaker[AsyncSession]:
+    engine = get_engine(db_url=config.db.url, echo=False, name="bot")
     session_pool = get_session_pool(engine)
+    if config.db.replica_urls:
+        # Getters, bookings lists, analytics and exports read from the replicas (data['read_session'])
+        replica_router.configure(
+            [get_engine(db_url=url, echo=False, name="bot-replica") for url in config.db.replica_urls],
+            window=config.db.read_your_writes_window,
+            redis=redis) # Share the recent writers between bot processes
+    if config.bot_operation.occupancy_cache:
+        occupancy_matrix.configure(
+            num_days=config.bot_operation.num_days,
+            timezone=config.bot_operation.timezone)
     return session_pool
 
 
 def setup_middlewares(dp, session_pool) -> None:
     """Applies middlewares to the Dispatcher for pre-processing messages and updates."""
+    dp.update.outer_middleware(
+        QueryStatsMiddleware()) # Count SQL statements of the whole update, including UserMiddleware
+    dp.update.outer_middleware(
+        MetricsMiddleware()) # Runs inside QueryStatsMiddleware to export its counts per handler
+    dp.message.middleware(
+        HandlerNameMiddleware())
+    dp.callback_query.middleware(
+        HandlerNameMiddleware())
     dp.message.outer_middleware(
-        UserMiddleware(session_pool=session_pool))
+        UserMiddleware())
     dp.callback_query.outer_middleware(
-        UserMiddleware(session_pool=session_pool))
+        UserMiddleware())
     dp.update.middleware(
         DataBaseSession(session_pool=session_pool))
     dp.update.middleware(
@@ -108,21 +141,42 @@ async def on_shutdown(bot):
 
 
 async def main():
-    """The main coroutine setups bot, dispatcher, database, middlewares and starts polling for updates."""
+    """
+    The main coroutine setups bot, dispatcher, database, middlewares
+    and starts polling for updates or serving the webhook (see WEBHOOK_MODE).
+    """
     bot, storage = setup_bot()
     dp = setup_dispatcher(bot, storage)
-    session_pool = setup_database()
+    session_pool = setup_database(storage.redis)
     setup_middlewares(dp, session_pool)
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
-    await bot.delete_webhook(drop_pending_updates=True) # Removes any existing webhooks before starting polling for updates
-    await set_bot_description(bot)
-    await set_main_menu(bot) # Setup the bot's main menu
-    await dp.start_polling(
-        bot,
-        _translator_hub=Translator(),
-        allowed_updates=dp.resolve_used_update_types(),
-    )
+    setup_worker = config.workers.index == 0 # Other worker processes share the setup of the first one
+    if setup_worker:
+        await set_bot_description(bot)
+        await set_main_menu(bot) # Setup the bot's main menu
+    metrics_flusher = asyncio.create_task(metrics.run_flusher())
+    try:
+        if config.webhook.enabled:
+            await run_webhook(
+                dp,
+                bot,
+                config.webhook,
+                allowed_updates=dp.resolve_used_update_types(),
+                set_webhook=setup_worker,
+                reuse_port=config.workers.count > 1,
+                _translator_hub=Translator(),
+            )
+        else:
+            await bot.delete_webhook(drop_pending_updates=True) # Removes any existing webhooks before starting polling for updates
+            await dp.start_polling(
+                bot,
+                _translator_hub=Translator(),
+                allowed_updates=dp.resolve_used_update_types(),
+            )
+    finally:
+        metrics_flusher.cancel() # Flushes the pending samples on cancellation
+        await asyncio.gather(metrics_flusher, return_exceptions=True)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,30 @@
+import time
+
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy import text
 
 from app.database.models import Base
+from app.database.query_stats import instrument_engine
+from app.database.session_writes import track_session_writes
+from app.database.team_closure import track_team_tree_writes
+from app.utils.metrics import metrics
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool that reports how long checkouts wait for a free connection (db_pool_checkout_wait_seconds),
+    labeled with the pool's logging name (e.g. "bot" or "api").
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.observe(
+                "db_pool_checkout_wait_seconds",
+                time.perf_counter() - start,
+                {"pool": self._orig_logging_name or "default"})
 
 
 def get_engine(
@@ -10,15 +33,26 @@ def get_engine(
     echo_pool: bool = False,
     pool_size: int = 50,
     max_overflow: int = 10,
+    name: str = "default",
     ) -> AsyncEngine:
-    """Initialize async engine."""
+    """
+    Initialize async engine. Its statements are counted per handler (see app/database/query_stats.py),
+    pool checkout waits are exported as metrics under the given name.
+    The sessions keep team_closure in sync with the team_tree writes (see app/database/team_closure.py)
+    and record whether they have written (see app/database/session_writes.py).
+    """
     engine: AsyncEngine = create_async_engine(
         db_url,
         echo=echo,
         echo_pool=echo_pool,
         pool_size=pool_size,
         max_overflow=max_overflow,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=name,
     )
+    instrument_engine(engine)
+    track_team_tree_writes()
+    track_session_writes()
     return engine
 
 
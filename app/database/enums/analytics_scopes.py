@@ -0,0 +1,8 @@
+import enum
+
+class AnalyticsScope(enum.Enum):
+    ALL = "all" # The whole office
+    ROOM = "room"
+    DESK = "desk"
+    USER = "user"
+    TEAM = "team"
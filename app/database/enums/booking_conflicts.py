@@ -0,0 +1,5 @@
+import enum
+
+class BookingConflict(enum.Enum):
+    DESK_TAKEN = "uq_desk_id_date" # The desk is already booked by someone on the date
+    USER_HAS_BOOKING = "uq_telegram_id_date" # The user already has a booking on the date
@@ -0,0 +1,6 @@
+import enum
+
+class RegistrationStatus(enum.Enum):
+    REGISTERED = "registered" # The user is in the users table
+    WAITLISTED = "waitlisted" # The user is in the waitlist table
+    UNKNOWN = "unknown" # The user is in neither of the tables
@@ -0,0 +1,104 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, List
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import Pool
+
+from app.database.session_writes import release_if_read_only
+
+
+Read = Callable[[AsyncSession], Awaitable[Any]]
+
+AUTOCOMMIT = {'isolation_level': 'AUTOCOMMIT'}
+REPEATABLE_READ = {'isolation_level': 'REPEATABLE READ'}
+
+# Snapshot ids are generated by Postgres (e.g. "00000003-0000001B-1"), checked anyway since SET TRANSACTION SNAPSHOT
+# can't take a bound parameter
+SNAPSHOT_ID = re.compile(r'^[0-9A-F]+-[0-9A-F]+(-[0-9]+)?$')
+
+# Dialects on which the reads run one after another on the caller's session (see fan_out)
+SEQUENTIAL_DIALECTS = {'sqlite'}
+
+# Share of the engine's pool (pool_size) that the fanned-out reads of all updates may use at the same time,
+# so that a burst of fan-outs leaves connections for the other handlers
+POOL_SHARE = 0.5
+DEFAULT_MAX_CONCURRENT_READS = 5 # For pools without a size (e.g. NullPool)
+
+_semaphores: "WeakKeyDictionary[Pool, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _reads_semaphore(engine: AsyncEngine) -> asyncio.Semaphore:
+    """Returns the semaphore that caps the concurrent fanned-out reads on the engine's pool."""
+    pool = engine.sync_engine.pool
+    semaphore = _semaphores.get(pool)
+    if semaphore is None:
+        size = pool.size() if hasattr(pool, 'size') else None
+        semaphore = asyncio.Semaphore(
+            max(1, int(size * POOL_SHARE)) if size else DEFAULT_MAX_CONCURRENT_READS)
+        _semaphores[pool] = semaphore
+    return semaphore
+
+
+async def _gather(*aws: Awaitable[Any]) -> List[Any]:
+    """Like asyncio.gather, but lets every read finish (and close its session) before raising the first error."""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def fan_out(session: AsyncSession, *reads: Read, snapshot: bool = False) -> List[Any]:
+    """
+    Runs independent reads concurrently, each read(session) on its own short-lived session of the same engine,
+    and returns their results in order. One AsyncSession can't run statements concurrently, so a getter that
+    needs several queries waits for the slowest of them instead of their sum.
+
+    The reads must not depend on each other nor on uncommitted writes of `session`, which is only used for its engine.
+    A read-only transaction of `session` is ended first, so the update doesn't hold its connection
+    on top of the reads' ones. The reads of all concurrent fan-outs take at most POOL_SHARE of the pool's connections,
+    the others wait for a free slot.
+    By default they run in autocommit mode, so each statement sees the data committed when it starts.
+    With snapshot=True they all see the same snapshot: the first one exports it from a REPEATABLE READ transaction
+    and the others import it (Postgres' pg_export_snapshot()).
+    If a read fails, the error is raised once all the reads have finished.
+
+    On SQLite the reads run one after another on `session` itself: aiosqlite gains nothing from concurrent
+    connections and an in-memory database is private to its connection. One transaction also makes them consistent.
+    """
+    if len(reads) < 2 or session.bind.dialect.name in SEQUENTIAL_DIALECTS:
+        return [await read(session) for read in reads]
+
+    engine = session.bind
+    await release_if_read_only(session)
+    semaphore = _reads_semaphore(engine)
+    if not snapshot:
+        # Without BEGIN and ROLLBACK a read costs one round trip per statement, and under READ COMMITTED
+        # every statement takes its own snapshot anyway
+        autocommit_engine = engine.execution_options(**AUTOCOMMIT)
+
+        async def run(read: Read) -> Any:
+            async with semaphore, AsyncSession(autocommit_engine, expire_on_commit=False) as read_session:
+                return await read(read_session)
+        return await _gather(*(run(read) for read in reads))
+
+    first, *rest = reads
+    # The exporting transaction stays open until all the other reads have finished, so the snapshot stays importable.
+    # It doesn't take a slot of the semaphore: the reads holding the slots never wait for it, so the fan-outs
+    # can't block each other
+    async with AsyncSession(engine, expire_on_commit=False) as exporter:
+        await exporter.connection(execution_options=REPEATABLE_READ)
+        snapshot_id = await exporter.scalar(text("SELECT pg_export_snapshot()"))
+        if not SNAPSHOT_ID.match(snapshot_id):
+            raise ValueError(f"Unexpected snapshot id: {snapshot_id!r}")
+
+        async def run_in_snapshot(read: Read) -> Any:
+            async with semaphore, AsyncSession(engine, expire_on_commit=False) as read_session:
+                await read_session.connection(execution_options=REPEATABLE_READ)
+                await read_session.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+                return await read(read_session)
+
+        return await _gather(first(exporter), *(run_in_snapshot(read) for read in rest))
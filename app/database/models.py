@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Date, DateTime, Enum, ForeignKey, BigInteger, String, UniqueConstraint, func
+from sqlalchemy import Date, DateTime, Enum, ForeignKey, BigInteger, Index, String, UniqueConstraint, func, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 from app.database.enums.user_roles import UserRole
@@ -49,6 +49,11 @@ class UserRoleAssignment(Base):
     user: Mapped['User'] = relationship(backref='user_role_assignments')
     team: Mapped['Team'] = relationship(backref='user_role_assignments')
 
+    __table_args__ = (
+        # Team members (team bookings and assignments lists)
+        Index('ix_user_role_assignments_team_id', 'team_id'),
+    )
+
 
 class Team(Base):
     __tablename__ = 'teams'
@@ -59,6 +64,10 @@ class Team(Base):
 
     room: Mapped['Room'] = relationship(backref='teams')
 
+    __table_args__ = (
+        Index('ix_teams_room_id', 'room_id'),
+    )
+
 
 class TeamTree(Base):
     __tablename__ = 'team_tree'
@@ -80,6 +89,24 @@ class TeamTree(Base):
     )
 
 
+class TeamClosure(Base):
+    """
+    Closure of team_tree: a row for every team and each of its sub-teams at any depth, and for the team itself (depth 0),
+    so "the team and all its sub-teams" is a join on ancestor_team_id.
+    Rebuilt on every Team or TeamTree write (see app/database/team_closure.py).
+    """
+    __tablename__ = 'team_closure'
+
+    ancestor_team_id: Mapped[int] = mapped_column(ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True)
+    descendant_team_id: Mapped[int] = mapped_column(ForeignKey('teams.id', ondelete='CASCADE'), primary_key=True)
+    depth: Mapped[int] = mapped_column() # Shortest path from the ancestor, 0 for the team itself
+
+    __table_args__ = (
+        # Ancestors of a team
+        Index('ix_team_closure_descendant_team_id', 'descendant_team_id'),
+    )
+
+
 class Waitlist(Base):
     __tablename__ = 'waitlist'
 
@@ -97,6 +124,11 @@ class Room(Base):
     is_available: Mapped[bool] = mapped_column(default=True)
     plan: Mapped[str | None] = mapped_column(String(255)) # url to the room plan
 
+    __table_args__ = (
+        # Partial indexes match the "is_available == True" filters, rendered as "= true" by Postgres and "= 1" by SQLite
+        Index('ix_rooms_available', 'id', postgresql_where=text('is_available'), sqlite_where=text('is_available = 1')),
+    )
+
 
 class Desk(Base):
     __tablename__ = 'desks'
@@ -108,6 +140,12 @@ class Desk(Base):
 
     room: Mapped['Room'] = relationship(backref='desks') # This relationship is used to access the room of the desk, e.g. desk.room
 
+    __table_args__ = (
+        Index('ix_desks_room_id', 'room_id'),
+        # Available desks of a room (desks lists and bookable desks)
+        Index('ix_desks_room_id_available', 'room_id', postgresql_where=text('is_available'), sqlite_where=text('is_available = 1')),
+    )
+
 
 class DeskAssignment(Base):
     __tablename__ = 'desk_assignments'
@@ -125,6 +163,8 @@ class DeskAssignment(Base):
         UniqueConstraint('desk_id', 'weekday', name='uq_desk_weekday'),
         # A user cannot be assigned more than one desk on the same weekday.
         UniqueConstraint('telegram_id', 'weekday', name='uq_telegram_id_weekday'),
+        # Desks assigned on a weekday (bookable desks)
+        Index('ix_desk_assignments_weekday', 'weekday'),
     )
 
 
@@ -144,4 +184,35 @@ class Booking(Base):
         UniqueConstraint('desk_id', 'date', name='uq_desk_id_date'),
         # A user cannot book more than one desk on the same date.
         UniqueConstraint('telegram_id', 'date', name='uq_telegram_id_date'),
-    )
\ No newline at end of file
+        # Bookings on a date or from today onwards, and the keyset pagination on (date, id) of the admin booking explorer.
+        # The unique constraints above already index the lookups by user and by desk,
+        # since their leading columns are telegram_id and desk_id
+        Index('ix_bookings_date_id', 'date', 'id'),
+    )
+
+
+class BookingDailyStat(Base):
+    """
+    Daily booking counters per desk and user for the analytics (app/services/admin/analytics.py).
+    The booking writes in orm_queries update them in the same transaction, so the analytics aggregate this table
+    instead of scanning bookings, and keep counting the cancelled bookings. room_id and team_id are copied
+    when the desk is booked.
+    """
+    __tablename__ = 'booking_daily_stats'
+
+    date: Mapped[Date] = mapped_column(Date, primary_key=True)
+    desk_id: Mapped[int] = mapped_column(ForeignKey('desks.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('users.telegram_id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    room_id: Mapped[int] = mapped_column(ForeignKey('rooms.id', ondelete='CASCADE'))
+    team_id: Mapped[int | None] = mapped_column(ForeignKey('teams.id', ondelete='SET NULL'))
+    bookings: Mapped[int] = mapped_column(default=0) # Bookings made, including the cancelled ones
+    cancellations: Mapped[int] = mapped_column(default=0)
+    late_cancellations: Mapped[int] = mapped_column(default=0) # Cancelled on the booking date (or later, by an admin)
+
+    __table_args__ = (
+        # Date ranges of one room, desk, user or team (the primary key covers the whole office)
+        Index('ix_booking_daily_stats_room_id_date', 'room_id', 'date'),
+        Index('ix_booking_daily_stats_desk_id_date', 'desk_id', 'date'),
+        Index('ix_booking_daily_stats_telegram_id_date', 'telegram_id', 'date'),
+        Index('ix_booking_daily_stats_team_id_date', 'team_id', 'date'),
+    )
@@ -0,0 +1,302 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.common.business_days import local_today
+from app.database.models import (
+    User,
+    UserRoleAssignment,
+    Team,
+    Room,
+    Desk,
+    DeskAssignment,
+    Booking,
+)
+
+
+@dataclass(slots=True)
+class DeskInfo:
+    id: int
+    name: str
+    room_id: int
+
+
+@dataclass(slots=True)
+class RoomInfo:
+    id: int
+    name: str
+    plan: Optional[str]
+    mask: int = 0 # Bits of the desks located in the room
+
+
+@dataclass(slots=True)
+class AssignmentInfo:
+    telegram_id: int
+    desk_index: int
+    weekday: int
+
+
+class OccupancyMatrix:
+    """
+    Per-process occupancy matrix of desks × days for the booking horizon.
+
+    Every desk gets a bit index, and every day of the horizon is stored as an integer bitmap
+    of booked desks. Permanent desk assignments are stored as a bitmap per weekday (only for users who are in the office).
+    Python integers are arbitrary-precision, so AND/OR/NOT over a whole floor are single operations,
+    and availability questions are answered without a database round trip.
+
+    The matrix is loaded once from the bookings, desk_assignments and users tables and then updated incrementally
+    by orm_insert_booking, orm_delete_booking_by_id and the out-of-office toggles, and invalidated by the other bot writes
+    to its inputs (rooms and desks, desk assignments, user deletions).
+    It is reloaded when the day changes or when refresh_interval has passed, to pick up writes made by other processes
+    (sqladmin, e.g. the teams' preferred rooms, and other bot instances). The database unique constraints stay the source of truth.
+    """
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.horizon_days: int = 0
+        self.refresh_interval: float = 60.0
+        self.timezone: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+        self._start_date: Optional[date] = None
+        self._desks: List[DeskInfo] = []
+        self._desk_index: Dict[int, int] = {} # desk_id -> bit index
+        self._rooms: Dict[int, RoomInfo] = {}
+        self._room_ids_by_name: Dict[str, int] = {}
+        self._available_mask: int = 0
+        self._booked: Dict[date, int] = {}
+        self._bookings: Dict[int, Tuple[int, date]] = {} # booking_id -> (desk bit index, date)
+        self._assignments: List[AssignmentInfo] = []
+        self._assigned: Dict[int, int] = {} # weekday -> bitmap of assigned desks of users in the office
+        self._out_of_office: set = set()
+        self._preferred_rooms: Dict[int, int] = {} # telegram_id -> preferred room_id of the user's team
+
+
+    def configure(self, num_days: int, refresh_interval: float = 60.0, timezone: Optional[str] = None) -> None:
+        """
+        Enables the matrix. The horizon is wide enough to cover num_days bookable dates
+        together with the weekends and holidays skipped between them.
+        It starts at today's date in the timezone (the bot's TIMEZONE), like the bookable dates.
+        """
+        self.enabled = True
+        self.horizon_days = int(num_days) * 2 + 7
+        self.refresh_interval = refresh_interval
+        self.timezone = timezone
+        self.invalidate()
+
+
+    def invalidate(self) -> None:
+        """Forces a reload on the next access."""
+        self._loaded_at = None
+
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or self._start_date != local_today(self.timezone)
+            or time.monotonic() - self._loaded_at > self.refresh_interval
+        )
+
+
+    async def refresh_if_stale(self, session: AsyncSession) -> None:
+        if not self.enabled or not self._is_stale():
+            return
+        async with self._lock:
+            # Another coroutine could have reloaded the matrix while we were waiting for the lock
+            if self._is_stale():
+                await self.load(session)
+
+
+    async def load(self, session: AsyncSession) -> None:
+        """Loads desks, rooms, bookings within the horizon, desk assignments and preferred rooms."""
+        start_date = local_today(self.timezone)
+        end_date = start_date + timedelta(days=self.horizon_days)
+
+        rooms_result = await session.execute(select(Room.id, Room.name, Room.plan, Room.is_available))
+        desks_result = await session.execute(
+            select(Desk.id, Desk.name, Desk.room_id, Desk.is_available).order_by(Desk.id))
+        bookings_result = await session.execute(
+            select(Booking.id, Booking.desk_id, Booking.date)
+            .where(Booking.date >= start_date, Booking.date < end_date))
+        assignments_result = await session.execute(
+            select(DeskAssignment.telegram_id, DeskAssignment.desk_id, DeskAssignment.weekday))
+        out_of_office_result = await session.execute(
+            select(User.telegram_id).where(User.is_out_of_office.is_(True)))
+        preferred_rooms_result = await session.execute(
+            select(UserRoleAssignment.telegram_id, Team.room_id)
+            .join(Team, Team.id == UserRoleAssignment.team_id))
+
+        rooms: Dict[int, RoomInfo] = {}
+        available_rooms = set()
+        for room_id, name, plan, room_is_available in rooms_result.all():
+            rooms[room_id] = RoomInfo(room_id, name, plan)
+            if room_is_available:
+                available_rooms.add(room_id)
+        desks: List[DeskInfo] = []
+        desk_index: Dict[int, int] = {}
+        available_mask = 0
+        for index, (desk_id, name, room_id, is_available) in enumerate(desks_result.all()):
+            desks.append(DeskInfo(desk_id, name, room_id))
+            desk_index[desk_id] = index
+            if room_id in rooms:
+                rooms[room_id].mask |= 1 << index
+            if is_available and room_id in available_rooms:
+                available_mask |= 1 << index
+
+        booked: Dict[date, int] = {}
+        bookings: Dict[int, Tuple[int, date]] = {}
+        for booking_id, desk_id, booking_date in bookings_result.all():
+            index = desk_index.get(desk_id)
+            if index is None:
+                continue
+            booked[booking_date] = booked.get(booking_date, 0) | (1 << index)
+            bookings[booking_id] = (index, booking_date)
+
+        assignments = [
+            AssignmentInfo(telegram_id, desk_index[desk_id], weekday.value)
+            for telegram_id, desk_id, weekday in assignments_result.all()
+            if desk_id in desk_index
+        ]
+
+        self._rooms = rooms
+        self._room_ids_by_name = {room.name: room.id for room in rooms.values()}
+        self._desks = desks
+        self._desk_index = desk_index
+        self._available_mask = available_mask
+        self._booked = booked
+        self._bookings = bookings
+        self._assignments = assignments
+        self._out_of_office = set(out_of_office_result.scalars().all())
+        self._preferred_rooms = {telegram_id: room_id for telegram_id, room_id in preferred_rooms_result.all()}
+        self._rebuild_assigned()
+        self._start_date = start_date
+        self._loaded_at = time.monotonic()
+
+
+    def _rebuild_assigned(self) -> None:
+        assigned: Dict[int, int] = {}
+        for assignment in self._assignments:
+            if assignment.telegram_id in self._out_of_office:
+                continue
+            assigned[assignment.weekday] = assigned.get(assignment.weekday, 0) | (1 << assignment.desk_index)
+        self._assigned = assigned
+
+
+    def covers(self, booking_date: date) -> bool:
+        """Returns True if the matrix is loaded and the date is within the horizon."""
+        return (
+            self.enabled
+            and self._loaded_at is not None
+            and self._start_date is not None
+            and self._start_date <= booking_date < self._start_date + timedelta(days=self.horizon_days)
+        )
+
+
+    def _free_mask(self, booking_date: date) -> int:
+        blocked = self._booked.get(booking_date, 0) | self._assigned.get(booking_date.weekday(), 0)
+        return self._available_mask & ~blocked
+
+
+    def _desks_from_mask(self, mask: int) -> List[DeskInfo]:
+        desks: List[DeskInfo] = []
+        while mask:
+            lowest_bit = mask & -mask
+            desks.append(self._desks[lowest_bit.bit_length() - 1])
+            mask ^= lowest_bit
+        return desks
+
+
+    #* Queries
+    def select_room_plan_and_bookable_desks(
+        self,
+        room_name: str,
+        booking_date: date,
+        telegram_id: Optional[int] = None,
+        preferred_room_only: bool = False,
+        ) -> Optional[Tuple[bool, Optional[str], List[str]]]:
+        """
+        In-memory counterpart of orm_select_room_plan_and_bookable_desks_by_room_name.
+
+        Returns None if the date is not covered by the matrix (the caller should query the database),
+        otherwise a tuple of (room_found, room_plan, desk_names).
+        """
+        if not self.covers(booking_date):
+            return None
+        room_id = self._room_ids_by_name.get(room_name)
+        if room_id is None:
+            return False, None, []
+        room = self._rooms[room_id]
+        if preferred_room_only and self._preferred_rooms.get(telegram_id) != room_id:
+            return True, room.plan, []
+        desks = self._desks_from_mask(self._free_mask(booking_date) & room.mask)
+        return True, room.plan, [desk.name for desk in desks]
+
+
+    def select_random_bookable_desk(
+        self,
+        booking_date: date,
+        room_id: Optional[int] = None,
+        ) -> Optional[Tuple[int, str, str]]:
+        """
+        Picks a random bookable desk on the given date, optionally only in the given room.
+
+        Returns a tuple of (desk_id, desk_name, room_name), or None if there is no bookable desk.
+        """
+        mask = self._free_mask(booking_date)
+        if room_id is not None:
+            room = self._rooms.get(room_id)
+            mask &= room.mask if room else 0
+        count = mask.bit_count()
+        if count == 0:
+            return None
+        # Drop a random number of the lowest set bits, then take the lowest remaining one
+        for _ in range(random.randrange(count)):
+            mask &= mask - 1
+        desk = self._desks[(mask & -mask).bit_length() - 1]
+        return desk.id, desk.name, self._rooms[desk.room_id].name
+
+
+    def preferred_room_id(self, telegram_id: int) -> Optional[int]:
+        return self._preferred_rooms.get(telegram_id)
+
+
+    #* Incremental updates
+    def mark_booked(self, booking_id: int, desk_id: int, booking_date: date) -> None:
+        if not self.covers(booking_date):
+            return
+        index = self._desk_index.get(desk_id)
+        if index is None:
+            # A desk added after the last load, let the next access reload the matrix
+            self.invalidate()
+            return
+        self._booked[booking_date] = self._booked.get(booking_date, 0) | (1 << index)
+        self._bookings[booking_id] = (index, booking_date)
+
+
+    def mark_cancelled(self, booking_id: int) -> None:
+        booking = self._bookings.pop(booking_id, None)
+        if booking is None:
+            return
+        index, booking_date = booking
+        self._booked[booking_date] = self._booked.get(booking_date, 0) & ~(1 << index)
+
+
+    def set_out_of_office(self, telegram_id: int, is_out_of_office: bool) -> None:
+        """
+        Activates or deactivates the user's desk assignments.
+        The bookings deleted when the user comes back to the office are dropped with mark_cancelled().
+        """
+        if is_out_of_office:
+            self._out_of_office.add(telegram_id)
+        else:
+            self._out_of_office.discard(telegram_id)
+        self._rebuild_assigned()
+
+
+occupancy_matrix = OccupancyMatrix()
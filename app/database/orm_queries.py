@@ -1,7 +1,10 @@
-from datetime import date
-from typing import List, Optional
+from datetime import date, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy import Integer, String, and_, func, literal, not_, or_, select, update, delete
+from sqlalchemy import Integer, String, and_, bindparam, func, insert, literal, not_, or_, select, true, tuple_, update, delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload, aliased
 from sqlalchemy.exc import SQLAlchemyError
@@ -11,20 +14,35 @@ from app.database.models import (
     UserRoleAssignment,
     Team,
     TeamTree,
+    TeamClosure,
     Waitlist,
     Room,
     Desk,
     DeskAssignment,
     Booking,
+    BookingDailyStat,
 )
 
+from app.database.enums.analytics_scopes import AnalyticsScope
 from app.database.enums.weekdays import Weekday
+from app.database.enums.booking_conflicts import BookingConflict
+from app.database.occupancy import occupancy_matrix
+from app.database.team_closure import TeamTreeCycleError, team_closure_statements, team_tree_cycle_query
+from app.database.view_cache import view_cache
+from app.services.common.business_days import local_today
 
 
 class DeskBookerError(Exception):
     pass
 
 
+class BookingConflictError(DeskBookerError):
+    """Raised when a booking is blocked by the uq_desk_id_date or uq_telegram_id_date constraint."""
+    def __init__(self, message: str, conflict: BookingConflict):
+        super().__init__(message)
+        self.conflict = conflict
+
+
 #* User's ORM queries
 async def orm_insert_user(
     session: AsyncSession,
@@ -111,6 +129,9 @@ async def orm_switch_is_out_of_office_by_telegram_id(
             # No rows were updated, indicating the user does not exist
             raise ValueError(f"No user found with telegram_id {telegram_id}")
         await session.commit()
+        # The new status is not known here, so let the occupancy matrix reload
+        occupancy_matrix.invalidate()
+        await view_cache.bump_version()
     except Exception as e:
         await session.rollback()  # Ensure transaction is rolled back in case of error
         raise  # Optionally re-raise or handle the exception differently
@@ -119,63 +140,84 @@ async def orm_switch_is_out_of_office_by_telegram_id(
 # Switching and deleting future bookings
 async def orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings(
     session: AsyncSession,
-    telegram_id: int):
-    try:
-        # Check current out-of-office status before updating
-        current_status_query = select(User.is_out_of_office).where(User.telegram_id == telegram_id)
-        current_status_result = await session.execute(current_status_query)
-        current_status = current_status_result.scalar_one()
+    telegram_id: int,
+    timezone: Optional[str] = None) -> List[Row]:
+    """
+    Switches the user's out-of-office status in one transaction. When the user comes back to the office,
+    the future bookings on the desks assigned to them on the assigned weekdays are deleted with a single statement:
+    the assignments are joined here with a calendar of the future dates (from today in the timezone up to the last booked date),
+    and the (desk_id, date) pairs are deleted with one DELETE ... WHERE (desk_id, date) IN (...),
+    which is served by the uq_desk_id_date index on both Postgres and SQLite.
 
-        # Attempt to update the is_out_of_office status atomically
+    Returns the deleted bookings, rows of id, date, desk_id and telegram_id, so their users can be notified.
+    """
+    try:
         query = (
             update(User).
             where(User.telegram_id == telegram_id).
-            values(is_out_of_office=not_(current_status)).
-            execution_options(synchronize_session="fetch")
+            values(is_out_of_office=not_(User.is_out_of_office)).
+            returning(User.is_out_of_office)
         )
-        update_result = await session.execute(query)
-        if update_result.rowcount == 0:
-            # No rows were updated, indicating the user does not exist
+        result = await session.execute(query)
+        is_out_of_office = result.scalar_one_or_none()
+        if is_out_of_office is None:
             raise ValueError(f"No user found with telegram_id {telegram_id}")
-        await session.commit()
 
-        # If changing from True to False, check desk assignments for deletions
-        if current_status == True:
-            # Find all desk assignments for this user
-            desk_assignments_query = select(DeskAssignment.desk_id, DeskAssignment.weekday).where(DeskAssignment.telegram_id == telegram_id)
-            desk_assignments_result = await session.execute(desk_assignments_query)
-            desk_assignments = desk_assignments_result.all()
-
-            for desk_id, assigned_weekday in desk_assignments:
-                # Adjust the weekday to match SQL DOW (day of week) expectations
-                sql_dow = (assigned_weekday.value + 1) % 7  # Shift by 1 to accommodate starting the week on Sunday
-
-                # Delete future bookings on these desk IDs where booking date matches the assigned weekday
+        cancelled = []
+        if not is_out_of_office:
+            assignments_query = (
+                select(DeskAssignment.desk_id, DeskAssignment.weekday).
+                where(DeskAssignment.telegram_id == telegram_id)
+            )
+            assignments = (await session.execute(assignments_query)).all()
+            today = local_today(timezone)
+            last_date = (await session.execute(select(func.max(Booking.date)))).scalar()
+            if assignments and last_date is not None and last_date >= today:
+                # Calendar of the future dates, joined with the assignments by weekday
+                assigned_desks = {}
+                for desk_id, weekday in assignments:
+                    assigned_desks.setdefault(weekday.value, []).append(desk_id)
+                desk_dates = [
+                    (desk_id, day)
+                    for day in (today + timedelta(days=i) for i in range((last_date - today).days + 1))
+                    for desk_id in assigned_desks.get(day.weekday(), [])
+                ]
                 delete_query = (
                     delete(Booking).
-                    where(
-                        Booking.desk_id == desk_id,
-                        Booking.date >= date.today(),
-                        func.extract('dow', Booking.date) == sql_dow  # Match the adjusted weekday value
-                    )
+                    where(tuple_(Booking.desk_id, Booking.date).in_(desk_dates)).
+                    returning(Booking.id, Booking.date, Booking.desk_id, Booking.telegram_id)
                 )
-                await session.execute(delete_query)
-            await session.commit()
+                cancelled = (await session.execute(delete_query)).all()
+                await _record_booking_cancellations(
+                    session, [(row.date, row.desk_id, row.telegram_id) for row in cancelled], today)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
 
-    except Exception as e:
-        await session.rollback()  # Ensure transaction is rolled back in case of error
+    for booking in cancelled:
+        occupancy_matrix.mark_cancelled(booking.id)
+    occupancy_matrix.set_out_of_office(telegram_id, is_out_of_office)
+    await view_cache.bump_version()
+    return cancelled
 
 
 async def orm_delete_user_by_telegram_id(session: AsyncSession, telegram_id: int):
     query = delete(User).where(User.telegram_id == telegram_id)
     await session.execute(query)
     await session.commit()
+    # User's bookings and desk assignments are deleted by cascade
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_delete_user_by_telegram_name(session: AsyncSession, telegram_name: str):
     query = delete(User).where(User.telegram_name == telegram_name)
     await session.execute(query)
     await session.commit()
+    # User's bookings and desk assignments are deleted by cascade
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 #* UserRoleAssignment's ORM queries
@@ -207,6 +249,12 @@ async def orm_select_team_name_by_id(session: AsyncSession, team_id: int):
     return result.scalar_one_or_none()
 
 
+async def orm_select_team_ids_by_names(session: AsyncSession, team_names: List[str]) -> dict:
+    query = select(Team.name, Team.id).where(Team.name.in_(team_names))
+    result = await session.execute(query)
+    return dict(result.all())
+
+
 async def orm_select_team_id_by_telegram_id(session: AsyncSession, telegram_id: int):
     query = select(UserRoleAssignment.team_id).where(UserRoleAssignment.telegram_id == telegram_id)
     result = await session.execute(query)
@@ -250,30 +298,41 @@ async def orm_select_team_info_by_team_id(session: AsyncSession, team_id: int):
 
 #* TeamTree's ORM queries
 async def orm_select_team_tree(session: AsyncSession, parent_team_id: int):
-    # Define a recursive CTE to fetch the team hierarchy
-    c = select(
-        TeamTree.child_team_id.label('team_id'),
-        func.cast(literal('1'), Integer).label('depth')  # Starting depth
-    ).where(TeamTree.parent_team_id == parent_team_id).cte(name="team_hierarchy", recursive=True)
-
-    recursive_query = select(
-        TeamTree.child_team_id,
-        (c.c.depth + 1).label('depth')
-    ).join_from(TeamTree, c, TeamTree.parent_team_id == c.c.team_id)
+    """Returns (name, depth) rows of the sub-teams of the team at any depth, from team_closure."""
+    query = (
+        select(Team.name, TeamClosure.depth).
+        join(TeamClosure, Team.id == TeamClosure.descendant_team_id).
+        where(TeamClosure.ancestor_team_id == parent_team_id, TeamClosure.depth > 0).
+        order_by(TeamClosure.depth, Team.name)
+    )
+    result = await session.execute(query)
+    return result.all()
 
-    c = c.union_all(recursive_query)
 
-    # Final query using the CTE to fetch team details
-    final_query = select(
-        Team.name,
-        c.c.depth
-    ).select_from(Team.join(c, Team.id == c.c.team_id))
+async def orm_rebuild_team_closure(session: AsyncSession) -> None:
+    """
+    Rebuilds team_closure from team_tree. The ORM writes of teams and team_tree rebuild it themselves,
+    this is for the writes that bypass the ORM (Core inserts, raw SQL).
+    Raises TeamTreeCycleError (and rolls back) if team_tree has a cycle.
+    """
+    try:
+        for statement in team_closure_statements(session.get_bind().dialect.name):
+            await session.execute(statement)
+        cycle = (await session.execute(team_tree_cycle_query())).first()
+        if cycle is not None:
+            raise TeamTreeCycleError(f"Team tree has a cycle through teams {cycle.parent_team_id} and {cycle.child_team_id}.")
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
 
-    # Execution with await
-    results = await session.execute(final_query)
-    teams = results.fetchall()
 
-    return teams
+def _team_members_filter(team_id: int, subtree: bool):
+    """Filters UserRoleAssignment by the team, or by the team and its sub-teams at any depth."""
+    if not subtree:
+        return UserRoleAssignment.team_id == team_id
+    return UserRoleAssignment.team_id.in_(
+        select(TeamClosure.descendant_team_id).where(TeamClosure.ancestor_team_id == team_id))
 
 
 #* Waitlist's ORM queries
@@ -343,6 +402,7 @@ async def orm_insert_room(session: AsyncSession, room_name: str):
         new_room = Room(name=room_name)
         session.add(new_room)
         await session.commit()
+        occupancy_matrix.invalidate()
     else:
         raise Exception
 
@@ -354,6 +414,7 @@ async def orm_insert_rooms(session: AsyncSession, rooms: List[Room]) -> None:
         except SQLAlchemyError:
             await session.rollback()
             raise SQLAlchemyError("Failed to insert rooms into the database.")
+    occupancy_matrix.invalidate()
 
 
 async def orm_select_rooms(session: AsyncSession):
@@ -383,12 +444,16 @@ async def orm_update_room_name_by_name(session: AsyncSession, old_room_name: str
     query = update(Room).where(Room.name == old_room_name).values(name=new_room_name)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_delete_room_by_name(session: AsyncSession, room_name: str):
     query = delete(Room).where(Room.name == room_name)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_get_room_availability_by_name(session: AsyncSession, room_name: str):
@@ -401,6 +466,8 @@ async def orm_update_room_availability_by_name(session: AsyncSession, room_name:
     query = update(Room).where(Room.name == room_name).values(is_available=is_available)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_get_room_data_by_name(session: AsyncSession, room_name: str):
@@ -430,6 +497,7 @@ async def orm_insert_desk_with_room_id(session: AsyncSession, room_id: int, desk
         new_desk = Desk(room_id=room_id, name=desk_name)
         session.add(new_desk)
         await session.commit()
+        occupancy_matrix.invalidate()
     else:
         raise Exception
 
@@ -441,6 +509,7 @@ async def orm_insert_desks(session: AsyncSession, desks: List[Desk]) -> None:
         except SQLAlchemyError:
             await session.rollback()
             raise SQLAlchemyError("Failed to insert desks into the database.")
+    occupancy_matrix.invalidate()
 
 
 async def orm_select_desk_id_by_name(session: AsyncSession, desk_name: str):
@@ -611,6 +680,114 @@ async def orm_select_available_desks_by_date(session: AsyncSession, date: date):
     return result.scalars().all()
 
 
+def _bookable_desk_conditions(booking_date: date) -> list:
+    """
+    Returns the conditions a desk must meet to be bookable on the given date:
+    it is available, not booked on the date and not assigned on the weekday of the date to a user who is in the office.
+    """
+    desk_booked_subquery = (
+        select(1)
+        .where(
+            Booking.desk_id == Desk.id,
+            Booking.date == booking_date,
+        )
+        .exists()
+    )
+    # Desks assigned on this weekday are excluded unless the assigned user is out of office
+    desk_assigned_subquery = (
+        select(1)
+        .select_from(DeskAssignment)
+        .join(User, DeskAssignment.telegram_id == User.telegram_id)
+        .where(
+            DeskAssignment.desk_id == Desk.id,
+            DeskAssignment.weekday == Weekday(booking_date.weekday()),
+            User.is_out_of_office.is_(False),
+        )
+        .exists()
+    )
+    return [
+        Desk.is_available == True,
+        not_(desk_booked_subquery),
+        not_(desk_assigned_subquery),
+    ]
+
+
+async def orm_select_room_plan_and_bookable_desks_by_room_name(
+    session: AsyncSession,
+    room_name: str,
+    booking_date: date,
+    telegram_id: Optional[int] = None,
+    preferred_room_only: bool = False):
+    """
+    Selects the room plan together with the names of desks that can be booked in the room on the given date, in a single statement.
+
+    A desk is bookable if it is available, not booked on the date and not assigned on the weekday of the date to a user who is in the office.
+    If preferred_room_only is True, desks are returned only if the room is the preferred room of the user's team (advanced mode outside of the standard access days).
+
+    Returns a list of (plan, desk_name) rows. The list is empty if the room does not exist,
+    and contains a single (plan, None) row if the room exists but has no bookable desks.
+    """
+    desk_conditions = [Desk.room_id == Room.id, *_bookable_desk_conditions(booking_date)]
+    if preferred_room_only:
+        preferred_room_subquery = (
+            select(1)
+            .select_from(Team)
+            .join(UserRoleAssignment, Team.id == UserRoleAssignment.team_id)
+            .where(
+                UserRoleAssignment.telegram_id == telegram_id,
+                Team.room_id == Room.id,
+            )
+            .exists()
+        )
+        desk_conditions.append(preferred_room_subquery)
+    # Outer join keeps the room row (and its plan) even if no desk matches the conditions
+    query = (
+        select(Room.plan, Desk.name)
+        .select_from(Room)
+        .outerjoin(Desk, and_(*desk_conditions))
+        .where(Room.name == room_name)
+        .order_by(Desk.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_random_bookable_desks(
+    session: AsyncSession,
+    booking_date: date,
+    telegram_id: Optional[int] = None,
+    preferred_room_only: bool = False,
+    limit: int = 5):
+    """
+    Selects up to `limit` random desks that can be booked on the given date, in a single statement.
+    If preferred_room_only is True, only desks in the preferred room of the user's team are selected.
+
+    Returns a list of (id, name, room_name) rows.
+    """
+    desk_conditions = _bookable_desk_conditions(booking_date)
+    if preferred_room_only:
+        preferred_room_subquery = (
+            select(1)
+            .select_from(Team)
+            .join(UserRoleAssignment, Team.id == UserRoleAssignment.team_id)
+            .where(
+                UserRoleAssignment.telegram_id == telegram_id,
+                Team.room_id == Desk.room_id,
+            )
+            .exists()
+        )
+        desk_conditions.append(preferred_room_subquery)
+    query = (
+        select(Desk.id, Desk.name, Room.name.label('room_name'))
+        .join(Room, Desk.room_id == Room.id)
+        .where(Room.is_available == True, *desk_conditions)
+        .order_by(func.random())
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
 async def orm_get_desk_availability_by_name(session: AsyncSession, desk_name: str):
     query = select(Desk.is_available).where(Desk.name == desk_name)
     result = await session.execute(query)
@@ -621,24 +798,32 @@ async def orm_update_desk_name_by_id(session: AsyncSession, desk_id: int, new_de
     query = update(Desk).where(Desk.id == desk_id).values(name=new_desk_name)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_update_desk_name_by_name(session: AsyncSession, desk_name: str, new_desk_name: str):
     query = update(Desk).where(Desk.name == desk_name).values(name=new_desk_name)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_update_desk_availability_by_name(session: AsyncSession, desk_name: str, is_available: bool):
     query = update(Desk).where(Desk.name == desk_name).values(is_available=is_available)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 async def orm_delete_desk_by_id(session: AsyncSession, desk_id: int):
     query = delete(Desk).where(Desk.id == desk_id)
     await session.execute(query)
     await session.commit()
+    occupancy_matrix.invalidate()
+    await view_cache.bump_version()
 
 
 #* DeskAssignment's ORM queries
@@ -737,6 +922,8 @@ async def orm_update_desk_assignment_days(session: AsyncSession, user_id: int, d
             )
         )
         await session.commit()
+        occupancy_matrix.invalidate()
+        await view_cache.bump_version()
         return "Desk assignment successfully updated."
     except SQLAlchemyError as e:
         await session.rollback()
@@ -753,6 +940,8 @@ async def orm_delete_desk_assignment(session: AsyncSession, user_id: int, desk_i
             )
         )
         await session.commit()
+        occupancy_matrix.invalidate()
+        await view_cache.bump_version()
         return "Desk assignment successfully deleted."
     except SQLAlchemyError as e:
         await session.rollback()
@@ -760,32 +949,150 @@ async def orm_delete_desk_assignment(session: AsyncSession, user_id: int, desk_i
 
 
 #* Booking's ORM queries
+def _insert_for_dialect(session: AsyncSession):
+    """Returns the dialect-specific insert construct, which supports ON CONFLICT DO NOTHING."""
+    if session.get_bind().dialect.name == 'sqlite':
+        return sqlite_insert
+    return postgresql_insert
+
+
+def _booking_stats_rows(new_bookings, *where):
+    """Selects the booking_daily_stats rows of the bookings (the bookings table, or a CTE of inserted bookings)."""
+    return (
+        select(
+            new_bookings.c.date,
+            new_bookings.c.desk_id,
+            new_bookings.c.telegram_id,
+            Desk.room_id,
+            UserRoleAssignment.team_id,
+            literal(1),
+            literal(0),
+            literal(0)).
+        join(Desk, new_bookings.c.desk_id == Desk.id).
+        outerjoin(UserRoleAssignment, UserRoleAssignment.telegram_id == new_bookings.c.telegram_id).
+        where(*where)
+    )
+
+
+async def _record_booking(session: AsyncSession, booking) -> None:
+    """
+    Counts the new booking, a row of (id, desk_id, telegram_id, date), in booking_daily_stats.
+    Plain INSERT ... SELECT and UPDATE statements are used instead of ON CONFLICT DO UPDATE,
+    because SQLAlchemy caches their compiled SQL (this runs on every booking).
+    The unique constraints of bookings serialize the writers of the same (date, desk_id, telegram_id) row.
+    """
+    stats = BookingDailyStat.__table__
+    key = and_(
+        stats.c.date == booking.date,
+        stats.c.desk_id == booking.desk_id,
+        stats.c.telegram_id == booking.telegram_id)
+    insert_query = (
+        insert(stats).
+        from_select(
+            ['date', 'desk_id', 'telegram_id', 'room_id', 'team_id', 'bookings', 'cancellations', 'late_cancellations'],
+            _booking_stats_rows(Booking.__table__, Booking.id == booking.id, ~select(stats.c.date).where(key).exists()))
+    )
+    result = await session.execute(insert_query)
+    if result.rowcount == 0: # The desk was booked and cancelled by the user on this date before
+        await session.execute(update(stats).where(key).values(bookings=stats.c.bookings + 1))
+
+
+async def _record_booking_cancellations(session: AsyncSession, cancelled: List, today: date) -> None:
+    """
+    Counts the deleted bookings, rows of (date, desk_id, telegram_id), as cancellations in booking_daily_stats.
+    Cancellations of bookings on `today` (the bot's local date) or earlier are late.
+    """
+    if not cancelled:
+        return
+    stats = BookingDailyStat.__table__
+    query = (
+        update(stats).
+        where(
+            stats.c.date == bindparam('b_date'),
+            stats.c.desk_id == bindparam('b_desk_id'),
+            stats.c.telegram_id == bindparam('b_telegram_id')).
+        values(
+            cancellations=stats.c.cancellations + 1,
+            late_cancellations=stats.c.late_cancellations + bindparam('b_late'))
+    )
+    await session.execute(query, [
+        {'b_date': booking_date, 'b_desk_id': desk_id, 'b_telegram_id': telegram_id, 'b_late': int(booking_date <= today)}
+        for booking_date, desk_id, telegram_id in cancelled
+    ])
+
+
+async def orm_insert_booking_on_conflict_do_nothing(
+    session: AsyncSession,
+    telegram_id: int,
+    date: date,
+    desk_id: Optional[int] = None,
+    desk_name: Optional[str] = None) -> int:
+    """
+    Books the desk (by id or by name) in a single statement:
+    INSERT INTO bookings ... SELECT ... FROM desks ON CONFLICT DO NOTHING RETURNING id.
+
+    Only an available desk in an available room can be booked.
+
+    Returns the id of the new booking.
+    Raises BookingConflictError with the constraint that blocked the booking,
+    or DeskBookerError if the desk does not exist or is not available.
+    """
+    if (desk_id is None) == (desk_name is None):
+        raise ValueError("Either desk_id or desk_name must be provided.")
+    desk_filter = Desk.id == desk_id if desk_id is not None else Desk.name == desk_name
+
+    insert = _insert_for_dialect(session)
+    query = (
+        insert(Booking).
+        from_select(
+            ['telegram_id', 'desk_id', 'date'],
+            select(literal(telegram_id), Desk.id, literal(date)).
+            join(Room, Desk.room_id == Room.id).
+            where(desk_filter, Desk.is_available == True, Room.is_available == True)).
+        on_conflict_do_nothing().
+        returning(Booking.id, Booking.desk_id, Booking.telegram_id, Booking.date)
+    )
+    try:
+        result = await session.execute(query)
+        row = result.first()
+        if row:
+            await _record_booking(session, row)
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()  # Rollback in case of any commit failure
+        raise Exception("Failed to insert booking into the database.") from e
+
+    if row:
+        occupancy_matrix.mark_booked(row.id, row.desk_id, date)
+        await view_cache.bump_version()
+        return row.id
+
+    # Nothing was inserted: find out which constraint blocked the booking
+    conflict_query = (
+        select(Booking.telegram_id).
+        join(Desk, Booking.desk_id == Desk.id).
+        where(Booking.date == date, or_(Booking.telegram_id == telegram_id, desk_filter))
+    )
+    conflict_result = await session.execute(conflict_query)
+    booked_by = conflict_result.scalars().all()
+    if telegram_id in booked_by:
+        raise BookingConflictError(
+            "The user already has a booking on this date.", BookingConflict.USER_HAS_BOOKING)
+    if booked_by:
+        # The desk was booked by another process, so the occupancy matrix is behind the database
+        occupancy_matrix.invalidate()
+        raise BookingConflictError(
+            "A booking for this desk already exists.", BookingConflict.DESK_TAKEN)
+    raise DeskBookerError("The desk does not exist or is not available.")
+
+
 async def orm_insert_booking(
     session: AsyncSession,
     telegram_id: int,
     desk_id: int,
     date: date) -> str:
-    query = select(Booking).where(
-        Booking.telegram_id == telegram_id,
-        Booking.desk_id == desk_id,
-        Booking.date == date)
-    result = await session.execute(query)
-    booking = result.first()
-    if booking:
-        raise DeskBookerError("A booking for this desk already exists.")
-    else:
-        new_booking = Booking(
-                telegram_id=telegram_id,
-                desk_id=desk_id,
-                date=date)
-        session.add(new_booking)
-        try:
-            await session.commit()
-        except SQLAlchemyError as e:
-            await session.rollback()  # Rollback in case of any commit failure
-            raise Exception("Failed to insert booking into the database.") from e
-
-        return "Booking successfully made."
+    await orm_insert_booking_on_conflict_do_nothing(session, telegram_id, date, desk_id=desk_id)
+    return "Booking successfully made."
 
 
 async def orm_select_bookings_by_telegram_id_joined(session: AsyncSession, telegram_id: int):
@@ -845,6 +1152,105 @@ async def orm_select_bookings_by_team_id_joined_from_today(session: AsyncSession
         raise e
 
 
+#* Column-projected queries for the bookings lists (no ORM objects are hydrated)
+async def orm_select_booking_rows_by_telegram_id_from_today(session: AsyncSession, telegram_id: int):
+    """Returns (id, date, created_at, desk_name, room_name) rows of the user's bookings from today onwards."""
+    query = (
+        select(
+            Booking.id,
+            Booking.date,
+            Booking.created_at,
+            Desk.name.label('desk_name'),
+            Room.name.label('room_name'))
+        .join(Desk, Booking.desk_id == Desk.id)
+        .join(Room, Desk.room_id == Room.id)
+        .where(Booking.telegram_id == telegram_id, Booking.date >= date.today())
+        .order_by(Booking.date)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_booking_rows_by_room_id_from_today(session: AsyncSession, room_id: int):
+    """Returns (date, desk_name, room_name, telegram_name) rows of the room's bookings from today onwards."""
+    query = (
+        select(
+            Booking.date,
+            Desk.name.label('desk_name'),
+            Room.name.label('room_name'),
+            User.telegram_name)
+        .join(Desk, Booking.desk_id == Desk.id)
+        .join(Room, Desk.room_id == Room.id)
+        .join(User, Booking.telegram_id == User.telegram_id)
+        .where(Desk.room_id == room_id, Booking.date >= date.today())
+        .order_by(Booking.date, Booking.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_booking_rows_by_team_id_from_today(session: AsyncSession, team_id: int, subtree: bool = False):
+    """
+    Returns (date, desk_name, room_name, telegram_name) rows of the team members' bookings from today onwards,
+    with subtree=True of the members of the sub-teams as well.
+    """
+    query = (
+        select(
+            Booking.date,
+            Desk.name.label('desk_name'),
+            Room.name.label('room_name'),
+            User.telegram_name)
+        .join(Desk, Booking.desk_id == Desk.id)
+        .join(Room, Desk.room_id == Room.id)
+        .join(User, Booking.telegram_id == User.telegram_id)
+        .join(UserRoleAssignment, User.telegram_id == UserRoleAssignment.telegram_id)
+        .where(_team_members_filter(team_id, subtree), Booking.date >= date.today())
+        .order_by(Booking.date, Booking.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_desk_assignment_rows_by_room_id(session: AsyncSession, room_id: int):
+    """Returns (weekday, desk_name, room_name, telegram_name) rows of active desk assignments in the room."""
+    query = (
+        select(
+            DeskAssignment.weekday,
+            Desk.name.label('desk_name'),
+            Room.name.label('room_name'),
+            User.telegram_name)
+        .join(Desk, DeskAssignment.desk_id == Desk.id)
+        .join(Room, Desk.room_id == Room.id)
+        .join(User, DeskAssignment.telegram_id == User.telegram_id)
+        .where(Desk.room_id == room_id, User.is_out_of_office.is_(False)) # Only include users that are not out of office
+        .order_by(DeskAssignment.weekday, DeskAssignment.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_desk_assignment_rows_by_team_id(session: AsyncSession, team_id: int, subtree: bool = False):
+    """
+    Returns (weekday, desk_name, room_name, telegram_name) rows of active desk assignments of the team members,
+    with subtree=True of the members of the sub-teams as well.
+    """
+    query = (
+        select(
+            DeskAssignment.weekday,
+            Desk.name.label('desk_name'),
+            Room.name.label('room_name'),
+            User.telegram_name)
+        .join(Desk, DeskAssignment.desk_id == Desk.id)
+        .join(Room, Desk.room_id == Room.id)
+        .join(User, DeskAssignment.telegram_id == User.telegram_id)
+        .join(UserRoleAssignment, User.telegram_id == UserRoleAssignment.telegram_id)
+        .where(_team_members_filter(team_id, subtree), User.is_out_of_office.is_(False))
+        .order_by(DeskAssignment.weekday, DeskAssignment.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
 async def orm_select_bookings_by_telegram_id(session: AsyncSession, telegram_id: int):
     query = select(Booking).where(Booking.telegram_id == telegram_id).order_by(Booking.date)
     result = await session.execute(query)
@@ -896,7 +1302,368 @@ async def orm_select_bookings_by_date(session: AsyncSession, date: date):
     return result.scalars().all()
 
 
-async def orm_delete_booking_by_id(session: AsyncSession, booking_id: int):
-    query = delete(Booking).where(Booking.id == booking_id)
-    await session.execute(query)
-    await session.commit()
\ No newline at end of file
+async def orm_select_bookings_page(
+    session: AsyncSession,
+    limit: int,
+    before: Optional[Tuple[date, int]] = None,
+    after: Optional[Tuple[date, int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    room_id: Optional[int] = None,
+    desk_id: Optional[int] = None,
+    telegram_id: Optional[int] = None,
+    team_id: Optional[int] = None):
+    """
+    Returns up to limit rows of id, date, desk, room and telegram_name of the filtered bookings,
+    with keyset pagination on (date, id), so a page costs the same however deep it is in the history:
+    - before=(date, id) of the last row of a page selects the older bookings, newest first;
+    - after=(date, id) of the first row of a page selects the newer bookings, oldest first (reverse them to show).
+    Without a key the newest bookings are returned.
+    """
+    key = tuple_(Booking.date, Booking.id)
+    query = (
+        select(
+            Booking.id,
+            Booking.date,
+            Desk.name.label('desk'),
+            Room.name.label('room'),
+            User.telegram_name).
+        join(Desk, Booking.desk_id == Desk.id).
+        join(Room, Desk.room_id == Room.id).
+        join(User, Booking.telegram_id == User.telegram_id)
+    )
+    if start_date is not None:
+        query = query.where(Booking.date >= start_date)
+    if end_date is not None:
+        query = query.where(Booking.date <= end_date)
+    if room_id is not None:
+        query = query.where(Desk.room_id == room_id)
+    if desk_id is not None:
+        query = query.where(Booking.desk_id == desk_id)
+    if telegram_id is not None:
+        query = query.where(Booking.telegram_id == telegram_id)
+    if team_id is not None:
+        query = (
+            query.
+            join(UserRoleAssignment, UserRoleAssignment.telegram_id == Booking.telegram_id).
+            where(UserRoleAssignment.team_id == team_id)
+        )
+    if after is not None:
+        query = query.where(key > tuple_(*after)).order_by(Booking.date, Booking.id)
+    else:
+        if before is not None:
+            query = query.where(key < tuple_(*before))
+        query = query.order_by(Booking.date.desc(), Booking.id.desc())
+    result = await session.execute(query.limit(limit))
+    return result.all()
+
+
+async def orm_delete_booking_by_id(session: AsyncSession, booking_id: int, timezone: Optional[str] = None):
+    query = delete(Booking).where(Booking.id == booking_id).returning(Booking.date, Booking.desk_id, Booking.telegram_id)
+    result = await session.execute(query)
+    await _record_booking_cancellations(session, result.all(), local_today(timezone))
+    await session.commit()
+    occupancy_matrix.mark_cancelled(booking_id)
+    await view_cache.bump_version()
+
+
+#* Bulk import queries (see app/services/admin/bulk_import.py)
+BULK_INSERT_CHUNK_SIZE = 500 # Rows per INSERT statement, well below the bind parameter limits of SQLite and asyncpg
+
+
+async def orm_bulk_insert_on_conflict_do_nothing(
+    session: AsyncSession,
+    model: type,
+    rows: List[dict],
+    returning: tuple) -> List[tuple]:
+    """
+    Inserts the rows with multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING statements in one transaction.
+    Rows that violate a unique constraint are skipped.
+
+    Returns the `returning` columns of the inserted rows.
+    """
+    insert = _insert_for_dialect(session)
+    inserted = []
+    try:
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            query = (
+                insert(model).
+                values(rows[start:start + BULK_INSERT_CHUNK_SIZE]).
+                on_conflict_do_nothing().
+                returning(*returning)
+            )
+            result = await session.execute(query)
+            inserted.extend(tuple(row) for row in result.all())
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise DeskBookerError(f"Failed to import {model.__tablename__}: {str(e)}") from e
+    if inserted:
+        occupancy_matrix.invalidate()
+        await view_cache.bump_version()
+    return inserted
+
+
+async def orm_select_room_ids_by_names(session: AsyncSession, room_names: List[str]) -> dict:
+    query = select(Room.name, Room.id).where(Room.name.in_(room_names))
+    result = await session.execute(query)
+    return dict(result.all())
+
+
+async def orm_select_desk_ids_by_names(session: AsyncSession, desk_names: List[str]) -> dict:
+    query = select(Desk.name, Desk.id).where(Desk.name.in_(desk_names))
+    result = await session.execute(query)
+    return dict(result.all())
+
+
+async def orm_select_telegram_ids_by_telegram_names(session: AsyncSession, telegram_names: List[str]) -> dict:
+    query = select(User.telegram_name, User.telegram_id).where(User.telegram_name.in_(telegram_names))
+    result = await session.execute(query)
+    return dict(result.all())
+
+
+async def orm_select_existing_telegram_ids(session: AsyncSession, telegram_ids: List[int]) -> set:
+    query = select(User.telegram_id).where(User.telegram_id.in_(telegram_ids))
+    result = await session.execute(query)
+    return set(result.scalars().all())
+
+
+
+#* Bookings export queries (see app/services/admin/bookings_export.py)
+EXPORT_COLUMNS = (
+    "booking_id", "date", "telegram_id", "telegram_name", "first_name", "last_name", "team", "room", "desk")
+
+
+async def orm_stream_bookings_for_export(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    chunk_size: int = 1000) -> AsyncIterator[Row]:
+    """
+    Yields the bookings between start_date and end_date (inclusive), joined with their user, team, desk and room,
+    as rows of EXPORT_COLUMNS ordered by date and id.
+
+    The rows are read through a server-side cursor, chunk_size at a time, so memory use does not depend on the date range.
+    """
+    query = (
+        select(
+            Booking.id.label("booking_id"),
+            Booking.date,
+            User.telegram_id,
+            User.telegram_name,
+            User.first_name,
+            User.last_name,
+            Team.name.label("team"),
+            Room.name.label("room"),
+            Desk.name.label("desk")).
+        join(User, Booking.telegram_id == User.telegram_id).
+        join(Desk, Booking.desk_id == Desk.id).
+        join(Room, Desk.room_id == Room.id).
+        outerjoin(UserRoleAssignment, UserRoleAssignment.telegram_id == User.telegram_id).
+        outerjoin(Team, UserRoleAssignment.team_id == Team.id).
+        where(Booking.date.between(start_date, end_date)).
+        order_by(Booking.date, Booking.id).
+        execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(query)
+    try:
+        async for row in result:
+            yield row
+    finally:
+        await result.close()
+
+
+#* Analytics queries over booking_daily_stats (see app/services/admin/analytics.py)
+_SCOPE_COLUMNS = {
+    AnalyticsScope.ROOM: BookingDailyStat.room_id,
+    AnalyticsScope.DESK: BookingDailyStat.desk_id,
+    AnalyticsScope.USER: BookingDailyStat.telegram_id,
+    AnalyticsScope.TEAM: BookingDailyStat.team_id,
+}
+
+
+def _booking_stats_filter(start_date: date, end_date: date, scope: AnalyticsScope, scope_id: Optional[int]):
+    condition = BookingDailyStat.date.between(start_date, end_date)
+    if scope is AnalyticsScope.ALL:
+        return condition
+    return and_(condition, _SCOPE_COLUMNS[scope] == scope_id)
+
+
+_booked_days = func.sum(BookingDailyStat.bookings - BookingDailyStat.cancellations)
+
+
+async def orm_select_booking_stats_totals(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None):
+    """Returns a row of booked_days (bookings that were not cancelled), bookings, cancellations, late_cancellations and users."""
+    query = (
+        select(
+            func.coalesce(_booked_days, 0).label('booked_days'),
+            func.coalesce(func.sum(BookingDailyStat.bookings), 0).label('bookings'),
+            func.coalesce(func.sum(BookingDailyStat.cancellations), 0).label('cancellations'),
+            func.coalesce(func.sum(BookingDailyStat.late_cancellations), 0).label('late_cancellations'),
+            func.count(func.distinct(BookingDailyStat.telegram_id)).label('users')).
+        where(_booking_stats_filter(start_date, end_date, scope, scope_id))
+    )
+    result = await session.execute(query)
+    return result.one()
+
+
+async def orm_select_booked_days_by_weekday(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None) -> dict:
+    """Returns {Weekday: booked days}, only for the weekdays with bookings."""
+    dow = func.extract('dow', BookingDailyStat.date) # 0 is Sunday
+    query = (
+        select(dow, _booked_days).
+        where(_booking_stats_filter(start_date, end_date, scope, scope_id)).
+        group_by(dow)
+    )
+    result = await session.execute(query)
+    return {Weekday((int(sql_dow) + 6) % 7): int(booked_days) for sql_dow, booked_days in result.all() if booked_days}
+
+
+async def orm_select_most_cancelled_desks(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None,
+    limit: int = 5):
+    """
+    Returns rows of desk, room, bookings, cancellations and late_cancellations for the desks with the most cancellations,
+    late (same-day) cancellations first.
+    """
+    cancellations = func.sum(BookingDailyStat.cancellations)
+    late_cancellations = func.sum(BookingDailyStat.late_cancellations)
+    desk_stats = (
+        select(
+            BookingDailyStat.desk_id,
+            func.sum(BookingDailyStat.bookings).label('bookings'),
+            cancellations.label('cancellations'),
+            late_cancellations.label('late_cancellations')).
+        where(_booking_stats_filter(start_date, end_date, scope, scope_id)).
+        group_by(BookingDailyStat.desk_id).
+        having(cancellations > 0).
+        order_by(late_cancellations.desc(), cancellations.desc(), BookingDailyStat.desk_id).
+        limit(limit).
+        subquery()
+    )
+    query = (
+        select(
+            Desk.name.label('desk'),
+            Room.name.label('room'),
+            desk_stats.c.bookings,
+            desk_stats.c.cancellations,
+            desk_stats.c.late_cancellations).
+        join(Desk, Desk.id == desk_stats.c.desk_id).
+        join(Room, Room.id == Desk.room_id).
+        order_by(desk_stats.c.late_cancellations.desc(), desk_stats.c.cancellations.desc(), Desk.id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_select_top_users_by_booked_days(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None,
+    limit: int = 5):
+    """Returns rows of telegram_name and booked_days for the users with the most booked days."""
+    user_stats = (
+        select(BookingDailyStat.telegram_id, _booked_days.label('booked_days')).
+        where(_booking_stats_filter(start_date, end_date, scope, scope_id)).
+        group_by(BookingDailyStat.telegram_id).
+        having(_booked_days > 0).
+        order_by(_booked_days.desc(), BookingDailyStat.telegram_id).
+        limit(limit).
+        subquery()
+    )
+    query = (
+        select(User.telegram_name, user_stats.c.booked_days).
+        join(User, User.telegram_id == user_stats.c.telegram_id).
+        order_by(user_stats.c.booked_days.desc(), User.telegram_id)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def orm_count_analytics_capacity(
+    session: AsyncSession,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None) -> int:
+    """
+    Returns how many desks can be booked per day in the room or the office (1 for a desk),
+    or how many people can book per day in the team (1 for a user).
+    """
+    if scope in (AnalyticsScope.DESK, AnalyticsScope.USER):
+        return 1
+    if scope is AnalyticsScope.TEAM:
+        query = select(func.count()).select_from(UserRoleAssignment).where(UserRoleAssignment.team_id == scope_id)
+    else:
+        query = (
+            select(func.count(Desk.id)).
+            join(Room, Desk.room_id == Room.id).
+            where(Desk.is_available == True, Room.is_available == True)
+        )
+        if scope is AnalyticsScope.ROOM:
+            query = query.where(Desk.room_id == scope_id)
+    result = await session.execute(query)
+    return result.scalar_one()
+
+
+async def orm_backfill_booking_daily_stats(session: AsyncSession) -> int:
+    """
+    Counts the bookings missing from booking_daily_stats, e.g. the ones inserted by scripts.
+    Scans all bookings: a one-off maintenance tool, not for the request path.
+    Returns the number of rows added.
+    """
+    insert = _insert_for_dialect(session)
+    query = (
+        insert(BookingDailyStat).
+        from_select(
+            ['date', 'desk_id', 'telegram_id', 'room_id', 'team_id', 'bookings', 'cancellations', 'late_cancellations'],
+            _booking_stats_rows(Booking.__table__, true())). # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+        on_conflict_do_nothing()
+    )
+    result = await session.execute(query)
+    await session.commit()
+    return result.rowcount
+
+
+async def orm_record_booking_cancellations(
+    session: AsyncSession,
+    cancelled: List[Tuple[date, int, int]],
+    timezone: Optional[str] = None) -> None:
+    """
+    Counts bookings deleted without orm_delete_booking_by_id (e.g. in sqladmin), rows of (date, desk_id, telegram_id),
+    as cancellations in booking_daily_stats.
+    """
+    await _record_booking_cancellations(session, cancelled, local_today(timezone))
+    await session.commit()
+
+
+async def orm_record_booking_change(
+    session: AsyncSession,
+    booking: Booking,
+    previous: Optional[Tuple[date, int, int]] = None,
+    timezone: Optional[str] = None) -> None:
+    """
+    Counts a booking created or edited without orm_insert_booking_on_conflict_do_nothing (e.g. in sqladmin)
+    in booking_daily_stats. `previous` is the (date, desk_id, telegram_id) of an edited booking before the edit:
+    moving the booking counts as a cancellation of the old key and a booking of the new one.
+    """
+    if previous is not None:
+        if previous == (booking.date, booking.desk_id, booking.telegram_id):
+            return
+        await _record_booking_cancellations(session, [previous], local_today(timezone))
+    await _record_booking(session, booking)
+    await session.commit()
@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Statements executed and time spent in the database while tracking (e.g. during one update)."""
+    name: str
+    router: Optional[str] = None
+    statements: int = 0
+    db_time: float = 0.0 # seconds
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+
+@dataclass(slots=True)
+class HandlerQueryStats:
+    """Totals of all tracked updates handled by one handler."""
+    updates: int = 0
+    statements: int = 0
+    db_time: float = 0.0
+    max_statements: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "updates": self.updates,
+            "statements": self.statements,
+            "db_time": round(self.db_time, 6),
+            "max_statements": self.max_statements,
+            "statements_per_update": round(self.statements / self.updates, 2) if self.updates else 0.0,
+        }
+
+
+# Stats of the update being processed. Trackings can be nested (e.g. a test step around an update),
+# then every statement is counted in all of them
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('current_query_stats', default=None)
+
+
+class QueryStatsRegistry:
+    """
+    Counts SQL statements and database time per handler.
+
+    Engines are instrumented with SQLAlchemy's before/after_cursor_execute events (see get_engine),
+    statements are attributed to the QueryStats in current_query_stats, and when the tracking ends
+    the stats are added to the totals of its name (the handler).
+    """
+    def __init__(self) -> None:
+        self._handlers: Dict[str, HandlerQueryStats] = {}
+
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[QueryStats]:
+        stats = QueryStats(name=name, parent=current_query_stats.get())
+        token = current_query_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            current_query_stats.reset(token)
+            self._add(stats)
+
+
+    def _add(self, stats: QueryStats) -> None:
+        totals = self._handlers.setdefault(stats.name, HandlerQueryStats())
+        totals.updates += 1
+        totals.statements += stats.statements
+        totals.db_time += stats.db_time
+        totals.max_statements = max(totals.max_statements, stats.statements)
+
+
+    @staticmethod
+    def record(elapsed: float) -> None:
+        stats = current_query_stats.get()
+        while stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+            stats = stats.parent
+
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Returns the totals per handler, the handlers with the most statements first."""
+        return {
+            name: totals.to_dict()
+            for name, totals in sorted(self._handlers.items(), key=lambda item: -item[1].statements)
+        }
+
+
+    def reset(self) -> None:
+        self._handlers.clear()
+
+
+query_stats = QueryStatsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info['query_start_time'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    query_stats.record(time.perf_counter() - conn.info.pop('query_start_time'))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attributes the statements executed by the engine to the current QueryStats. Calling it again is a no-op."""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
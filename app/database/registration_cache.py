@@ -0,0 +1,122 @@
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.database.enums.registration_statuses import RegistrationStatus
+from app.utils.logger import Logger
+
+
+logger = Logger('registration_cache')
+
+
+class RegistrationCache:
+    """
+    Cache of users' registration statuses used by UserMiddleware.
+
+    The first tier is an in-process LRU with a short TTL, the optional second tier is Redis,
+    which is shared by all bot processes and keeps the statuses longer.
+    Admin services that add or delete users invalidate the entries explicitly;
+    the TTLs bound the staleness of changes made elsewhere (e.g. in sqladmin).
+    """
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.maxsize: int = 10000
+        self.ttl: float = 60.0
+        self.redis: Optional[Redis] = None
+        self.redis_ttl: int = 600
+        self._entries: "OrderedDict[int, Tuple[RegistrationStatus, float]]" = OrderedDict()
+
+
+    def configure(
+        self,
+        redis: Optional[Redis] = None,
+        maxsize: int = 10000,
+        ttl: float = 60.0,
+        redis_ttl: int = 600,
+        ) -> None:
+        """Enables the cache. If redis is None, only the in-process tier is used."""
+        self.enabled = True
+        self.redis = redis
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self._entries.clear()
+
+
+    @staticmethod
+    def _redis_key(telegram_id: int) -> str:
+        return f"registration:{telegram_id}"
+
+
+    async def get(self, telegram_id: int) -> Optional[RegistrationStatus]:
+        """Returns the cached status, or None on a cache miss."""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(telegram_id)
+        if entry is not None:
+            status, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(telegram_id)
+                return status
+            del self._entries[telegram_id]
+        if self.redis is None:
+            return None
+        try:
+            value = await self.redis.get(self._redis_key(telegram_id))
+        except RedisError as e:
+            logger.warning(f"Registration cache: Redis get failed: {e}")
+            return None
+        if value is None:
+            return None
+        status = RegistrationStatus(value.decode() if isinstance(value, bytes) else value)
+        self._set_local(telegram_id, status)
+        return status
+
+
+    async def set(self, telegram_id: int, status: RegistrationStatus) -> None:
+        if not self.enabled:
+            return
+        self._set_local(telegram_id, status)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(telegram_id), status.value, ex=self.redis_ttl)
+        except RedisError as e:
+            logger.warning(f"Registration cache: Redis set failed: {e}")
+
+
+    async def invalidate(self, telegram_id: int) -> None:
+        """Drops the user's status from both tiers."""
+        self._entries.pop(telegram_id, None)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._redis_key(telegram_id))
+        except RedisError as e:
+            logger.warning(f"Registration cache: Redis delete failed: {e}")
+
+
+    async def invalidate_many(self, telegram_ids: List[int]) -> None:
+        """Drops the statuses of all given users, with a single Redis DEL."""
+        for telegram_id in telegram_ids:
+            self._entries.pop(telegram_id, None)
+        if self.redis is None or not telegram_ids:
+            return
+        try:
+            await self.redis.delete(*(self._redis_key(telegram_id) for telegram_id in telegram_ids))
+        except RedisError as e:
+            logger.warning(f"Registration cache: Redis delete failed: {e}")
+
+
+    def _set_local(self, telegram_id: int, status: RegistrationStatus) -> None:
+        self._entries[telegram_id] = (status, time.monotonic() + self.ttl)
+        self._entries.move_to_end(telegram_id)
+        # Evict the least recently used entries
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+registration_cache = RegistrationCache()
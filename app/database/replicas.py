@@ -0,0 +1,169 @@
+import time
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.database.engine import get_session_pool
+from app.database.session_writes import track_session_writes
+from app.utils.logger import Logger
+
+
+logger = Logger('replicas')
+
+
+class ReplicaRouter:
+    """
+    Routes the read-only sessions to the read replicas (DB_REPLICA_URLS), round robin.
+
+    Bot updates get a session on a replica in data['read_session'] (see DataBaseSession), which the getters,
+    the bookings lists, the analytics and the exports use. The writes keep using data['session'] on the primary.
+    A replica lags behind the primary, so the reads of a user who has written within the last `window` seconds
+    go to the primary (read-your-writes): the user sees their booking right after making it.
+
+    The recent writers are kept in-process and, if Redis is configured, in Redis with the window as TTL,
+    so every bot process routes the user's next updates to the primary.
+    """
+    def __init__(self) -> None:
+        self.engines: List[AsyncEngine] = []
+        self.session_pools: List[async_sessionmaker[AsyncSession]] = []
+        self.window: float = 5.0
+        self.redis: Optional[Redis] = None
+        self.maxsize: int = 10000
+        self._writers: Dict[Hashable, float] = {} # writer -> monotonic time until which their reads stay on the primary
+        self._next: int = 0
+
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+
+    def configure(
+        self,
+        engines: Sequence[AsyncEngine],
+        window: float = 5.0,
+        redis: Optional[Redis] = None,
+        maxsize: int = 10000,
+        ) -> None:
+        """Enables the routing to the replica engines. If redis is None, the recent writers are kept in-process only."""
+        self.engines = list(engines)
+        self.session_pools = [get_session_pool(engine) for engine in self.engines]
+        self.window = window
+        self.redis = redis
+        self.maxsize = maxsize
+        self._writers.clear()
+        track_session_writes()
+
+
+    def _pick(self) -> int:
+        index = self._next % len(self.engines)
+        self._next += 1
+        return index
+
+
+    def replica_engine(self) -> AsyncEngine:
+        return self.engines[self._pick()]
+
+
+    def read_session_pool(self, primary: async_sessionmaker[AsyncSession]) -> async_sessionmaker[AsyncSession]:
+        """Returns the session pool of the next replica, or `primary` if no replicas are configured."""
+        if not self.enabled:
+            return primary
+        return self.session_pools[self._pick()]
+
+
+    @staticmethod
+    def _redis_key(writer: Hashable) -> str:
+        return f"replicas:writer:{writer}"
+
+
+    def wrote_recently_locally(self, writer: Hashable) -> bool:
+        expires_at = self._writers.get(writer)
+        if expires_at is None:
+            return False
+        if expires_at > time.monotonic():
+            return True
+        del self._writers[writer]
+        return False
+
+
+    async def wrote_recently(self, writer: Hashable) -> bool:
+        """Whether the writer has written through the primary within the window, in this process or (with Redis) in any."""
+        if self.wrote_recently_locally(writer):
+            return True
+        if self.redis is None:
+            return False
+        try:
+            return bool(await self.redis.exists(self._redis_key(writer)))
+        except RedisError as e:
+            logger.warning(f"Replicas: Redis exists failed: {e}")
+            # Without the shared record the primary is the safe choice
+            return True
+
+
+    def mark_write_locally(self, writer: Hashable) -> None:
+        now = time.monotonic()
+        if len(self._writers) >= self.maxsize:
+            # Drop the expired writers, then the oldest ones
+            for key in [key for key, expires_at in self._writers.items() if expires_at <= now]:
+                del self._writers[key]
+            while len(self._writers) >= self.maxsize:
+                del self._writers[next(iter(self._writers))]
+        self._writers.pop(writer, None)
+        self._writers[writer] = now + self.window
+
+
+    async def mark_write(self, writer: Hashable) -> None:
+        """Keeps the writer's reads on the primary for the window."""
+        self.mark_write_locally(writer)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(writer), 1, px=int(self.window * 1000))
+        except RedisError as e:
+            logger.warning(f"Replicas: Redis set failed: {e}")
+
+
+replica_router = ReplicaRouter()
+
+
+class ReplicaRoutingSession(Session):
+    """
+    Session for generic tools such as sqladmin, which read and write through the same session: the flushes
+    and DML statements go to the primary (the session's bind), the other statements to one of the replicas.
+    After a write of this process the reads stay on the primary for the window, so e.g. the list page shown
+    after saving an object includes the change.
+    """
+    WRITER = 'routing_session'
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # One replica per session, so a session holds at most two connections
+        self._replica: Optional[Engine] = replica_router.replica_engine().sync_engine if replica_router.enabled else None
+
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._replica is None:
+            return primary
+        if self._flushing or (clause is not None and clause.is_dml):
+            replica_router.mark_write_locally(self.WRITER)
+            return primary
+        if replica_router.wrote_recently_locally(self.WRITER):
+            return primary
+        return self._replica
+
+
+def get_routing_session_pool(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Session pool (factory) of ReplicaRoutingSession sessions, writing to `engine`."""
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        sync_session_class=ReplicaRoutingSession,
+    )
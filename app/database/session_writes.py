@@ -0,0 +1,63 @@
+"""
+Tracking of the writes of ORM sessions, in Session.info.
+
+WROTE stays set for the session's lifetime: the replica routing keeps the reads of a user who has written
+on the primary (see app/database/replicas.py). UNCOMMITTED_WRITES is set until the transaction is committed
+or rolled back: release_if_read_only() only ends the transactions without writes, before the Telegram API calls
+(see SessionReleaseMiddleware) and before fan_out() opens its own sessions.
+"""
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+WROTE = 'wrote'
+UNCOMMITTED_WRITES = 'uncommitted_writes'
+
+
+def _after_execute(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE] = True
+        orm_execute_state.session.info[UNCOMMITTED_WRITES] = True
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    session.info[WROTE] = True
+    session.info[UNCOMMITTED_WRITES] = True
+
+
+def _after_transaction_end(session: Session) -> None:
+    session.info.pop(UNCOMMITTED_WRITES, None)
+
+
+def track_session_writes() -> None:
+    """
+    Sets Session.info['wrote'] and Session.info['uncommitted_writes'] in the sessions that execute DML or flush,
+    and clears the latter when the transaction is committed or rolled back. Calling it again is a no-op.
+    """
+    if event.contains(Session, 'do_orm_execute', _after_execute):
+        return
+    event.listen(Session, 'do_orm_execute', _after_execute)
+    event.listen(Session, 'after_flush', _after_flush)
+    event.listen(Session, 'after_commit', _after_transaction_end)
+    event.listen(Session, 'after_rollback', _after_transaction_end)
+
+
+async def release_if_read_only(session: AsyncSession) -> None:
+    """
+    Rolls back the session's transaction if it is read-only, so that its pooled connection is returned to the pool.
+    A transaction with writes (executed DML, pending or flushed changes) is left as it is: its owner commits it.
+
+    The rollback would expire the loaded ORM objects, and an expired attribute can't be loaded implicitly
+    by an AsyncSession. So the objects are detached for the rollback and attached again: the handler keeps using them,
+    their loaded attributes stay readable, lazy loads work and their changes are flushed by the next commit.
+    The session holds no connection until its next statement.
+    """
+    if not session.in_transaction():
+        return
+    if session.info.get(UNCOMMITTED_WRITES) or session.new or session.dirty or session.deleted:
+        return
+    loaded = list(session.identity_map.values())
+    session.expunge_all()
+    await session.rollback()
+    session.add_all(loaded)
@@ -0,0 +1,113 @@
+"""
+Maintenance of the team_closure table (see TeamClosure in app/database/models.py).
+
+The closure is rebuilt from team_tree with a recursive query whenever team_tree edges are written, or teams are
+added or deleted, through an ORM session (the sqladmin views, the bot), so the team views read it with a plain indexed join.
+Other team writes (e.g. renames) leave the closure alone.
+On PostgreSQL the rebuild locks team_closure first, so concurrent rebuilds run one after another: otherwise both
+would delete the rows they see and then insert the same primary keys. Reads of the closure are not blocked.
+Writes that bypass the ORM (Core inserts, raw SQL) must call orm_rebuild_team_closure() afterwards.
+Team hierarchies change rarely and have hundreds of rows at most, so a full rebuild costs less than
+tracking the paths through teams with several parents edge by edge.
+"""
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Executable, and_, delete, event, func, insert, literal, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.database.models import Team, TeamTree, TeamClosure
+
+
+class TeamTreeCycleError(ValueError):
+    pass
+
+
+def team_closure_statements(dialect_name: str) -> List[Executable]:
+    """
+    Returns the statements that rebuild team_closure: DELETE of all rows, then INSERT ... WITH RECURSIVE ... SELECT.
+    On PostgreSQL they are preceded by LOCK TABLE (SQLite serializes the writers anyway).
+    """
+    teams = Team.__table__
+    tree = TeamTree.__table__
+    closure = TeamClosure.__table__
+    paths = (
+        select(
+            teams.c.id.label('ancestor_team_id'),
+            teams.c.id.label('descendant_team_id'),
+            literal(0).label('depth')).
+        cte('paths', recursive=True)
+    )
+    # A path is never longer than the number of teams, which also stops the recursion on a cycle
+    max_depth = select(func.count()).select_from(teams).scalar_subquery()
+    paths = paths.union_all(
+        select(
+            paths.c.ancestor_team_id,
+            tree.c.child_team_id,
+            paths.c.depth + 1).
+        join(tree, tree.c.parent_team_id == paths.c.descendant_team_id).
+        where(paths.c.depth < max_depth)
+    )
+    shortest_paths = (
+        select(paths.c.ancestor_team_id, paths.c.descendant_team_id, func.min(paths.c.depth)).
+        group_by(paths.c.ancestor_team_id, paths.c.descendant_team_id)
+    )
+    statements: List[Executable] = []
+    if dialect_name == 'postgresql':
+        statements.append(text(f"LOCK TABLE {closure.name} IN EXCLUSIVE MODE"))
+    statements.append(delete(closure))
+    statements.append(insert(closure).from_select(['ancestor_team_id', 'descendant_team_id', 'depth'], shortest_paths))
+    return statements
+
+
+def team_tree_cycle_query(edges: Optional[List[Tuple[int, int]]] = None):
+    """
+    Selects an edge of team_tree whose child is also an ancestor of its parent, i.e. an edge that closes a cycle.
+    If edges, (parent_team_id, child_team_id) pairs, are given, only these edges are checked.
+    """
+    tree = TeamTree.__table__
+    closure = TeamClosure.__table__
+    query = (
+        select(tree.c.parent_team_id, tree.c.child_team_id).
+        join(closure, and_(
+            closure.c.ancestor_team_id == tree.c.child_team_id,
+            closure.c.descendant_team_id == tree.c.parent_team_id))
+    )
+    if edges is not None:
+        query = query.where(tuple_(tree.c.parent_team_id, tree.c.child_team_id).in_(edges))
+    return query.limit(1)
+
+
+def _changes_team_tree(session: Session) -> bool:
+    """Whether the flush writes team_tree edges, or adds or deletes teams (a team is its own ancestor in the closure)."""
+    return (
+        any(isinstance(instance, (Team, TeamTree)) for instance in (*session.new, *session.deleted))
+        or any(isinstance(instance, TeamTree) for instance in session.dirty)
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    if not _changes_team_tree(session):
+        return
+    connection = session.connection()
+    for statement in team_closure_statements(connection.dialect.name):
+        connection.execute(statement)
+    # Only the edges written in this flush can close a new cycle, so the error names the edge being added
+    edges = [
+        (instance.parent_team_id, instance.child_team_id)
+        for instance in (*session.new, *session.dirty)
+        if isinstance(instance, TeamTree)
+    ]
+    if not edges:
+        return
+    cycle = connection.execute(team_tree_cycle_query(edges)).first()
+    if cycle is not None:
+        raise TeamTreeCycleError(
+            f"Team {cycle.child_team_id} cannot be a sub-team of team {cycle.parent_team_id}: "
+            f"it is already its parent team or one of its ancestors.")
+
+
+def track_team_tree_writes() -> None:
+    """Rebuilds team_closure in the flushes that change the team tree. Calling it again is a no-op."""
+    if event.contains(Session, 'after_flush', _after_flush):
+        return
+    event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,143 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.utils.logger import Logger
+
+
+logger = Logger('view_cache')
+
+
+class ViewCache:
+    """
+    Cache of rendered bookings views ("all bookings", "team bookings", "my bookings").
+
+    Entries are keyed by (scope, id, locale, date formats, source, ...) together with the current data version and today's date.
+    The source (see source_of) keeps the views rendered from a lagging replica away from the readers routed to the primary,
+    which would otherwise get a list without their own booking (read-your-writes).
+    The data version is bumped by every booking, desk assignment and out-of-office write, and by the renames,
+    deletions and availability toggles of rooms and desks (see orm_queries), so a write makes all existing entries unreachable and they are evicted by the LRU or expire.
+
+    The first tier is in-process. If Redis is configured, the data version and the rendered views
+    are stored in Redis as well, so all bot replicas see the same version and share the entries.
+    The TTL bounds the staleness of writes made outside of the bot (e.g. in sqladmin).
+    """
+    VERSION_KEY = "view_cache:version"
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.maxsize: int = 1000
+        self.ttl: float = 300.0
+        self.redis: Optional[Redis] = None
+        self._version: int = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+
+    def configure(self, redis: Optional[Redis] = None, maxsize: int = 1000, ttl: float = 300.0) -> None:
+        """Enables the cache. If redis is None, only the in-process tier is used."""
+        self.enabled = True
+        self.redis = redis
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries.clear()
+
+
+    async def get_version(self) -> int:
+        if self.redis is not None:
+            try:
+                version = await self.redis.get(self.VERSION_KEY)
+                return int(version) if version is not None else 0
+            except RedisError as e:
+                logger.warning(f"View cache: Redis get failed: {e}")
+        return self._version
+
+
+    async def bump_version(self) -> None:
+        """Invalidates all rendered views. Called after the writes to bookings, desk assignments, users, rooms and desks."""
+        self._version += 1
+        if not self.enabled:
+            return
+        # Entries of older versions can't be reached anymore
+        self._entries.clear()
+        if self.redis is not None:
+            try:
+                await self.redis.incr(self.VERSION_KEY)
+            except RedisError as e:
+                logger.warning(f"View cache: Redis incr failed: {e}")
+
+
+    async def get_or_render(self, key_parts: Tuple, render: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the cached view for key_parts, or renders it with `render` and caches the result.
+        The rendered value must be JSON serializable; tuples are returned as lists from Redis, so they are converted back.
+        """
+        if not self.enabled:
+            return await render()
+
+        version = await self.get_version()
+        key = json.dumps([version, date.today().isoformat(), *key_parts], default=str)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                cached = await self.redis.get(f"view_cache:{key}")
+            except RedisError as e:
+                logger.warning(f"View cache: Redis get failed: {e}")
+                cached = None
+            if cached is not None:
+                value = json.loads(cached)
+                value = tuple(value) if isinstance(value, list) else value
+                self._set_local(key, value)
+                return value
+
+        value = await render()
+        if not _is_cacheable(value):
+            return value
+        self._set_local(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(f"view_cache:{key}", json.dumps(value), ex=int(self.ttl))
+            except RedisError as e:
+                logger.warning(f"View cache: Redis set failed: {e}")
+        return value
+
+
+    def _set_local(self, key: str, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        # Evict the least recently used entries
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _is_cacheable(value: Any) -> bool:
+    """Error responses are not cached."""
+    if isinstance(value, tuple):
+        return value[0] != "error"
+    return not (isinstance(value, str) and value.startswith("Error"))
+
+
+def locale_of(i18n: Any) -> str:
+    """Returns the locale of the TranslatorRunner, used as a part of the cache key."""
+    translators = getattr(i18n, 'translators', None)
+    return translators[0].locale if translators else ''
+
+
+def source_of(session: Any) -> str:
+    """Returns the database the session reads from ('replica' or 'primary'), used as a part of the cache key."""
+    return 'replica' if getattr(session, 'on_replica', False) else 'primary'
+
+
+view_cache = ViewCache()
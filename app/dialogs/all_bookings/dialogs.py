@@ -6,6 +6,7 @@ from aiogram_dialog.widgets.kbd import (
     Cancel,
     Back,
     Group,
+    Button,
 )
 from aiogram_dialog.widgets.text import Format
 
@@ -13,6 +14,8 @@ from app.states.states import AllBookings
 
 from app.dialogs.all_bookings.handlers import (
     selected_room,
+    selected_previous_page,
+    selected_next_page,
 )
 from app.dialogs.all_bookings.getters import (
     get_rooms,
@@ -45,6 +48,16 @@ all_bookings_dialog = Dialog(
         Format(text='{empty}', when='empty'),
         Format(text='{error}', when='error'),
         Format(text='{bookings}', when='bookings'),
+        Row(
+            Button(Format(text='{button-page-previous}'),
+                   id='previous_page',
+                   when='button-page-previous',
+                   on_click=selected_previous_page),
+            Button(Format(text='{button-page-next}'),
+                   id='next_page',
+                   when='button-page-next',
+                   on_click=selected_next_page),
+        ),
         Row(
             Back(Format(text='{button-back}'), when='button-back'),
             Cancel(Format(text='{button-exit}'), when='button-exit'),
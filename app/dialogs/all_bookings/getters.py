@@ -4,6 +4,7 @@ from aiogram_dialog import DialogManager
 from fluentogram import TranslatorRunner # type: ignore
 from app.services.common.rooms_list_generator import generate_available_rooms_as_list_of_tuples
 from app.services.bookings_list_generator import  generate_current_bookings_list_by_room_id
+from app.services.common.pages_splitter import split_into_pages
 
 
 if TYPE_CHECKING:
@@ -13,7 +14,7 @@ if TYPE_CHECKING:
 async def get_rooms(dialog_manager: DialogManager,
                     i18n: TranslatorRunner,
                     **kwargs):
-    session = dialog_manager.middleware_data['session']
+    session = dialog_manager.middleware_data['read_session']
     rooms = await generate_available_rooms_as_list_of_tuples(session)
     if not rooms:
         return {'no-rooms': i18n.no.rooms(),
@@ -27,7 +28,7 @@ async def get_rooms(dialog_manager: DialogManager,
 async def get_bookings(dialog_manager: DialogManager,
                        i18n: TranslatorRunner,
                        **kwargs):
-    session = dialog_manager.middleware_data['session']
+    session = dialog_manager.middleware_data['read_session']
     room_id = int(dialog_manager.dialog_data['room_id'])
     c = dialog_manager.start_data['bot_operation_config']
     
@@ -50,20 +51,19 @@ async def get_bookings(dialog_manager: DialogManager,
                     'button-back': i18n.button.back(),
                     'button-exit': i18n.button.exit()}
     
-        elif status == "only-bookings":
-            return {'bookings': response,
-                    'button-back': i18n.button.back(),
-                    'button-exit': i18n.button.exit()}
-        
-        elif status == "only-assignments":
-            return {'bookings': response,
-                    'button-back': i18n.button.back(),
-                    'button-exit': i18n.button.exit()}
-        
-        elif status == "bookings-assignments":
-            return {'bookings': response,
+        # Statuses: "only-bookings", "only-assignments", "bookings-assignments"
+        else:
+            # Split long lists into pages to fit Telegram's message length limit
+            pages = split_into_pages(response)
+            page = min(int(dialog_manager.dialog_data.get('page', 0)), len(pages) - 1)
+            data = {'bookings': pages[page],
                     'button-back': i18n.button.back(),
                     'button-exit': i18n.button.exit()}
+            if page > 0:
+                data['button-page-previous'] = i18n.button.page.previous()
+            if page < len(pages) - 1:
+                data['button-page-next'] = i18n.button.page.next()
+            return data
     
     except Exception as e:
         return str(e)
\ No newline at end of file
@@ -27,7 +27,7 @@ async def get_rooms(dialog_manager: DialogManager,
                     i18n: TranslatorRunner,
                     **kwargs):
     # Get session from DataBaseSession middleware
-    session = dialog_manager.middleware_data['session']
+    session = dialog_manager.middleware_data['read_session']
     # TODO: Refactor to get list of tuples with room_id and room_name
     rooms = await generate_available_rooms_list(session)
     if not rooms:
@@ -10,10 +10,10 @@ from app.states.states import Booking
 
 from app.services.user.booking_checker import check_existing_booking
 from app.services.user.desk_assignment_checker import check_desk_assignment
-from app.services.common.room_plan_getter import get_room_plan_by_room_name
-from app.services.common.desks_list_generator import generate_desks_list
+from app.services.common.desks_list_generator import generate_desks_list_with_room_plan
 from app.services.user.desk_booker import desk_booker, desk_booker_random
-from app.database.orm_queries import DeskBookerError
+from app.database.orm_queries import DeskBookerError, BookingConflictError
+from app.database.enums.booking_conflicts import BookingConflict
 
 if TYPE_CHECKING:
     from app.locales.stub import TranslatorRunner # type: ignore
@@ -122,22 +122,22 @@ async def selected_room(query: CallbackQuery,
     date_format = str(c_ops['date_format'])
     # Get the advanced mode (boolean value) from the configuration
     advanced_mode = bool(c_ops['advanced_mode'])
-    # Get room_plan from the database
-    room_plan_url = await get_room_plan_by_room_name(session, room_name)
-    # Save room_plan_url to the dialog data
-    dialog_manager.dialog_data['room_plan_url'] = room_plan_url
     try:
         # If advanced mode is enabled, get standard access days number
         standard_access_days = int(c_adv['standard_access_days']) if advanced_mode else None
-        # Generate a list of available, not booked desks for the selected date and room, considering the standard access days if advanced mode is enabled
-        desks = await generate_desks_list(
+        # Get room_plan and a list of available, not booked desks for the selected date and room in a single query, considering the standard access days if advanced mode is enabled
+        room_plan_url, desks = await generate_desks_list_with_room_plan(
             session,
             room_name,
             date,
             date_format,
             advanced_mode,
             telegram_id,
-            standard_access_days)
+            standard_access_days,
+            c_ops['country_code'],
+            c_ops['timezone'])
+        # Save room_plan_url to the dialog data
+        dialog_manager.dialog_data['room_plan_url'] = room_plan_url
     except Exception as e:
         await query.message.edit_text(f"An error occurred: {e} while retrieving available desks. Please try again later.")
         await dialog_manager.done()
@@ -210,6 +210,14 @@ async def selected_desk(query: CallbackQuery,
         # Answer user with the booking result
         await query.answer(text=result, show_alert=True)
         await dialog_manager.switch_to(state=Booking.select_date)
+    except BookingConflictError as conflict:
+        # Answer user with the conflict message. If the user already has a booking on the date, switch to the select_date window,
+        # otherwise someone has booked the desk before, so switch to the select_room window
+        await query.answer(text=f'{conflict}', show_alert=True)
+        if conflict.conflict == BookingConflict.USER_HAS_BOOKING:
+            await dialog_manager.switch_to(state=Booking.select_date)
+        else:
+            await dialog_manager.switch_to(state=Booking.select_room)
     except DeskBookerError as no_desk:
         # In case of a race condition, answer user with the DeskBookerError message and switch to the select_room window
         await query.answer(text=f'{no_desk}', show_alert=True)
@@ -255,6 +263,8 @@ async def selected_random_booking(query: CallbackQuery,
             date_format,
             advanced_mode,
             standard_access_days,
+            c_ops['country_code'],
+            c_ops['timezone'],
         )
         # Answer user with the booking result
         await query.answer(text=result, show_alert=True)
@@ -11,7 +11,7 @@ if TYPE_CHECKING:
 
 async def get_bookings(dialog_manager: DialogManager, i18n: TranslatorRunner, event_from_user, **kwargs):
     # Get session from DataBaseSession middleware
-    session: AsyncSession = dialog_manager.middleware_data['session']
+    session: AsyncSession = dialog_manager.middleware_data['read_session']
     # Get the bot operation configuration
     config = dialog_manager.start_data['bot_operation_config']
     # Get the current bookings for the user as a list of tuples, where the first element is the booking ID, and the second is the booking data
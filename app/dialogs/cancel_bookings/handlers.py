@@ -29,6 +29,7 @@ async def selected_booking(query: CallbackQuery,
     session: AsyncSession = dialog_manager.middleware_data['session']
     # Get the selected booking_id
     booking_id = int(item_id)
-    await orm_delete_booking_by_id(session, booking_id)
+    timezone = dialog_manager.start_data['bot_operation_config']['timezone']
+    await orm_delete_booking_by_id(session, booking_id, timezone)
     await query.answer(text=i18n.cancel.booking.success())
     await dialog_manager.switch_to(state=CancelBookings.select_booking)
\ No newline at end of file
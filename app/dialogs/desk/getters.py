@@ -14,7 +14,7 @@ async def get_desk_assignment(dialog_manager: DialogManager,
                               i18n: TranslatorRunner,
                               event_from_user,
                               **kwargs):
-    session: AsyncSession = dialog_manager.middleware_data['session']
+    session: AsyncSession = dialog_manager.middleware_data['read_session']
     try:
         status, message = await check_desk_assignment_by_telegram_id(
         i18n,
@@ -1,11 +1,40 @@
+import asyncio
+from typing import TYPE_CHECKING, List, Set
+
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aiogram_dialog import DialogManager
 from aiogram_dialog.widgets.kbd import Select
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
 from aiogram.types import CallbackQuery
 
 from app.database.orm_queries import orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings
+from app.middlewares.db_middleware import current_read_session, current_session
 from app.states.states import Desk
+from app.utils.logger import Logger
+
+if TYPE_CHECKING:
+    from app.locales.stub import TranslatorRunner # type: ignore
+
+
+logger = Logger('desk_dialog')
+
+# Notifications sent in the background, referenced until they are done so they are not garbage collected
+_notification_tasks: Set[asyncio.Task] = set()
+
+
+async def _notify_cancelled_bookings(bot: Bot, cancelled: List[Row], text_by_date: dict) -> None:
+    """Tells the users whose bookings were on the desks assigned to a colleague coming back to the office."""
+    # The update's sessions are closed by now, there is nothing to release before the Telegram calls
+    current_session.set(None)
+    current_read_session.set(None)
+    for booking in cancelled:
+        try:
+            await bot.send_message(chat_id=booking.telegram_id, text=text_by_date[booking.date])
+        except TelegramAPIError as e:
+            logger.warning(f"Failed to notify {booking.telegram_id} of the cancelled booking {booking.id}: {e}")
 
 
 async def toggle_is_out_of_office_status(query: CallbackQuery,
@@ -13,7 +42,23 @@ async def toggle_is_out_of_office_status(query: CallbackQuery,
                                          dialog_manager: DialogManager,
                                          ) -> None:
     session: AsyncSession = dialog_manager.middleware_data['session']
-    await orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings(
+    i18n: TranslatorRunner = dialog_manager.middleware_data['i18n']
+    config = dialog_manager.start_data['bot_operation_config']
+    cancelled = await orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings(
         session,
-        telegram_id=query.from_user.id)
-    await dialog_manager.switch_to(state=Desk.main_menu)
\ No newline at end of file
+        telegram_id=query.from_user.id,
+        timezone=config['timezone'])
+    await dialog_manager.switch_to(state=Desk.main_menu)
+
+    cancelled = [booking for booking in cancelled if booking.telegram_id != query.from_user.id]
+    if not cancelled:
+        return
+    date_format = str(config['date_format'])
+    text_by_date = {
+        booking.date: i18n.desk.assignment.booking.cancelled(date=booking.date.strftime(date_format))
+        for booking in cancelled
+    }
+    # The user sees the main menu right away, however many colleagues are notified
+    task = asyncio.create_task(_notify_cancelled_bookings(query.bot, cancelled, text_by_date))
+    _notification_tasks.add(task)
+    task.add_done_callback(_notification_tasks.discard)
@@ -10,7 +10,10 @@ from aiogram_dialog.widgets.text import Format
 from app.states.states import Team
 
 from app.dialogs.team.handlers import (
-    selected_team_bookings
+    selected_team_bookings,
+    selected_team_subtree_bookings,
+    selected_previous_page,
+    selected_next_page,
 )
 from app.dialogs.team.getters import (
     get_team_info,
@@ -27,6 +30,10 @@ team_dialog = Dialog(
                    id='bookings',
                    when='team-info',
                    on_click=selected_team_bookings),
+        Button((Format(text='{team-button-subtree-bookings}')),
+                   id='subtree_bookings',
+                   when='team-button-subtree-bookings',
+                   on_click=selected_team_subtree_bookings),
         Cancel(Format(text='{button-exit}'), when='button-exit'),
         state=Team.main_menu,
         getter=get_team_info,
@@ -35,6 +42,16 @@ team_dialog = Dialog(
         Format(text='{empty}', when='empty'),
         Format(text='{error}', when='error'),
         Format(text='{bookings}', when='bookings'),
+        Row(
+            Button(Format(text='{button-page-previous}'),
+                   id='previous_page',
+                   when='button-page-previous',
+                   on_click=selected_previous_page),
+            Button(Format(text='{button-page-next}'),
+                   id='next_page',
+                   when='button-page-next',
+                   on_click=selected_next_page),
+        ),
         Row(
             Back(Format(text='{button-back}'), when='button-back'),
             Cancel(Format(text='{button-exit}'), when='button-exit'),
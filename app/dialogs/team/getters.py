@@ -4,6 +4,7 @@ from aiogram_dialog import DialogManager
 from fluentogram import TranslatorRunner # type: ignore
 from app.services.user.team_info_getter import get_team_info_service
 from app.services.bookings_list_generator import generate_current_bookings_list_by_team_id
+from app.services.common.pages_splitter import split_into_pages
 
 
 if TYPE_CHECKING:
@@ -14,15 +15,15 @@ async def get_team_info(dialog_manager: DialogManager,
                     i18n: TranslatorRunner,
                     event_from_user,
                     **kwargs):
-    session = dialog_manager.middleware_data['session']
+    session = dialog_manager.middleware_data['read_session']
     try:
         response = await get_team_info_service(i18n, session, telegram_id=event_from_user.id)
         
         if len(response) == 2:
             status, message = response
-            team_id = None
+            team_id, has_sub_teams = None, False
         else:
-            status, message, team_id = response
+            status, message, team_id, has_sub_teams = response
             
         if status == "empty":
             return {'empty': message,
@@ -34,9 +35,12 @@ async def get_team_info(dialog_manager: DialogManager,
         
         elif status == "team-info":
             dialog_manager.dialog_data['team_id'] = team_id
-            return {'team-info': message,
+            data = {'team-info': message,
                     'team-button-bookings': i18n.team.button.bookings(),
                     'button-exit': i18n.button.exit()}
+            if has_sub_teams:
+                data['team-button-subtree-bookings'] = i18n.team.button.subtree.bookings()
+            return data
         
     except Exception as e:
         return str(e)
@@ -45,7 +49,7 @@ async def get_team_info(dialog_manager: DialogManager,
 async def get_team_bookings(dialog_manager: DialogManager,
                             i18n: TranslatorRunner,
                             **kwargs):
-    session = dialog_manager.middleware_data['session']
+    session = dialog_manager.middleware_data['read_session']
     team_id = int(dialog_manager.dialog_data['team_id'])
     c = dialog_manager.start_data['bot_operation_config']
 
@@ -56,6 +60,7 @@ async def get_team_bookings(dialog_manager: DialogManager,
             date_format=c['date_format'],
             date_format_short=c['date_format_short'],
             team_id=team_id,
+            subtree=bool(dialog_manager.dialog_data.get('subtree')),
         )
         
         if status == "empty":
@@ -68,20 +73,19 @@ async def get_team_bookings(dialog_manager: DialogManager,
                     'button-back': i18n.button.back(),
                     'button-exit': i18n.button.exit()}
 
-        elif status == "only-bookings":
-            return {'bookings': response,
-                    'button-back': i18n.button.back(),
-                    'button-exit': i18n.button.exit()}
-        
-        elif status == "only-assignments":
-            return {'bookings': response,
-                    'button-back': i18n.button.back(),
-                    'button-exit': i18n.button.exit()}
-        
-        elif status == "bookings-assignments":
-            return {'bookings': response,
+        # Statuses: "only-bookings", "only-assignments", "bookings-assignments"
+        else:
+            # Split long lists into pages to fit Telegram's message length limit
+            pages = split_into_pages(response)
+            page = min(int(dialog_manager.dialog_data.get('page', 0)), len(pages) - 1)
+            data = {'bookings': pages[page],
                     'button-back': i18n.button.back(),
                     'button-exit': i18n.button.exit()}
+            if page > 0:
+                data['button-page-previous'] = i18n.button.page.previous()
+            if page < len(pages) - 1:
+                data['button-page-next'] = i18n.button.page.next()
+            return data
     
     except Exception as e:
         return str(e)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from aiogram_dialog import DialogManager
-from aiogram_dialog.widgets.kbd import Select
+from aiogram_dialog.widgets.kbd import Button, Select
 from aiogram.types import CallbackQuery
 
 from app.states.states import Team
@@ -9,5 +9,29 @@ async def selected_team_bookings(query: CallbackQuery,
                                  widget: Select,
                                  dialog_manager: DialogManager,
                                  ) -> None:
-    
-    await dialog_manager.switch_to(Team.view_bookings)
\ No newline at end of file
+    dialog_manager.dialog_data['page'] = 0
+    dialog_manager.dialog_data['subtree'] = False
+    await dialog_manager.switch_to(Team.view_bookings)
+
+
+async def selected_team_subtree_bookings(query: CallbackQuery,
+                                         widget: Button,
+                                         dialog_manager: DialogManager,
+                                         ) -> None:
+    dialog_manager.dialog_data['page'] = 0
+    dialog_manager.dialog_data['subtree'] = True
+    await dialog_manager.switch_to(Team.view_bookings)
+
+async def selected_previous_page(query: CallbackQuery,
+                                 widget: Button,
+                                 dialog_manager: DialogManager,
+                                 ) -> None:
+    dialog_manager.dialog_data['page'] = max(int(dialog_manager.dialog_data.get('page', 0)) - 1, 0)
+
+
+async def selected_next_page(query: CallbackQuery,
+                             widget: Button,
+                             dialog_manager: DialogManager,
+                             ) -> None:
+    # The getter clamps the page number to the number of pages
+    dialog_manager.dialog_data['page'] = int(dialog_manager.dialog_data.get('page', 0)) + 1
\ No newline at end of file
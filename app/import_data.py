@@ -0,0 +1,62 @@
+"""
+Imports rooms, desks, users and desk assignments from CSV or JSON files into the database of the .env configuration.
+See app/services/admin/bulk_import.py for the file formats (the same as the Bulk Import admin scene).
+
+Usage (from the project root):
+    python app/import_data.py rooms.csv desks.csv users.csv desk_assignments.csv
+    python app/import_data.py office.json --dry-run
+
+Exits with code 1 if any row was not imported.
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import logging
+from typing import List, Optional
+
+from app.config_data.config import load_config
+from app.database.engine import get_engine, get_session_pool
+from app.services.admin.bulk_import import ImportFileError, bulk_import, check_rows, parse_import_file
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Imports rooms, desks, users and desk assignments from CSV or JSON files.")
+    parser.add_argument("files", nargs="+", type=Path, help="Files to import, in order (e.g. rooms before desks).")
+    parser.add_argument("--dry-run", action="store_true", help="Only check the files, without the database.")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = load_config()
+    engine = get_engine(db_url=config.db.url, echo=False, name="import")
+    session_pool = get_session_pool(engine)
+    failed = False
+    try:
+        for path in args.files:
+            try:
+                rows = parse_import_file(path.name, path.read_bytes())
+            except (ImportFileError, OSError) as e:
+                print(f"{path}: {e}")
+                failed = True
+                continue
+            if args.dry_run:
+                report = check_rows(rows)
+            else:
+                async with session_pool() as session:
+                    report = await bulk_import(session, rows)
+            print(f"{path}:")
+            print(report.summary(max_errors=len(report.errors)))
+            failed = failed or bool(report.errors)
+    finally:
+        await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, stream=sys.stdout)
+    sys.exit(asyncio.run(main()))
@@ -9,6 +9,8 @@ button-main-menu = 🏠Main Menu
 button-exit = 🏁Exit
 button-confirm = ✅Confirm
 button-toggle = 🔄Toggle
+button-page-previous = ◀️Previous page
+button-page-next = Next page▶️
 
 
 <#-- Common -->
@@ -35,6 +37,7 @@ there-are-no-desks = For now there are no available desks in room: {$room_name}
 
 <#-- desk_booker.py -->
 desk-booker-error = Oops... Someone has booked the desk before you. Please select another desk
+desk-booker-already-booked = You already have a booking on: {$date}
 desk-booker-success = Successfully 🚩booked desk: {$desk_name} in room: {$room_name} for {$date}
 desk-booker-random-no-desks = There are no available desks on: {$date}
 
@@ -91,6 +94,8 @@ desk-assignment-inactive =
 
     In case you are back to the office, press the button below to activate desk assignment(s)
 
+desk-assignment-booking-cancelled = Your 🚩booking on {$date} was cancelled: the desk is 🔒assigned to a colleague who is back in the office
+
 
 <#-- team_dialog -->
 team-empty = Your team is not defined yet
@@ -98,7 +103,10 @@ team-no-info = There is no information about your team yet
 team-name = Team: {$team_name}
 team-room-name = Room: {$room_name}
 team-member-info = {$telegram_name}, role: {$role}
+team-sub-teams = Sub-teams: {$team_names}
 team-button-bookings = Team Bookings
+team-subtree = {$team_name} and sub-teams
+team-button-subtree-bookings = Bookings with Sub-teams
 team-bookings-no-bookings-message = Team: <b>{$team_name}</b> has no 🚩bookings
 team-bookings-first-line = <b>🚩Bookings (Team: {$team_name}):</b>
 team-bookings-date = <b>{$date}</b>
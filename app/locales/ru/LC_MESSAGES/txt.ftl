@@ -9,6 +9,8 @@ button-main-menu = 🏠Главное меню
 button-exit = 🏁Выход
 button-confirm = ✅Подтвердить
 button-toggle = 🔄Переключить
+button-page-previous = ◀️Предыдущая страница
+button-page-next = Следующая страница▶️
 
 
 <#-- Common -->
@@ -35,6 +37,7 @@ there-are-no-desks = Сейчас в кабинете: {$room_name} нет до
 
 <#-- desk_booker.py -->
 desk-booker-error = Упс... Кто-то только что забронировал этот стол. Пожалуйста, выберите другой
+desk-booker-already-booked = У вас уже есть бронирование на: {$date}
 desk-booker-success = 🚩Забронирован стол: {$desk_name} в кабинете: {$room_name} на {$date}
 desk-booker-random-no-desks = На выбранную дату: {$date} нет доступных столов для бронирования
 
@@ -91,6 +94,8 @@ desk-assignment-inactive =
 
     Если вы возвращаетесь в офис, нажмите кнопку ниже, чтобы активировать её
 
+desk-assignment-booking-cancelled = Ваша 🚩бронь на {$date} отменена: стол 🔒закреплён за коллегой, который вернулся в офис
+
 
 <#-- team_dialog -->
 team-empty = Ваша команда пока не определена
@@ -98,7 +103,10 @@ team-no-info = Отсутствует информация о вашей ком
 team-name = Команда: {$team_name}
 team-room-name = Кабинет: {$room_name}
 team-member-info = {$telegram_name}, роль: {$role}
+team-sub-teams = Подкоманды: {$team_names}
 team-button-bookings = Брони команды
+team-subtree = {$team_name} и подкоманды
+team-button-subtree-bookings = Брони с подкомандами
 team-bookings-no-bookings-message = В команде: <b>{$team_name}</b> нет обычных 🚩броней столов
 team-bookings-first-line = <b>🚩Брони столов в команде: {$team_name}</b>
 team-bookings-date = <b>{$date}</b>
@@ -21,6 +21,7 @@ class TranslatorRunner:
 
 class Button:
     main: ButtonMain
+    page: ButtonPage
 
     @staticmethod
     def yes() -> Literal["""Yes"""]: ...
@@ -55,6 +56,14 @@ class ButtonMain:
     def menu() -> Literal["""🏠Main Menu"""]: ...
 
 
+class ButtonPage:
+    @staticmethod
+    def previous() -> Literal["""◀️Previous page"""]: ...
+
+    @staticmethod
+    def next() -> Literal["""Next page▶️"""]: ...
+
+
 class Select:
     booking: SelectBooking
 
@@ -106,6 +115,8 @@ class Desk:
 
 
 class DeskAssignment:
+    booking: DeskAssignmentBooking
+
     @staticmethod
     def __call__(*, weekday) -> Literal["""You have an 🔒assigned desk for the selected weekday ({ $weekday }). To see your permanent desk assinments use command: /desk"""]: ...
 
@@ -130,6 +141,11 @@ In case you are out of the office (vacation, sick leave, etc.), please press the
 In case you are back to the office, press the button below to activate desk assignment(s)"""]: ...
 
 
+class DeskAssignmentBooking:
+    @staticmethod
+    def cancelled(*, date) -> Literal["""Your 🚩booking on { $date } was cancelled: the desk is 🔒assigned to a colleague who is back in the office"""]: ...
+
+
 class There:
     are: ThereAre
 
@@ -145,6 +161,7 @@ class ThereAreNo:
 
 class DeskBooker:
     random: DeskBookerRandom
+    already: DeskBookerAlready
 
     @staticmethod
     def error() -> Literal["""Oops... Someone has booked the desk before you. Please select another desk"""]: ...
@@ -153,6 +170,11 @@ class DeskBooker:
     def success(*, desk_name, room_name, date) -> Literal["""Successfully 🚩booked desk: { $desk_name } in room: { $room_name } for { $date }"""]: ...
 
 
+class DeskBookerAlready:
+    @staticmethod
+    def booked(*, date) -> Literal["""You already have a booking on: { $date }"""]: ...
+
+
 class DeskBookerRandom:
     no: DeskBookerRandomNo
 
@@ -280,6 +302,7 @@ class Team:
     member: TeamMember
     button: TeamButton
     bookings: TeamBookings
+    sub: TeamSub
 
     @staticmethod
     def empty() -> Literal["""Your team is not defined yet"""]: ...
@@ -287,6 +310,14 @@ class Team:
     @staticmethod
     def name(*, team_name) -> Literal["""Team: { $team_name }"""]: ...
 
+    @staticmethod
+    def subtree(*, team_name) -> Literal["""{ $team_name } and sub-teams"""]: ...
+
+
+class TeamSub:
+    @staticmethod
+    def teams(*, team_names) -> Literal["""Sub-teams: { $team_names }"""]: ...
+
 
 class TeamNo:
     @staticmethod
@@ -304,10 +335,17 @@ class TeamMember:
 
 
 class TeamButton:
+    subtree: TeamButtonSubtree
+
     @staticmethod
     def bookings() -> Literal["""Team Bookings"""]: ...
 
 
+class TeamButtonSubtree:
+    @staticmethod
+    def bookings() -> Literal["""Bookings with Sub-teams"""]: ...
+
+
 class TeamBookings:
     no: TeamBookingsNo
     first: TeamBookingsFirst
@@ -1,12 +1,99 @@
-from typing import Any, Awaitable, Callable, Dict
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
 
 from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
 from aiogram.types import TelegramObject
 
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.replicas import replica_router
+from app.database.session_writes import WROTE, release_if_read_only
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class LazySession:
+    """
+    Proxy of AsyncSession that opens the session only when a handler actually uses it.
+    Attribute access is forwarded to the underlying AsyncSession.
+    """
+    __slots__ = ('_session_pool', '_session')
+
+    def __init__(self, session_pool: async_sessionmaker):
+        self._session_pool = session_pool
+        self._session: Optional[AsyncSession] = None
+
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._session_pool()
+        return getattr(self._session, name)
+
+
+    @property
+    def wrote(self) -> bool:
+        """Whether the session has executed DML or flushed (see app/database/session_writes.py)."""
+        return self._session is not None and self._session.info.get(WROTE, False)
+
+
+    @property
+    def on_replica(self) -> bool:
+        """Whether the reads go to a read replica (see LazyReadSession)."""
+        return False
+
+
+    async def release(self) -> None:
+        """Ends the current transaction if it is read-only (see release_if_read_only)."""
+        if self._session is not None:
+            await release_if_read_only(self._session)
+
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class LazyReadSession(LazySession):
+    """
+    LazySession on a read replica for the read-only getters and list generators (data['read_session']).
+    Once the update has written through the primary session, the reads are forwarded to it (read-your-writes).
+    """
+    __slots__ = ('_primary',)
+
+    def __init__(self, session_pool: async_sessionmaker, primary: LazySession):
+        super().__init__(session_pool)
+        self._primary = primary
+
+
+    def __getattr__(self, name: str) -> Any:
+        if self._primary.wrote:
+            return getattr(self._primary, name)
+        return super().__getattr__(name)
+
+
+    @property
+    def on_replica(self) -> bool:
+        return not self._primary.wrote
+
+
+# Sessions of the update being processed, used by SessionReleaseMiddleware
+current_session: ContextVar[Optional[LazySession]] = ContextVar('current_session', default=None)
+current_read_session: ContextVar[Optional[LazySession]] = ContextVar('current_read_session', default=None)
 
 
 class DataBaseSession(BaseMiddleware):
+    """
+    Provides a single lazy session per update in data['session'] (shared by UserMiddleware and handlers)
+    and closes it after the update is processed.
+    data['read_session'] is the session of the read-only getters and list generators: a LazyReadSession on a replica
+    if replicas are configured and the user has not written recently (see app/database/replicas.py),
+    otherwise data['session'] itself.
+    """
     def __init__(self, session_pool: async_sessionmaker):
         self.session_pool = session_pool
 
@@ -16,6 +103,43 @@ class DataBaseSession(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        async with self.session_pool() as session:
-            data['session'] = session
-            return await handler(event, data)
\ No newline at end of file
+        session = LazySession(self.session_pool)
+        read_session = session
+        user = data.get('event_from_user')
+        if replica_router.enabled and not (user is not None and await replica_router.wrote_recently(user.id)):
+            read_session = LazyReadSession(replica_router.read_session_pool(self.session_pool), primary=session)
+        token = current_session.set(session)
+        read_token = current_read_session.set(read_session)
+        data['session'] = session
+        data['read_session'] = read_session
+        try:
+            return await handler(event, data)
+        finally:
+            current_session.reset(token)
+            current_read_session.reset(read_token)
+            if replica_router.enabled and user is not None and session.wrote:
+                await replica_router.mark_write(user.id)
+            if read_session is not session:
+                await read_session.close()
+            await session.close()
+
+
+class SessionReleaseMiddleware(BaseRequestMiddleware):
+    """
+    Bot request middleware that releases the database connections of the current update before calling the Telegram API,
+    so that connections are not held in the pool while waiting for Telegram. Only read-only transactions are ended
+    (see LazySession.release), the handler stays in charge of committing its writes.
+    """
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        session = current_session.get()
+        if session is not None:
+            await session.release()
+        read_session = current_read_session.get()
+        if read_session is not None and read_session is not session:
+            await read_session.release()
+        return await make_request(bot, method)
@@ -0,0 +1,64 @@
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update
+
+from app.database.query_stats import current_query_stats
+from app.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Update outer middleware that exports the number, latency, errors and database usage of updates per handler.
+    Must be registered after QueryStatsMiddleware, it takes the handler and router names from the current QueryStats.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await handler(event, data)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = current_query_stats.get()
+            labels = {"handler": stats.name if stats is not None else f"update:{event.event_type}"}
+            metrics.inc("bot_updates_total", {**labels, "router": (stats.router if stats is not None else None) or ""})
+            metrics.observe("bot_handler_duration_seconds", elapsed, labels)
+            if failed:
+                metrics.inc("bot_handler_errors_total", labels)
+            if stats is not None:
+                metrics.inc("bot_db_statements_total", labels, stats.statements)
+                metrics.inc("bot_db_time_seconds_total", labels, stats.db_time)
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Bot request middleware that exports the latency and failures of Telegram Bot API calls per method."""
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        labels = {"method": type(method).__name__}
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            metrics.inc("bot_telegram_request_errors_total", labels)
+            raise
+        finally:
+            metrics.observe("bot_telegram_request_duration_seconds", time.perf_counter() - start, labels)
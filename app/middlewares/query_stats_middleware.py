@@ -0,0 +1,64 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+from app.database.query_stats import current_query_stats, query_stats
+
+
+# aiogram_dialog stores the dialog context under this key and prefixes the callback data of widgets with the intent id and this separator
+DIALOG_CONTEXT_KEY = 'aiogd_context'
+CALLBACK_SEPARATOR = '\x1d'
+
+
+class QueryStatsMiddleware(BaseMiddleware):
+    """
+    Update middleware that counts the SQL statements and database time of the whole update,
+    including the ones of UserMiddleware. The totals are kept per handler (see HandlerNameMiddleware),
+    updates that do not reach a handler are counted under "update:<event type>".
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        with query_stats.track(f"update:{event.event_type}"):
+            return await handler(event, data)
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """
+    Message and callback query inner middleware that names the stats of the current update after the handler:
+    the handler function for routers (e.g. "process_command_booking"),
+    the dialog state and the clicked widget for dialogs (e.g. "Booking:select_room:room_name").
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.name = handler_name(event, data)
+            router = data.get('event_router')
+            stats.router = getattr(router, 'name', None)
+        return await handler(event, data)
+
+
+def handler_name(event: TelegramObject, data: Dict[str, Any]) -> str:
+    handler_object = data.get('handler')
+    callback = getattr(handler_object, 'callback', None)
+    module = getattr(callback, '__module__', '') or ''
+    if callback is not None and not module.startswith('aiogram_dialog'):
+        return callback.__name__
+
+    context = data.get(DIALOG_CONTEXT_KEY)
+    if context is not None:
+        name = context.state.state
+        if isinstance(event, CallbackQuery) and event.data:
+            widget_data = event.data.split(CALLBACK_SEPARATOR, 1)[-1]
+            name = f"{name}:{widget_data.split(':', 1)[0]}"
+        return name
+    return getattr(callback, '__name__', type(event).__name__)
@@ -3,12 +3,14 @@ from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
 from aiogram.types import User, TelegramObject
 
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import (
     orm_insert_user_to_waitlist,
     orm_select_user_by_telegram_id,
     orm_select_user_from_waitlist_by_telegram_id)
+from app.database.registration_cache import registration_cache
+from app.database.enums.registration_statuses import RegistrationStatus
 
 from app.config_data.config import Config
 
@@ -16,11 +18,8 @@ from app.config_data.config import Config
 class UserMiddleware(BaseMiddleware):
     """
     This middleware checks if the user is registered in the database or in the waitlist. If the user is not registered, they are added to the waitlist.
+    It uses the session provided by DataBaseSession in data['session'], which is then shared with the handler.
     """
-    def __init__(self, session_pool: async_sessionmaker):
-        self.session_pool = session_pool
-
-
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -40,38 +39,51 @@ class UserMiddleware(BaseMiddleware):
             return result
 
         # Check if user is registered or if user is already in the waitlist table
-        async with self.session_pool() as session:
-            data['session'] = session
-            user_id = await orm_select_user_by_telegram_id(
-                session,
-                telegram_id=from_user.id)
-            if user_id:
-                result = await handler(event, data)
-                return result
+        session: AsyncSession = data['session']
+        status = await registration_cache.get(from_user.id)
+        # An unknown user might have set a username since the status was cached
+        if status is None or (status == RegistrationStatus.UNKNOWN and from_user.username):
+            status = await self.select_registration_status(session, from_user.id)
+            await registration_cache.set(from_user.id, status)
+        if status == RegistrationStatus.REGISTERED:
+            result = await handler(event, data)
+            return result
+        elif status == RegistrationStatus.WAITLISTED:
+            await event.answer(
+                text="You are already in the waitlist. Please wait for the admin to approve your registration.",
+                # reply_markup=reply_markup,
+            )
+        else:
+            # Check if the user has a username set in their Telegram profile
+            if not from_user.username:
+                await event.answer(
+                    text="Please set a username in your Telegram profile settings to register.")
+                return
+            # Insert user to waitlist
             else:
-                waitlist_user = await orm_select_user_from_waitlist_by_telegram_id(
+                await orm_insert_user_to_waitlist(
                     session,
-                    telegram_id=from_user.id)
-                if not waitlist_user:
-                    # Check if the user has a username set in their Telegram profile
-                    if not from_user.username:
-                        await event.answer(
-                            text="Please set a username in your Telegram profile settings to register.")
-                        return
-                    # Insert user to waitlist
-                    else:
-                        await orm_insert_user_to_waitlist(
-                            session,
-                            telegram_id=from_user.id,
-                            telegram_name=from_user.username,
-                            first_name=from_user.first_name,
-                            last_name=from_user.last_name)
-                        await event.answer(
-                            text="You were added to the waitlist. Please wait for the admin to approve your registration.",
-                            # reply_markup=reply_markup,
-                        )
-                else:
-                    await event.answer(
-                        text="You are already in the waitlist. Please wait for the admin to approve your registration.",
-                        # reply_markup=reply_markup,
-                    )
\ No newline at end of file
+                    telegram_id=from_user.id,
+                    telegram_name=from_user.username,
+                    first_name=from_user.first_name,
+                    last_name=from_user.last_name)
+                await registration_cache.set(from_user.id, RegistrationStatus.WAITLISTED)
+                await event.answer(
+                    text="You were added to the waitlist. Please wait for the admin to approve your registration.",
+                    # reply_markup=reply_markup,
+                )
+
+
+    @staticmethod
+    async def select_registration_status(session: AsyncSession, telegram_id: int) -> RegistrationStatus:
+        user = await orm_select_user_by_telegram_id(
+            session,
+            telegram_id=telegram_id)
+        if user:
+            return RegistrationStatus.REGISTERED
+        waitlist_user = await orm_select_user_from_waitlist_by_telegram_id(
+            session,
+            telegram_id=telegram_id)
+        if waitlist_user:
+            return RegistrationStatus.WAITLISTED
+        return RegistrationStatus.UNKNOWN
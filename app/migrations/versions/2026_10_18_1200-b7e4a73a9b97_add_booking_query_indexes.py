@@ -0,0 +1,51 @@
+"""Add indexes for the hot booking queries
+
+Revision ID: b7e4a73a9b97
+Revises: a3582288aeea
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a73a9b97'
+down_revision: Union[str, None] = 'a3582288aeea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index condition) - keep in sync with __table_args__ in app/database/models.py
+INDEXES = [
+    ('ix_bookings_date', 'bookings', ['date'], None),
+    ('ix_desks_room_id', 'desks', ['room_id'], None),
+    ('ix_desks_room_id_available', 'desks', ['room_id'], 'is_available'),
+    ('ix_rooms_available', 'rooms', ['id'], 'is_available'),
+    ('ix_desk_assignments_weekday', 'desk_assignments', ['weekday'], None),
+    ('ix_user_role_assignments_team_id', 'user_role_assignments', ['team_id'], None),
+    ('ix_teams_room_id', 'teams', ['room_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock the tables against writes, so the bot keeps working during the migration,
+    # but it cannot run inside a transaction. IF NOT EXISTS makes a rerun after a failed build safe
+    # (drop the invalid index left by the failure first)
+    with op.get_context().autocommit_block():
+        for name, table, columns, condition in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(condition) if condition else None,
+                sqlite_where=sa.text(f"{condition} = 1") if condition else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, condition in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
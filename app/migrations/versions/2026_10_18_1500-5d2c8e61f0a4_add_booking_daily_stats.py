@@ -0,0 +1,59 @@
+"""Add the booking_daily_stats rollup for the analytics
+
+Revision ID: 5d2c8e61f0a4
+Revises: b7e4a73a9b97
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c8e61f0a4'
+down_revision: Union[str, None] = 'b7e4a73a9b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_daily_stats',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('desk_id', sa.Integer(), nullable=False),
+    sa.Column('telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('cancellations', sa.Integer(), nullable=False),
+    sa.Column('late_cancellations', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['desk_id'], ['desks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['telegram_id'], ['users.telegram_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('date', 'desk_id', 'telegram_id')
+    )
+    op.create_index('ix_booking_daily_stats_room_id_date', 'booking_daily_stats', ['room_id', 'date'])
+    op.create_index('ix_booking_daily_stats_desk_id_date', 'booking_daily_stats', ['desk_id', 'date'])
+    op.create_index('ix_booking_daily_stats_telegram_id_date', 'booking_daily_stats', ['telegram_id', 'date'])
+    op.create_index('ix_booking_daily_stats_team_id_date', 'booking_daily_stats', ['team_id', 'date'])
+    # Count the existing bookings (the cancellations made before this migration are unknown)
+    op.execute(
+        "INSERT INTO booking_daily_stats "
+        "(date, desk_id, telegram_id, room_id, team_id, bookings, cancellations, late_cancellations, created_at, updated_at) "
+        "SELECT bookings.date, bookings.desk_id, bookings.telegram_id, desks.room_id, user_role_assignments.team_id, "
+        "1, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM bookings JOIN desks ON desks.id = bookings.desk_id "
+        "LEFT JOIN user_role_assignments ON user_role_assignments.telegram_id = bookings.telegram_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_daily_stats_team_id_date', table_name='booking_daily_stats')
+    op.drop_index('ix_booking_daily_stats_telegram_id_date', table_name='booking_daily_stats')
+    op.drop_index('ix_booking_daily_stats_desk_id_date', table_name='booking_daily_stats')
+    op.drop_index('ix_booking_daily_stats_room_id_date', table_name='booking_daily_stats')
+    op.drop_table('booking_daily_stats')
@@ -0,0 +1,35 @@
+"""Replace the bookings(date) index with bookings(date, id) for keyset pagination
+
+Revision ID: 9a41f3c2d6e7
+Revises: 5d2c8e61f0a4
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41f3c2d6e7'
+down_revision: Union[str, None] = '5d2c8e61f0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The new index serves the lookups by date as well, so the old one is dropped once it is built.
+    # See b7e4a73a9b97 for CONCURRENTLY and IF NOT EXISTS
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_date_id', 'bookings', ['date', 'id'],
+            if_not_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_bookings_date', table_name='bookings', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_date', 'bookings', ['date'],
+            if_not_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_bookings_date_id', table_name='bookings', if_exists=True, postgresql_concurrently=True)
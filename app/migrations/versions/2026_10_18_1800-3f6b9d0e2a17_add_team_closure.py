@@ -0,0 +1,49 @@
+"""Add the team_closure table of the team hierarchy
+
+Revision ID: 3f6b9d0e2a17
+Revises: 9a41f3c2d6e7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b9d0e2a17'
+down_revision: Union[str, None] = '9a41f3c2d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('team_closure',
+    sa.Column('ancestor_team_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_team_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_team_id', 'descendant_team_id')
+    )
+    op.create_index('ix_team_closure_descendant_team_id', 'team_closure', ['descendant_team_id'])
+    # Build the closure of the existing team_tree (the same query as app/database/team_closure.py)
+    op.execute(
+        "INSERT INTO team_closure (ancestor_team_id, descendant_team_id, depth, created_at, updated_at) "
+        "WITH RECURSIVE paths(ancestor_team_id, descendant_team_id, depth) AS ("
+        "SELECT id, id, 0 FROM teams "
+        "UNION ALL "
+        "SELECT paths.ancestor_team_id, team_tree.child_team_id, paths.depth + 1 "
+        "FROM paths JOIN team_tree ON team_tree.parent_team_id = paths.descendant_team_id "
+        "WHERE paths.depth < (SELECT count(*) FROM teams)) "
+        "SELECT ancestor_team_id, descendant_team_id, min(depth), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM paths GROUP BY ancestor_team_id, descendant_team_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_closure_descendant_team_id', table_name='team_closure')
+    op.drop_table('team_closure')
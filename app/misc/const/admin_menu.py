@@ -8,6 +8,7 @@ class AdminMenu(Enum):
     ROOM_MANAGEMENT = 'Room Management'
     BOOKING_MANAGEMENT = 'Booking Management'
     ANALYTICS = 'Analytics'
+    BULK_IMPORT = 'Bulk Import'
 
     
     def __str__(self):
@@ -51,6 +52,7 @@ class AnalyticsMenu(Enum):
     USER_ANALYTICS = 'User Analytics'
     ROOM_ANALYTICS = 'Room Analytics'
     DESK_ANALYTICS = 'Desk Analytics'
+    TEAM_ANALYTICS = 'Team Analytics'
     BOOKING_ANALYTICS = 'Booking Analytics'
 
 
@@ -120,10 +122,11 @@ class DeskEditMenu(Enum):
 #* Submenus for Booking Management Menu (submenu of Admin Menu)
 class BookingBrowseMenu(Enum):
     BROWSE_PAST_BOOKINGS = 'Browse Past Bookings'
-    BROWSE_CURRENT_BOOKINGS = 'Browse Current Bookings'
-    BROWSE_BY_USER = 'Browse by User'
+    BROWSE_BY_PERIOD = 'Browse by Period'
     BROWSE_BY_ROOM = 'Browse by Room'
     BROWSE_BY_DESK = 'Browse by Desk'
+    BROWSE_BY_USER = 'Browse by User'
+    BROWSE_BY_TEAM = 'Browse by Team'
 
 
     def __str__(self):
@@ -142,4 +145,17 @@ class BookingCancelMenu(Enum):
  
     
 #* Submenus for Analytics Menu (submenu of Admin Menu)
-# TODO: Add submenus for Analytics Menu
\ No newline at end of file
+class AnalyticsPeriodMenu(Enum):
+    LAST_7_DAYS = 'Last 7 days'
+    LAST_30_DAYS = 'Last 30 days'
+    LAST_90_DAYS = 'Last 90 days'
+    LAST_365_DAYS = 'Last 365 days'
+
+
+    @property
+    def days(self) -> int:
+        return int(self.value.split()[1])
+
+
+    def __str__(self):
+        return self.value
\ No newline at end of file
@@ -1,4 +1,6 @@
+from .export_bookings import *
+
 from .router import admin_router
 
 
-__all__ = ("admin_router",)
\ No newline at end of file
+__all__ = ("admin_router",)
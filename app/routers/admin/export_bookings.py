@@ -0,0 +1,41 @@
+from typing import AsyncGenerator, AsyncIterator
+
+from aiogram import Bot
+from aiogram.filters import Command, CommandObject
+from aiogram.types import InputFile, Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.routers.admin.router import admin_router
+from app.services.admin.bookings_export import ExportError, export_filename, parse_export_args, stream_bookings_export
+
+
+class StreamingInputFile(InputFile):
+    """Uploads the chunks of an async iterator as they are produced, without holding the whole file in memory."""
+    def __init__(self, chunks: AsyncIterator[bytes], filename: str):
+        super().__init__(filename=filename)
+        self.chunks = chunks
+
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        async for chunk in self.chunks:
+            yield chunk
+
+
+@admin_router.message(Command("export_bookings"))
+async def process_command_export_bookings(message: Message,
+                                          command: CommandObject,
+                                          read_session: AsyncSession,
+                                          ) -> None:
+    """Sends the bookings of a date range as a CSV or NDJSON file: /export_bookings START_DATE [END_DATE] [csv|ndjson]"""
+    try:
+        start_date, end_date, export_format = parse_export_args(command.args)
+    except ExportError as e:
+        await message.answer(str(e))
+        return
+    chunks = stream_bookings_export(read_session, start_date, end_date, export_format)
+    try:
+        await message.answer_document(
+            StreamingInputFile(chunks, filename=export_filename(start_date, end_date, export_format)),
+            caption=f"Bookings from {start_date.isoformat()} to {end_date.isoformat()}")
+    except Exception as e:
+        await message.answer(f"Failed to export the bookings: {str(e)}")
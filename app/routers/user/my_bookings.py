@@ -9,6 +9,7 @@ from fluentogram import TranslatorRunner # type: ignore
 from app.routers.user.router import user_router
 from app.config_data.config import Config
 from app.services.bookings_list_generator import generate_list_of_current_bookings_by_telegram_id
+from app.services.common.pages_splitter import split_into_pages
 
 if TYPE_CHECKING:
     from app.locales.stub import TranslatorRunner # type: ignore
@@ -28,4 +29,6 @@ async def process_command_my_bookings(message: Message,
         date_format_short=c.date_format_short,
         telegram_id=message.from_user.id,
         telegram_name=message.from_user.username)
-    await message.answer(text=bookings)
\ No newline at end of file
+    # Send long lists as several messages to fit Telegram's message length limit
+    for page in split_into_pages(bookings):
+        await message.answer(text=page)
\ No newline at end of file
@@ -25,8 +25,14 @@ from .room_management.room_edit.desk_edit.desk_name_edit import DeskNameEditScen
 from .room_management.room_edit.desk_edit.desk_availability_toggle import DeskAvailabilityToggleScene
 
 from .booking_management.main import BookingManagementScene
+from .booking_management.booking_filter import BookingFilterScene
+from .booking_management.booking_explorer import BookingExplorerScene
 
 from .analytics.main import AnalyticsScene
+from .analytics.analytics_target import AnalyticsTargetScene
+from .analytics.analytics_period import AnalyticsPeriodScene
+
+from .bulk_import.main import BulkImportScene
 
 
 __all__ = [
@@ -53,5 +59,10 @@ __all__ = [
     DeskNameEditScene,
     DeskAvailabilityToggleScene,
     BookingManagementScene,
+    BookingFilterScene,
+    BookingExplorerScene,
     AnalyticsScene,
+    AnalyticsTargetScene,
+    AnalyticsPeriodScene,
+    BulkImportScene,
     ]
\ No newline at end of file
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from typing import Any
+
+from aiogram import F
+from aiogram.types import Message, ReplyKeyboardRemove
+
+from aiogram.fsm.scene import Scene, on
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config_data.config import Config
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.services.admin.analytics import AnalyticsError, build_report, parse_period
+from app.services.common.business_days import local_today
+from app.misc.const.admin_menu import AnalyticsPeriodMenu
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+PERIODS = {period.value: period for period in AnalyticsPeriodMenu}
+
+
+class AnalyticsPeriodScene(Scene, state="analytics_period_scene"):
+    """Shows the analytics for the selected period. The admin can select other periods until they leave the scene."""
+
+    @on.message.enter()
+    async def on_enter(self, message: Message) -> Any:
+        keyboard = get_reply_keyboard(
+            buttons=list(PERIODS),
+            width=2,
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.BACK.value,
+                ButtonLabel.EXIT.value],
+            width_util=3,
+            input_field_placeholder='Or enter the period, for example: "2024-01-01 2024-03-31"')
+
+        await message.answer(
+            text="Choose the period or enter it as START_DATE END_DATE",
+            reply_markup=keyboard)
+
+
+    @on.message.exit()
+    async def on_exit(self, message: Message) -> None:
+        await message.delete()
+        await message.answer(
+            text="You've exited Analytics Menu",
+            reply_markup=ReplyKeyboardRemove())
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
+    async def exit(self, message: Message):
+        await self.wizard.clear_data()
+        await self.wizard.exit()
+
+
+    @on.message(F.text == ButtonLabel.BACK.value)
+    async def back(self, message: Message):
+        await message.delete()
+        await self.wizard.back()
+
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
+
+
+    @on.message(F.text)
+    async def process_period(self, message: Message, read_session: AsyncSession, config: Config):
+        c = config.bot_operation
+        try:
+            if message.text in PERIODS:
+                end_date = local_today(c.timezone)
+                start_date = end_date - timedelta(days=PERIODS[message.text].days - 1)
+            else:
+                start_date, end_date = parse_period(message.text)
+            data = await self.wizard.get_data()
+            report = await build_report(
+                read_session,
+                start_date,
+                end_date,
+                scope=AnalyticsScope(data["analytics_scope"]),
+                scope_id=data.get("analytics_scope_id"),
+                name=data.get("analytics_name"),
+                exclude_weekends=c.exclude_weekends,
+                country_code=c.country_code)
+        except AnalyticsError as e:
+            await message.answer(str(e))
+            return
+        except Exception as e:
+            await message.answer(f"Failed to compute the analytics: {str(e)}")
+            return
+        await message.answer(report.format(date_format=c.date_format_short))
@@ -0,0 +1,87 @@
+from typing import Any
+
+from aiogram import F
+from aiogram.types import Message, ReplyKeyboardRemove
+
+from aiogram.fsm.scene import Scene, on
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.orm_queries import orm_select_rooms
+from app.services.admin.analytics import AnalyticsError, resolve_scope_id
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+PROMPTS = {
+    AnalyticsScope.ROOM: "Choose room",
+    AnalyticsScope.DESK: "Enter desk name",
+    AnalyticsScope.USER: "Enter username",
+    AnalyticsScope.TEAM: "Enter team name",
+}
+
+
+class AnalyticsTargetScene(Scene, state="analytics_target_scene"):
+    """Asks for the room, desk, team or user of the analytics (the scope is set in AnalyticsScene)."""
+
+    @on.message.enter()
+    async def on_enter(self, message: Message, read_session: AsyncSession) -> Any:
+        data = await self.wizard.get_data()
+        scope = AnalyticsScope(data["analytics_scope"])
+        rooms = []
+        if scope is AnalyticsScope.ROOM:
+            rooms = [room.name for room in await orm_select_rooms(read_session)]
+        keyboard = get_reply_keyboard(
+            buttons=rooms,
+            width=3 if len(rooms) > 5 else 2,
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.BACK.value,
+                ButtonLabel.EXIT.value],
+            width_util=3,
+            one_time_keyboard=True)
+
+        await message.answer(
+            text=PROMPTS[scope],
+            reply_markup=keyboard)
+
+
+    @on.message.exit()
+    async def on_exit(self, message: Message) -> None:
+        await message.delete()
+        await message.answer(
+            text="You've exited Analytics Menu",
+            reply_markup=ReplyKeyboardRemove())
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
+    async def exit(self, message: Message):
+        await self.wizard.clear_data()
+        await self.wizard.exit()
+
+
+    @on.message(F.text == ButtonLabel.BACK.value)
+    async def back(self, message: Message):
+        await message.delete()
+        await self.wizard.back()
+
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
+
+
+    @on.message(F.text)
+    async def process_input(self, message: Message, read_session: AsyncSession):
+        data = await self.wizard.get_data()
+        scope = AnalyticsScope(data["analytics_scope"])
+        try:
+            scope_id = await resolve_scope_id(read_session, scope, message.text)
+        except AnalyticsError as e:
+            await message.answer(str(e))
+            return
+        await self.wizard.update_data(analytics_scope_id=scope_id, analytics_name=message.text.strip())
+        await self.wizard.goto("analytics_period_scene")
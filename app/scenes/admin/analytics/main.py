@@ -3,45 +3,85 @@ from typing import Any
 from aiogram import F
 from aiogram.types import Message, ReplyKeyboardRemove
 
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
-
-from aiogram.fsm.context import FSMContext
 from aiogram.fsm.scene import Scene, on
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.misc.const.admin_menu import AnalyticsMenu
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+SCOPES = {
+    AnalyticsMenu.USER_ANALYTICS.value: AnalyticsScope.USER,
+    AnalyticsMenu.ROOM_ANALYTICS.value: AnalyticsScope.ROOM,
+    AnalyticsMenu.DESK_ANALYTICS.value: AnalyticsScope.DESK,
+    AnalyticsMenu.TEAM_ANALYTICS.value: AnalyticsScope.TEAM,
+}
+
 
 class AnalyticsScene(Scene, state="analytics_scene"):
-    
-    #* The scene's entry point is designed to handle callback queries.
+    """
+    Analytics of the whole office, a room, a desk, a team or a user over a period.
+    The selected scope is passed to the next scenes through the wizard data.
+    """
     @on.message.enter()
-    async def on_enter(self, message: Message, state: FSMContext) -> Any:
-        # Create reply keyboard
-        keyboard = ReplyKeyboardBuilder()
-        keyboard.button(text="Analytics for a User")
-        keyboard.button(text="Analytics for a Room")
-        keyboard.button(text="Analytics for a Desk")
-        keyboard.button(text="Analytics for All Users")
-        keyboard.button(text="Analytics for All Rooms")
-        keyboard.button(text="Analytics for All Desks")
-        keyboard.button(text="Analytics for All Bookings")
-        keyboard.button(text="Back")
-        keyboard.button(text="Exit")
+    async def on_enter(self, message: Message) -> Any:
+        keyboard = get_reply_keyboard(
+            buttons=[
+                AnalyticsMenu.BOOKING_ANALYTICS.value,
+                AnalyticsMenu.ROOM_ANALYTICS.value,
+                AnalyticsMenu.DESK_ANALYTICS.value,
+                AnalyticsMenu.TEAM_ANALYTICS.value,
+                AnalyticsMenu.USER_ANALYTICS.value,
+                ],
+            width=2,
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.EXIT.value],
+            width_util=2,
+            one_time_keyboard=True)
 
         await message.answer(
             text="Analytics Menu",
-            reply_markup=keyboard.adjust(2).as_markup(resize_keyboard=True))
-    
+            reply_markup=keyboard)
+
+
     @on.message.exit()
-    async def on_exit(self, message: Message, state: FSMContext) -> None:
+    async def on_exit(self, message: Message) -> None:
         await message.delete()
         await message.answer(
             text="You've exited Analytics Menu",
             reply_markup=ReplyKeyboardRemove())
-    
-    @on.message(F.text == "Exit")
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
     async def exit(self, message: Message):
+        await self.wizard.clear_data()
         await self.wizard.exit()
 
-    @on.message(F.text == "Back")
-    async def back(self, message: Message):
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
+
+
+    #* GOTO other scenes handlers
+    @on.message(F.text == AnalyticsMenu.BOOKING_ANALYTICS.value)
+    async def to_office_analytics(self, message: Message):
+        await message.delete()
+        await self.wizard.update_data(
+            analytics_scope=AnalyticsScope.ALL.value,
+            analytics_scope_id=None,
+            analytics_name=None)
+        await self.wizard.goto("analytics_period_scene")
+
+
+    @on.message(F.text.in_(SCOPES))
+    async def to_target_select(self, message: Message, session: AsyncSession):
         await message.delete()
-        await self.wizard.back()
\ No newline at end of file
+        await self.wizard.update_data(analytics_scope=SCOPES[message.text].value)
+        await self.wizard.goto("analytics_target_scene", session=session) # AnalyticsTargetScene.on_enter() lists the rooms
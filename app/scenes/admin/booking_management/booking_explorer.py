@@ -0,0 +1,108 @@
+from typing import Any
+
+from aiogram import F
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message, ReplyKeyboardRemove
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from aiogram.fsm.scene import Scene, on
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config_data.config import Config
+from app.services.admin.booking_explorer import (
+    CALLBACK_PREFIX,
+    BookingExplorerError,
+    BookingPage,
+    decode_cursor,
+    encode_cursor,
+    fetch_bookings_page,
+    filter_title,
+)
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+def get_page_keyboard(page: BookingPage) -> InlineKeyboardMarkup | None:
+    keyboard = InlineKeyboardBuilder()
+    if page.newer:
+        keyboard.button(text="⏪Newer", callback_data=encode_cursor("newer", page.newer))
+    if page.older:
+        keyboard.button(text="Older⏩", callback_data=encode_cursor("older", page.older))
+    return keyboard.as_markup() if page.newer or page.older else None
+
+
+class BookingExplorerScene(Scene, state="booking_explorer_scene"):
+    """
+    Shows the bookings of the filter set in BookingFilterScene or BookingManagementScene, newest first,
+    a page at a time. The Newer/Older inline buttons carry the (date, id) key of the page edge,
+    so every page is a keyset query however deep it is in the history.
+    """
+
+    @on.message.enter()
+    async def on_enter(self, message: Message, read_session: AsyncSession, config: Config) -> Any:
+        data = await self.wizard.get_data()
+        filters = data["booking_filters"]
+        date_format = config.bot_operation.date_format_short
+        keyboard = get_reply_keyboard(
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.BACK.value,
+                ButtonLabel.EXIT.value],
+            width_util=3)
+        await message.answer(
+            text=filter_title(filters, date_format),
+            reply_markup=keyboard)
+
+        try:
+            page = await fetch_bookings_page(read_session, filters)
+        except Exception as e:
+            await message.answer(f"Failed to load the bookings: {str(e)}")
+            return
+        await self.wizard.update_data(booking_page=1)
+        await message.answer(
+            text=page.format("Page 1", date_format),
+            reply_markup=get_page_keyboard(page))
+
+
+    @on.callback_query(F.data.startswith(f"{CALLBACK_PREFIX}:"))
+    async def turn_page(self, callback: CallbackQuery, read_session: AsyncSession, config: Config):
+        data = await self.wizard.get_data()
+        try:
+            direction, key = decode_cursor(callback.data)
+            page = await fetch_bookings_page(read_session, data["booking_filters"], direction, key)
+        except BookingExplorerError as e:
+            await callback.answer(str(e), show_alert=True)
+            return
+        page_number = data.get("booking_page", 1) + (1 if direction == "older" else -1)
+        await self.wizard.update_data(booking_page=page_number)
+        await callback.message.edit_text(
+            text=page.format(f"Page {page_number}", config.bot_operation.date_format_short),
+            reply_markup=get_page_keyboard(page))
+        await callback.answer()
+
+
+    @on.message.exit()
+    async def on_exit(self, message: Message) -> None:
+        await message.delete()
+        await message.answer(
+            text="You've exited Booking Management Menu",
+            reply_markup=ReplyKeyboardRemove())
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
+    async def exit(self, message: Message):
+        await self.wizard.clear_data()
+        await self.wizard.exit()
+
+
+    @on.message(F.text == ButtonLabel.BACK.value)
+    async def back(self, message: Message):
+        await message.delete()
+        await self.wizard.back()
+
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
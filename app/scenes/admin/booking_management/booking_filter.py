@@ -0,0 +1,90 @@
+from typing import Any
+
+from aiogram import F
+from aiogram.types import Message, ReplyKeyboardRemove
+
+from aiogram.fsm.scene import Scene, on
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.orm_queries import orm_select_rooms
+from app.services.admin.booking_explorer import BookingExplorerError, parse_filter_input
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+PROMPTS = {
+    AnalyticsScope.ALL: "Enter the period as START_DATE END_DATE",
+    AnalyticsScope.ROOM: "Choose room or enter its name",
+    AnalyticsScope.DESK: "Enter desk name",
+    AnalyticsScope.USER: "Enter username",
+    AnalyticsScope.TEAM: "Enter team name",
+}
+
+
+class BookingFilterScene(Scene, state="booking_filter_scene"):
+    """Asks for the filter of the booking explorer (the scope is set in BookingManagementScene)."""
+
+    @on.message.enter()
+    async def on_enter(self, message: Message, read_session: AsyncSession) -> Any:
+        data = await self.wizard.get_data()
+        scope = AnalyticsScope(data["booking_scope"])
+        rooms = []
+        if scope is AnalyticsScope.ROOM:
+            rooms = [room.name for room in await orm_select_rooms(read_session)]
+        text = PROMPTS[scope]
+        if scope is not AnalyticsScope.ALL:
+            text += ", optionally followed by the period, e.g. NAME 2024-01-01 2024-03-31"
+        keyboard = get_reply_keyboard(
+            buttons=rooms,
+            width=3 if len(rooms) > 5 else 2,
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.BACK.value,
+                ButtonLabel.EXIT.value],
+            width_util=3,
+            one_time_keyboard=True)
+
+        await message.answer(
+            text=text,
+            reply_markup=keyboard)
+
+
+    @on.message.exit()
+    async def on_exit(self, message: Message) -> None:
+        await message.delete()
+        await message.answer(
+            text="You've exited Booking Management Menu",
+            reply_markup=ReplyKeyboardRemove())
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
+    async def exit(self, message: Message):
+        await self.wizard.clear_data()
+        await self.wizard.exit()
+
+
+    @on.message(F.text == ButtonLabel.BACK.value)
+    async def back(self, message: Message):
+        await message.delete()
+        await self.wizard.back()
+
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
+
+
+    @on.message(F.text)
+    async def process_input(self, message: Message, read_session: AsyncSession):
+        data = await self.wizard.get_data()
+        try:
+            filters = await parse_filter_input(read_session, AnalyticsScope(data["booking_scope"]), message.text)
+        except BookingExplorerError as e:
+            await message.answer(str(e))
+            return
+        await self.wizard.update_data(booking_filters=filters)
+        await self.wizard.goto("booking_explorer_scene")
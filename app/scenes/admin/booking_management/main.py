@@ -1,76 +1,95 @@
+from datetime import timedelta
 from typing import Any
 
 from aiogram import F
 from aiogram.types import Message, ReplyKeyboardRemove
 
-from aiogram.utils.keyboard import ReplyKeyboardBuilder
-
-from aiogram.fsm.context import FSMContext
 from aiogram.fsm.scene import Scene, on
 
+from app.config_data.config import Config
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.services.common.business_days import local_today
+from app.misc.const.admin_menu import BookingBrowseMenu, BookingManagementMenu
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+# Scopes of the filter asked by BookingFilterScene
+SCOPES = {
+    BookingBrowseMenu.BROWSE_BY_PERIOD.value: AnalyticsScope.ALL,
+    BookingBrowseMenu.BROWSE_BY_ROOM.value: AnalyticsScope.ROOM,
+    BookingBrowseMenu.BROWSE_BY_DESK.value: AnalyticsScope.DESK,
+    BookingBrowseMenu.BROWSE_BY_USER.value: AnalyticsScope.USER,
+    BookingBrowseMenu.BROWSE_BY_TEAM.value: AnalyticsScope.TEAM,
+}
+
 
 class BookingManagementScene(Scene, state="booking_management_scene"):
-    
-    
-    #* The scene's entry point is designed to handle callback queries.
+
+
     @on.message.enter()
-    async def on_enter(self, message: Message, state: FSMContext) -> Any:
-        # Create reply keyboard
-        keyboard = ReplyKeyboardBuilder()
-        keyboard.button(text="Show Past Bookings")
-        keyboard.button(text="Show All Bookings for Room")
-        keyboard.button(text="Show All Bookings for Desk")
-        keyboard.button(text="Show All Bookings for User")
-        keyboard.button(text="Cancel Booking")
-        keyboard.button(text="Back")
-        keyboard.button(text="Exit")
+    async def on_enter(self, message: Message) -> Any:
+        keyboard = get_reply_keyboard(
+            buttons=[
+                BookingBrowseMenu.BROWSE_PAST_BOOKINGS.value,
+                *SCOPES,
+                BookingManagementMenu.CANCEL_BOOKINGS.value],
+            width=2,
+            util_buttons=[
+                ButtonLabel.BACK.value,
+                ButtonLabel.EXIT.value],
+            width_util=2,
+            one_time_keyboard=True)
 
         await message.answer(
             text="Booking Management Menu",
-            reply_markup=keyboard.adjust(2).as_markup(resize_keyboard=True))
+            reply_markup=keyboard)
 
 
     @on.message.exit()
-    async def on_exit(self, message: Message, state: FSMContext) -> None:
+    async def on_exit(self, message: Message) -> None:
         await message.delete()
         await message.answer(
             text="You've exited Booking Management Menu",
             reply_markup=ReplyKeyboardRemove())
-    
-    
-    @on.message(F.text == "Exit")
+
+
+    @on.message(F.text == ButtonLabel.EXIT.value)
     async def exit(self, message: Message):
+        await self.wizard.clear_data()
         await self.wizard.exit()
-    
-    
-    @on.message(F.text == "Back")
+
+
+    @on.message(F.text == ButtonLabel.BACK.value)
     async def back(self, message: Message):
         await message.delete()
         await self.wizard.back()
 
 
     #* GOTO other scenes handlers
-    @on.message(F.text == "Cancel Booking")
-    async def to_cancel_booking_menu(self, message: Message):        
+    @on.message(F.text == BookingManagementMenu.CANCEL_BOOKINGS.value)
+    async def to_cancel_booking_menu(self, message: Message): # TODO: Implement
         await message.delete()
-        await self.wizard.goto("cancel_booking_menu_scene")
-    
-    
-    #* Show past bookings logic
-    @on.message(F.text == "Show Past Bookings")
-    async def show_past_bookings(self, message: Message):        
+        await message.answer("Not implemented yet.")
+        await self.wizard.retake()
+        # await self.wizard.goto("cancel_booking_menu_scene")
+
+
+    @on.message(F.text == BookingBrowseMenu.BROWSE_PAST_BOOKINGS.value)
+    async def to_past_bookings(self, message: Message, config: Config):
         await message.delete()
-        
-        # Create reply keyboard
-        keyboard = ReplyKeyboardBuilder()
-        keyboard.button(text="Past week")
-        keyboard.button(text="Past two weeks")
-        keyboard.button(text="Past month")
-        keyboard.button(text="Back")
-        keyboard.button(text="Exit")
+        yesterday = local_today(config.bot_operation.timezone) - timedelta(days=1)
+        await self.wizard.update_data(booking_filters={
+            "scope": AnalyticsScope.ALL.value,
+            "name": None,
+            "scope_id": None,
+            "start_date": None,
+            "end_date": yesterday.isoformat()})
+        await self.wizard.goto("booking_explorer_scene")
 
-        await message.answer(
-            text="Select a time period to show past bookings",
-            reply_markup=keyboard.adjust(2).as_markup(resize_keyboard=True))
-    
-    
\ No newline at end of file
+
+    @on.message(F.text.in_(SCOPES))
+    async def to_booking_filter(self, message: Message):
+        await message.delete()
+        await self.wizard.update_data(booking_scope=SCOPES[message.text].value)
+        await self.wizard.goto("booking_filter_scene")
@@ -0,0 +1,93 @@
+from typing import Any
+
+from aiogram import F
+from aiogram.types import BufferedInputFile, Message, ReplyKeyboardRemove
+
+from aiogram.fsm.scene import Scene, on
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.admin.bulk_import import ImportFileError, bulk_import_file
+from app.misc.const.button_labels import ButtonLabel
+from app.keyboards.reply import get_reply_keyboard
+
+
+MAX_FILE_SIZE = 5 * 1024 * 1024 # bytes
+
+
+class BulkImportScene(Scene, state="bulk_import_scene"):
+    """Imports rooms, desks, users and desk assignments from a CSV or JSON file sent by the admin."""
+    
+    @on.message.enter()
+    async def on_enter(self, message: Message) -> Any:
+        keyboard = get_reply_keyboard(
+            util_buttons=[
+                ButtonLabel.TO_MAIN_MENU.value,
+                ButtonLabel.EXIT.value],
+            width_util=2,
+            one_time_keyboard=True)
+
+        await message.answer(
+            text=(
+                "Send a CSV or JSON file to import.\n\n"
+                "CSV file: one kind of entities per file, the first line names the columns:\n"
+                "rooms: name, is_available, plan\n"
+                "desks: room, name, is_available\n"
+                "users: telegram_id, telegram_name, first_name, last_name\n"
+                "desk assignments: desk, weekday, telegram_id or telegram_name\n\n"
+                'JSON file: {"rooms": [...], "desks": [...], "users": [...], "desk_assignments": [...]}, '
+                "a list of objects with the same columns for each kind.\n\n"
+                "is_available, plan, first_name and last_name are optional. "
+                "Rows with errors and rows that already exist are skipped and reported."),
+            reply_markup=keyboard)
+    
+    
+    @on.message.exit()
+    async def on_exit(self, message: Message) -> None:
+        await message.delete()
+        await message.answer(
+            text="You've exited Bulk Import Menu",
+            reply_markup=ReplyKeyboardRemove())
+    
+    
+    @on.message(F.text == ButtonLabel.EXIT.value)
+    async def exit(self, message: Message):
+        await self.wizard.clear_data()
+        await self.wizard.exit()
+
+
+    @on.message(F.text == ButtonLabel.TO_MAIN_MENU.value)
+    async def to_main_menu(self, message: Message):
+        await message.delete()
+        await self.wizard.clear_data()
+        await self.wizard.goto("admin_menu")
+    
+    
+    @on.message(F.document)
+    async def process_file(
+        self,
+        message: Message,
+        session: AsyncSession):
+        document = message.document
+        if document.file_size and document.file_size > MAX_FILE_SIZE:
+            await message.answer(f"The file is too large, at most {MAX_FILE_SIZE // (1024 * 1024)} MB can be imported at once.")
+            return
+        try:
+            content = await message.bot.download(document)
+            report = await bulk_import_file(session, document.file_name or "", content.read())
+        except ImportFileError as e:
+            await message.answer(str(e))
+            return
+        except Exception as e:
+            await message.answer(f"Failed to import the file: {str(e)}")
+            return
+        await message.answer(report.summary())
+        if report.errors:
+            await message.answer_document(
+                BufferedInputFile(report.errors_csv(), filename="import_errors.csv"),
+                caption="All rows with errors")
+
+
+    @on.message(F.text)
+    async def process_text(self, message: Message):
+        await message.answer("Please send a .csv or .json file.")
@@ -30,7 +30,8 @@ class AdminMenuScene(Scene, state="admin_menu"):
                 AdminMenu.WAITLIST.value,
                 AdminMenu.ROOM_MANAGEMENT.value,
                 AdminMenu.BOOKING_MANAGEMENT.value,
-                # AdminMenu.ANALYTICS.value,
+                AdminMenu.ANALYTICS.value,
+                AdminMenu.BULK_IMPORT.value,
                 ],
             width=2,
             util_buttons=[
@@ -89,16 +90,18 @@ class AdminMenuScene(Scene, state="admin_menu"):
 
 
     @on.message(F.text == AdminMenu.BOOKING_MANAGEMENT.value)
-    async def to_booking_management(self, message: Message): # TODO: Implement
+    async def to_booking_management(self, message: Message):
         await message.delete()
-        await message.answer("Not implemented yet.")
-        await self.wizard.retake()
-        # await self.wizard.goto("booking_management_scene")
+        await self.wizard.goto("booking_management_scene")
+
+
+    @on.message(F.text == AdminMenu.BULK_IMPORT.value)
+    async def to_bulk_import(self, message: Message):
+        await message.delete()
+        await self.wizard.goto("bulk_import_scene")
 
 
     @on.message(F.text == AdminMenu.ANALYTICS.value)
-    async def to_analytics(self, message: Message): # TODO: Implement
+    async def to_analytics(self, message: Message):
         await message.delete()
-        await message.answer("Not implemented yet.")
-        await self.wizard.retake()
-        # await self.wizard.goto("analytics_scene")
+        await self.wizard.goto("analytics_scene")
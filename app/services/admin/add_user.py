@@ -2,6 +2,7 @@ import re
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import orm_select_user_by_telegram_id_or_telegram_name, orm_insert_user
+from app.database.registration_cache import registration_cache
 
 
 class UserInputError(Exception):
@@ -35,4 +36,5 @@ async def add_user_service(session: AsyncSession, user_input: str) -> str:
         raise UserInputError("User already exists.")
 
     await orm_insert_user(session, telegram_id, telegram_name)
+    await registration_cache.invalidate(telegram_id)
     return "User has been added"
\ No newline at end of file
@@ -0,0 +1,175 @@
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.enums.weekdays import Weekday
+from app.database.orm_queries import (
+    orm_select_room_ids_by_names,
+    orm_select_desk_ids_by_names,
+    orm_select_telegram_ids_by_telegram_names,
+    orm_select_team_ids_by_names,
+    orm_select_booking_stats_totals,
+    orm_select_booked_days_by_weekday,
+    orm_select_most_cancelled_desks,
+    orm_select_top_users_by_booked_days,
+    orm_count_analytics_capacity,
+)
+from app.services.common.business_days import busday_count, is_holiday
+
+
+TOP_LIMIT = 5 # Rows in the "most cancelled desks" and "top users" lists
+
+_ID_LOOKUPS = {
+    AnalyticsScope.ROOM: orm_select_room_ids_by_names,
+    AnalyticsScope.DESK: orm_select_desk_ids_by_names,
+    AnalyticsScope.USER: orm_select_telegram_ids_by_telegram_names,
+    AnalyticsScope.TEAM: orm_select_team_ids_by_names,
+}
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class AnalyticsReport:
+    scope: AnalyticsScope
+    name: Optional[str]
+    start_date: date
+    end_date: date
+    bookable_days: int
+    capacity: int # Desks (office, room, desk) or people (team, user) per day
+    booked_days: int = 0
+    bookings: int = 0
+    cancellations: int = 0
+    late_cancellations: int = 0
+    users: int = 0
+    by_weekday: Dict[Weekday, int] = field(default_factory=dict)
+    cancelled_desks: List = field(default_factory=list)
+    top_users: List = field(default_factory=list)
+
+
+    @property
+    def occupancy(self) -> Optional[float]:
+        """Share of the desk-days (or person-days for teams and users) that were booked."""
+        available = self.capacity * self.bookable_days
+        return self.booked_days / available if available else None
+
+
+    def format(self, date_format: str = "%d.%m.%Y") -> str:
+        title = "All bookings" if self.scope is AnalyticsScope.ALL else f"{self.scope.value.capitalize()} {self.name}"
+        rate_label = "Attendance" if self.scope in (AnalyticsScope.USER, AnalyticsScope.TEAM) else "Occupancy"
+        lines = [
+            f"{title}: {self.start_date.strftime(date_format)} - {self.end_date.strftime(date_format)}",
+            f"Bookable days: {self.bookable_days}",
+            f"{rate_label}: {_percent(self.occupancy)} ({self.booked_days} booked days)",
+            f"Bookings made: {self.bookings}, cancelled: {self.cancellations} "
+            f"({self.late_cancellations} on the booking day)",
+            f"Users with bookings: {self.users}",
+        ]
+        if self.by_weekday:
+            lines.append("\nBooked days per weekday:")
+            lines.extend(
+                f"{weekday.name.capitalize()}: {self.by_weekday[weekday]}"
+                for weekday in Weekday if weekday in self.by_weekday)
+        if self.cancelled_desks:
+            lines.append("\nMost cancelled desks (no-show risk):")
+            lines.extend(
+                f"{row.desk} ({row.room}): {row.cancellations} of {row.bookings} cancelled, "
+                f"{row.late_cancellations} on the booking day"
+                for row in self.cancelled_desks)
+        if self.top_users:
+            lines.append("\nTop users:")
+            lines.extend(f"@{row.telegram_name}: {row.booked_days} days" for row in self.top_users)
+        return "\n".join(lines)
+
+
+def _percent(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0%}"
+
+
+def count_bookable_days(
+    start_date: date,
+    end_date: date,
+    exclude_weekends: bool | None = True,
+    country_code: str | None = None,
+    ) -> int:
+    """Counts the days between start_date and end_date (inclusive) that the bot offers for booking."""
+    if exclude_weekends:
+        return max(0, busday_count(start_date, end_date + timedelta(days=1), country_code))
+    days = (end_date - start_date).days + 1
+    if country_code:
+        days -= sum(
+            1 for i in range(days)
+            if is_holiday(start_date + timedelta(days=i), country_code))
+    return max(0, days)
+
+
+def parse_period(text: str) -> Tuple[date, date]:
+    """Parses "START_DATE END_DATE" (or a single date), dates in the YYYY-MM-DD format."""
+    parts = text.split()
+    if len(parts) not in (1, 2):
+        raise AnalyticsError("Send the period as START_DATE END_DATE, for example: 2024-01-01 2024-03-31")
+    try:
+        start_date = date.fromisoformat(parts[0])
+        end_date = date.fromisoformat(parts[-1])
+    except ValueError:
+        raise AnalyticsError("Dates must be in the YYYY-MM-DD format.")
+    if start_date > end_date:
+        raise AnalyticsError("The start date must not be after the end date.")
+    return start_date, end_date
+
+
+async def resolve_scope_id(session: AsyncSession, scope: AnalyticsScope, name: str) -> int:
+    """Returns the id of the room, desk, team or user (by username) with the name."""
+    name = name.strip()
+    if scope is AnalyticsScope.USER:
+        name = name.lstrip("@")
+    ids = await _ID_LOOKUPS[scope](session, [name])
+    if name not in ids:
+        raise AnalyticsError(f"{scope.value.capitalize()} {name} not found.")
+    return ids[name]
+
+
+async def build_report(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    scope: AnalyticsScope = AnalyticsScope.ALL,
+    scope_id: Optional[int] = None,
+    name: Optional[str] = None,
+    exclude_weekends: bool | None = True,
+    country_code: str | None = None,
+    ) -> AnalyticsReport:
+    """
+    Computes the analytics of the office, a room, a desk, a team or a user for the period.
+    All numbers are aggregated from booking_daily_stats, so the cost does not grow with the bookings history.
+    """
+    if start_date > end_date:
+        raise AnalyticsError("The start date must not be after the end date.")
+    report = AnalyticsReport(
+        scope=scope,
+        name=name,
+        start_date=start_date,
+        end_date=end_date,
+        bookable_days=count_bookable_days(start_date, end_date, exclude_weekends, country_code),
+        capacity=await orm_count_analytics_capacity(session, scope, scope_id))
+    totals = await orm_select_booking_stats_totals(session, start_date, end_date, scope, scope_id)
+    report.booked_days = int(totals.booked_days)
+    report.bookings = int(totals.bookings)
+    report.cancellations = int(totals.cancellations)
+    report.late_cancellations = int(totals.late_cancellations)
+    report.users = totals.users
+    if not report.bookings:
+        return report
+    report.by_weekday = await orm_select_booked_days_by_weekday(session, start_date, end_date, scope, scope_id)
+    if report.cancellations and scope is not AnalyticsScope.DESK:
+        report.cancelled_desks = await orm_select_most_cancelled_desks(
+            session, start_date, end_date, scope, scope_id, limit=TOP_LIMIT)
+    if scope is not AnalyticsScope.USER:
+        report.top_users = await orm_select_top_users_by_booked_days(
+            session, start_date, end_date, scope, scope_id, limit=TOP_LIMIT)
+    return report
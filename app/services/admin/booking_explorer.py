@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.orm_queries import orm_select_bookings_page
+from app.services.admin.analytics import AnalyticsError, parse_period, resolve_scope_id
+
+
+PAGE_SIZE = 10 # Bookings per page
+CALLBACK_PREFIX = "bookings" # Callback data of the page buttons: "bookings:older:2024-01-31:1234"
+
+# Keyword arguments of orm_select_bookings_page for the scopes
+_SCOPE_FILTERS = {
+    AnalyticsScope.ROOM: "room_id",
+    AnalyticsScope.DESK: "desk_id",
+    AnalyticsScope.USER: "telegram_id",
+    AnalyticsScope.TEAM: "team_id",
+}
+
+
+class BookingExplorerError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class BookingPage:
+    rows: List = field(default_factory=list)
+    older: Optional[Tuple[date, int]] = None # Key of the last row, if there are older bookings
+    newer: Optional[Tuple[date, int]] = None # Key of the first row, if there are newer bookings
+
+
+    def format(self, title: str, date_format: str = "%d.%m.%Y") -> str:
+        if not self.rows:
+            return f"{title}\nNo bookings found."
+        lines = [title]
+        lines.extend(
+            f"{row.date.strftime(date_format)} {row.room}, {row.desk}: @{row.telegram_name}"
+            for row in self.rows)
+        return "\n".join(lines)
+
+
+async def parse_filter_input(session: AsyncSession, scope: AnalyticsScope, text: str) -> Dict:
+    """
+    Parses the filter entered by the admin: "NAME [START_DATE END_DATE]" for a room, desk, user (username) or team,
+    "START_DATE END_DATE" for all bookings. Returns the filter as JSON-serializable data for the scene.
+    """
+    parts = text.split()
+    period = None
+    if scope is AnalyticsScope.ALL:
+        period = text
+    elif len(parts) > 2 and _is_date(parts[-1]) and _is_date(parts[-2]):
+        period = " ".join(parts[-2:])
+        parts = parts[:-2]
+    filters = {"scope": scope.value, "name": None, "scope_id": None, "start_date": None, "end_date": None}
+    try:
+        if period is not None:
+            start_date, end_date = parse_period(period)
+            filters.update(start_date=start_date.isoformat(), end_date=end_date.isoformat())
+        if scope is not AnalyticsScope.ALL:
+            name = " ".join(parts)
+            filters.update(scope_id=await resolve_scope_id(session, scope, name), name=name)
+    except AnalyticsError as e:
+        raise BookingExplorerError(str(e))
+    return filters
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def filter_title(filters: Dict, date_format: str = "%d.%m.%Y") -> str:
+    scope = AnalyticsScope(filters["scope"])
+    title = "Bookings" if scope is AnalyticsScope.ALL else f"Bookings of {scope.value} {filters['name']}"
+    start_date, end_date = filters.get("start_date"), filters.get("end_date")
+    if start_date and end_date:
+        title += f": {date.fromisoformat(start_date).strftime(date_format)} - {date.fromisoformat(end_date).strftime(date_format)}"
+    elif end_date:
+        title += f" until {date.fromisoformat(end_date).strftime(date_format)}"
+    return title
+
+
+def encode_cursor(direction: str, key: Tuple[date, int]) -> str:
+    return f"{CALLBACK_PREFIX}:{direction}:{key[0].isoformat()}:{key[1]}"
+
+
+def decode_cursor(data: str) -> Tuple[str, Tuple[date, int]]:
+    """Returns the direction ("older" or "newer") and the key of the callback data of a page button."""
+    try:
+        _, direction, key_date, key_id = data.split(":")
+        if direction not in ("older", "newer"):
+            raise ValueError(direction)
+        return direction, (date.fromisoformat(key_date), int(key_id))
+    except ValueError:
+        raise BookingExplorerError(f"Invalid page: {data}")
+
+
+async def fetch_bookings_page(
+    session: AsyncSession,
+    filters: Dict,
+    direction: Optional[str] = None,
+    key: Optional[Tuple[date, int]] = None,
+    page_size: int = PAGE_SIZE,
+    ) -> BookingPage:
+    """
+    Returns the page of the filtered bookings (newest first) older or newer than the key, or the newest page.
+    One more row than the page is fetched to know whether there is a next page in that direction.
+    """
+    kwargs = {
+        "start_date": date.fromisoformat(filters["start_date"]) if filters.get("start_date") else None,
+        "end_date": date.fromisoformat(filters["end_date"]) if filters.get("end_date") else None,
+    }
+    scope = AnalyticsScope(filters["scope"])
+    if scope is not AnalyticsScope.ALL:
+        kwargs[_SCOPE_FILTERS[scope]] = filters["scope_id"]
+
+    if direction == "newer":
+        rows = await orm_select_bookings_page(session, page_size + 1, after=key, **kwargs)
+        has_more, rows = len(rows) > page_size, list(reversed(rows[:page_size]))
+        has_older, has_newer = True, has_more
+    else:
+        rows = await orm_select_bookings_page(session, page_size + 1, before=key, **kwargs)
+        has_more, rows = len(rows) > page_size, rows[:page_size]
+        has_older, has_newer = has_more, key is not None
+    if not rows:
+        return BookingPage()
+    return BookingPage(
+        rows=rows,
+        older=(rows[-1].date, rows[-1].id) if has_older else None,
+        newer=(rows[0].date, rows[0].id) if has_newer else None)
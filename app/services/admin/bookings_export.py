@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.orm_queries import EXPORT_COLUMNS, orm_stream_bookings_for_export
+
+
+# Export formats and their media types
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+ROWS_PER_CHUNK = 1000 # Rows encoded into one chunk of the response (and fetched from the cursor at a time)
+
+
+class ExportError(Exception):
+    pass
+
+
+def validate_export(start_date: date, end_date: date, export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    if start_date > end_date:
+        raise ExportError("The start date must not be after the end date.")
+
+
+def parse_export_args(args: str | None) -> Tuple[date, date, str]:
+    """
+    Parses the arguments of the /export_bookings command: "START_DATE [END_DATE] [FORMAT]",
+    dates in the YYYY-MM-DD format. END_DATE defaults to START_DATE, FORMAT to csv.
+    """
+    parts = (args or "").split()
+    if parts and parts[-1].lower() in EXPORT_FORMATS:
+        export_format = parts.pop().lower()
+    else:
+        export_format = "csv"
+    if len(parts) not in (1, 2):
+        raise ExportError(
+            "Usage: /export_bookings START_DATE [END_DATE] [csv|ndjson]\n"
+            "Example: /export_bookings 2024-01-01 2024-12-31 csv")
+    try:
+        start_date = date.fromisoformat(parts[0])
+        end_date = date.fromisoformat(parts[-1])
+    except ValueError:
+        raise ExportError("Dates must be in the YYYY-MM-DD format.")
+    validate_export(start_date, end_date, export_format)
+    return start_date, end_date, export_format
+
+
+def export_filename(start_date: date, end_date: date, export_format: str) -> str:
+    return f"bookings_{start_date.isoformat()}_{end_date.isoformat()}.{export_format}"
+
+
+async def stream_bookings_export(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    export_format: str) -> AsyncIterator[bytes]:
+    """
+    Yields the bookings between start_date and end_date (inclusive) as CSV (with a header line) or NDJSON,
+    in chunks of ROWS_PER_CHUNK rows. Only one chunk of rows is held in memory at a time.
+    """
+    validate_export(start_date, end_date, export_format)
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        write_row = lambda row: writer.writerow(
+            "" if value is None else value.isoformat() if isinstance(value, date) else value for value in row)
+    else:
+        write_row = lambda row: buffer.write(json.dumps(
+            {column: value.isoformat() if isinstance(value, date) else value for column, value in zip(EXPORT_COLUMNS, row)},
+            ensure_ascii=False) + "\n")
+    rows_in_buffer = 0
+    async for row in orm_stream_bookings_for_export(session, start_date, end_date, chunk_size=ROWS_PER_CHUNK):
+        write_row(row)
+        rows_in_buffer += 1
+        if rows_in_buffer == ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,400 @@
+import csv
+import io
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.enums.weekdays import Weekday
+from app.database.models import Room, Desk, User, DeskAssignment
+from app.database.orm_queries import (
+    orm_bulk_insert_on_conflict_do_nothing,
+    orm_select_room_ids_by_names,
+    orm_select_desk_ids_by_names,
+    orm_select_telegram_ids_by_telegram_names,
+    orm_select_existing_telegram_ids,
+)
+from app.database.registration_cache import registration_cache
+
+
+MAX_ROWS = 10000
+
+# Same rules as the room_add, desk_add and user_add services
+NAME_PATTERN = re.compile(r'^[A-Za-zА-Яа-я0-9_]{1,10}$')
+TELEGRAM_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_]{5,32}$')
+
+# Entities in import order (desks need rooms, desk assignments need desks and users) and their columns
+REQUIRED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "rooms": ("name",),
+    "desks": ("room", "name"),
+    "users": ("telegram_id", "telegram_name"),
+    "desk_assignments": ("desk", "weekday"), # and telegram_id or telegram_name
+}
+
+
+class ImportFileError(Exception):
+    """The file cannot be imported at all (unknown format, unknown columns, too many rows)."""
+    pass
+
+
+class RowValueError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class ImportRow:
+    kind: str
+    location: str # e.g. "line 5" for CSV, "desks #3" for JSON
+    values: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class RowError:
+    location: str
+    message: str
+
+
+@dataclass(slots=True)
+class ImportReport:
+    inserted: Dict[str, int] = field(default_factory=dict) # Valid rows per kind if dry_run
+    errors: List[RowError] = field(default_factory=list)
+    dry_run: bool = False
+
+
+    def error(self, row: ImportRow, message: str) -> None:
+        self.errors.append(RowError(row.location, message))
+
+
+    def summary(self, max_errors: int = 20) -> str:
+        imported = ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in self.inserted.items()) or "nothing"
+        lines = [f"Valid (not imported): {imported}." if self.dry_run else f"Imported: {imported}."]
+        if self.errors:
+            lines.append(f"Rows with errors: {len(self.errors)}")
+            lines.extend(f"{error.location}: {error.message}" for error in self.errors[:max_errors])
+            if len(self.errors) > max_errors:
+                lines.append(f"... and {len(self.errors) - max_errors} more")
+        return "\n".join(lines)
+
+
+    def errors_csv(self) -> bytes:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(("row", "error"))
+        writer.writerows((error.location, error.message) for error in self.errors)
+        return output.getvalue().encode("utf-8")
+
+
+#* Parsing
+def parse_import_file(filename: str, content: bytes) -> List[ImportRow]:
+    """
+    Parses a CSV file with one kind of entities (detected from its columns)
+    or a JSON file like {"rooms": [...], "desks": [...], "users": [...], "desk_assignments": [...]}.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFileError("The file must be UTF-8 encoded.")
+    if filename.lower().endswith(".json"):
+        rows = _parse_json(text)
+    elif filename.lower().endswith(".csv"):
+        rows = _parse_csv(text)
+    else:
+        raise ImportFileError("Please send a .csv or .json file.")
+    if len(rows) > MAX_ROWS:
+        raise ImportFileError(f"The file has {len(rows)} rows, at most {MAX_ROWS} can be imported at once.")
+    return rows
+
+
+def _parse_json(text: str) -> List[ImportRow]:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ImportFileError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict) or not data or not set(data) <= REQUIRED_COLUMNS.keys():
+        raise ImportFileError(f"The JSON file must be an object with the keys: {', '.join(REQUIRED_COLUMNS)}.")
+    rows = []
+    for kind, items in data.items():
+        if not isinstance(items, list):
+            raise ImportFileError(f'"{kind}" must be a list of objects.')
+        for index, item in enumerate(items, start=1):
+            values = {str(key).lower(): value for key, value in item.items()} if isinstance(item, dict) else {}
+            rows.append(ImportRow(kind, f"{kind} #{index}", values))
+    return rows
+
+
+def _parse_csv(text: str) -> List[ImportRow]:
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    columns = {(column or "").strip().lower() for column in reader.fieldnames or []}
+    kind = _detect_kind(columns)
+    rows = []
+    for values in reader:
+        values = {(key or "").strip().lower(): value for key, value in values.items()}
+        if any(value not in (None, "") for value in values.values()): # Skip empty lines
+            rows.append(ImportRow(kind, f"line {reader.line_num}", values))
+    return rows
+
+
+def _detect_kind(columns: set) -> str:
+    for kind in ("desk_assignments", "desks", "users", "rooms"):
+        if set(REQUIRED_COLUMNS[kind]) <= columns:
+            return kind
+    expected = "; ".join(
+        f"{kind}: {', '.join(REQUIRED_COLUMNS[kind])}" for kind in REQUIRED_COLUMNS)
+    raise ImportFileError(f"Unknown CSV columns. The first line must name the columns, at least:\n{expected}")
+
+
+#* Validation
+def _text(values: Dict[str, Any], column: str, required: bool = True) -> Optional[str]:
+    value = values.get(column)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        if required:
+            raise RowValueError(f"{column} is required")
+        return None
+    return value
+
+
+def _name(values: Dict[str, Any], column: str) -> str:
+    name = _text(values, column)
+    if not NAME_PATTERN.match(name):
+        raise RowValueError(
+            f"{column} must be 1-10 characters long and can include latin or cyrillic letters, numbers and underscores")
+    return name
+
+
+def _bool(values: Dict[str, Any], column: str, default: bool = True) -> bool:
+    value = values.get(column)
+    if isinstance(value, bool):
+        return value
+    value = "" if value is None else str(value).strip().lower()
+    if not value:
+        return default
+    if value in ("true", "1", "t", "yes", "y"):
+        return True
+    if value in ("false", "0", "f", "no", "n"):
+        return False
+    raise RowValueError(f"{column} must be true or false")
+
+
+def _telegram_id(values: Dict[str, Any], required: bool = True) -> Optional[int]:
+    value = _text(values, "telegram_id", required)
+    if value is None:
+        return None
+    if not value.isdigit() or not 5 <= len(value) <= 12:
+        raise RowValueError("telegram_id must be a number of 5-12 digits")
+    return int(value)
+
+
+def _telegram_name(values: Dict[str, Any], required: bool = True) -> Optional[str]:
+    value = _text(values, "telegram_name", required)
+    if value is None:
+        return None
+    value = value.lstrip("@")
+    if not TELEGRAM_NAME_PATTERN.match(value):
+        raise RowValueError("telegram_name must be 5-32 characters long and can include latin letters, numbers and underscores")
+    return value
+
+
+def _weekday(values: Dict[str, Any]) -> Weekday:
+    value = _text(values, "weekday").upper()
+    if value.isdigit() and int(value) < len(Weekday):
+        return Weekday(int(value))
+    try:
+        return Weekday[value]
+    except KeyError:
+        raise RowValueError("weekday must be a day name (e.g. Monday) or a number from 0 (Monday) to 6 (Sunday)")
+
+
+def _optional_short_text(values: Dict[str, Any], column: str, max_length: int = 32) -> Optional[str]:
+    value = _text(values, column, required=False)
+    if value is not None and len(value) > max_length:
+        raise RowValueError(f"{column} must be at most {max_length} characters long")
+    return value
+
+
+def _validate_room(values: Dict[str, Any]) -> dict:
+    return {
+        "name": _name(values, "name"),
+        "is_available": _bool(values, "is_available"),
+        "plan": _optional_short_text(values, "plan", max_length=255),
+    }
+
+
+def _validate_desk(values: Dict[str, Any]) -> dict:
+    return {
+        "room": _text(values, "room"),
+        "name": _name(values, "name"),
+        "is_available": _bool(values, "is_available"),
+    }
+
+
+def _validate_user(values: Dict[str, Any]) -> dict:
+    return {
+        "telegram_id": _telegram_id(values),
+        "telegram_name": _telegram_name(values),
+        "first_name": _optional_short_text(values, "first_name"),
+        "last_name": _optional_short_text(values, "last_name"),
+    }
+
+
+def _validate_desk_assignment(values: Dict[str, Any]) -> dict:
+    telegram_id = _telegram_id(values, required=False)
+    telegram_name = _telegram_name(values, required=False) if telegram_id is None else None
+    if telegram_id is None and telegram_name is None:
+        raise RowValueError("telegram_id or telegram_name is required")
+    return {
+        "desk": _text(values, "desk"),
+        "weekday": _weekday(values),
+        "user": telegram_id if telegram_id is not None else f"@{telegram_name}",
+        "telegram_id": telegram_id,
+        "telegram_name": telegram_name,
+    }
+
+
+VALIDATORS: Dict[str, Callable[[Dict[str, Any]], dict]] = {
+    "rooms": _validate_room,
+    "desks": _validate_desk,
+    "users": _validate_user,
+    "desk_assignments": _validate_desk_assignment,
+}
+
+# Values that must be unique within the file, per kind
+UNIQUE_KEYS: Dict[str, Tuple[Callable[[dict], Any], ...]] = {
+    "rooms": (lambda item: item["name"],),
+    "desks": (lambda item: item["name"],),
+    "users": (lambda item: item["telegram_id"], lambda item: item["telegram_name"].lower()),
+    "desk_assignments": (lambda item: (item["desk"], item["weekday"]), lambda item: (item["user"], item["weekday"])),
+}
+
+
+def _validate(kind: str, rows: List[ImportRow], report: ImportReport) -> List[Tuple[ImportRow, dict]]:
+    """Returns the valid rows with their parsed values, dropping the rows that repeat a unique value of an earlier row."""
+    items = []
+    seen: List[Dict[Any, str]] = [{} for _ in UNIQUE_KEYS[kind]]
+    for row in rows:
+        try:
+            item = VALIDATORS[kind](row.values)
+        except RowValueError as e:
+            report.error(row, str(e))
+            continue
+        keys = [key(item) for key in UNIQUE_KEYS[kind]]
+        duplicate_of = next((seen_keys[k] for seen_keys, k in zip(seen, keys) if k in seen_keys), None)
+        if duplicate_of is not None:
+            report.error(row, f"duplicate of {duplicate_of}")
+            continue
+        for seen_keys, k in zip(seen, keys):
+            seen_keys[k] = row.location
+        items.append((row, item))
+    return items
+
+
+#* Import
+async def _insert(
+    session: AsyncSession,
+    kind: str,
+    model: type,
+    items: List[Tuple[ImportRow, dict]],
+    returning: tuple,
+    key: Callable[[dict], tuple],
+    report: ImportReport,
+    ) -> List[tuple]:
+    """Inserts the rows (items are (row, database values) pairs) and reports the rows skipped because they already exist."""
+    if not items:
+        return []
+    inserted = await orm_bulk_insert_on_conflict_do_nothing(session, model, [values for _, values in items], returning)
+    inserted_keys = set(inserted)
+    for row, values in items:
+        if key(values) not in inserted_keys:
+            report.error(row, "already exists")
+    report.inserted[kind] = len(inserted)
+    return inserted
+
+
+async def _import_rooms(session: AsyncSession, items: List[Tuple[ImportRow, dict]], report: ImportReport) -> None:
+    await _insert(session, "rooms", Room, items, (Room.name,), lambda values: (values["name"],), report)
+
+
+async def _import_desks(session: AsyncSession, items: List[Tuple[ImportRow, dict]], report: ImportReport) -> None:
+    room_ids = await orm_select_room_ids_by_names(session, list({item["room"] for _, item in items}))
+    resolved = []
+    for row, item in items:
+        if item["room"] not in room_ids:
+            report.error(row, f"room {item['room']} does not exist")
+            continue
+        resolved.append((row, {"name": item["name"], "room_id": room_ids[item["room"]], "is_available": item["is_available"]}))
+    await _insert(session, "desks", Desk, resolved, (Desk.name,), lambda values: (values["name"],), report)
+
+
+async def _import_users(session: AsyncSession, items: List[Tuple[ImportRow, dict]], report: ImportReport) -> None:
+    inserted = await _insert(
+        session, "users", User, items, (User.telegram_id,), lambda values: (values["telegram_id"],), report)
+    await registration_cache.invalidate_many([telegram_id for telegram_id, in inserted])
+
+
+async def _import_desk_assignments(session: AsyncSession, items: List[Tuple[ImportRow, dict]], report: ImportReport) -> None:
+    desk_ids = await orm_select_desk_ids_by_names(session, list({item["desk"] for _, item in items}))
+    telegram_names = list({item["telegram_name"] for _, item in items if item["telegram_name"] is not None})
+    telegram_ids_by_name = await orm_select_telegram_ids_by_telegram_names(session, telegram_names) if telegram_names else {}
+    telegram_ids = list({item["telegram_id"] for _, item in items if item["telegram_id"] is not None})
+    existing_telegram_ids = await orm_select_existing_telegram_ids(session, telegram_ids) if telegram_ids else set()
+
+    resolved = []
+    for row, item in items:
+        if item["desk"] not in desk_ids:
+            report.error(row, f"desk {item['desk']} does not exist")
+            continue
+        telegram_id = item["telegram_id"] if item["telegram_id"] in existing_telegram_ids else telegram_ids_by_name.get(item["telegram_name"])
+        if telegram_id is None:
+            report.error(row, f"user {item['user']} does not exist")
+            continue
+        resolved.append((row, {"desk_id": desk_ids[item["desk"]], "telegram_id": telegram_id, "weekday": item["weekday"]}))
+    await _insert(
+        session, "desk_assignments", DeskAssignment, resolved,
+        (DeskAssignment.desk_id, DeskAssignment.weekday), lambda values: (values["desk_id"], values["weekday"]), report)
+
+
+IMPORTERS = {
+    "rooms": _import_rooms,
+    "desks": _import_desks,
+    "users": _import_users,
+    "desk_assignments": _import_desk_assignments,
+}
+
+
+async def bulk_import(session: AsyncSession, rows: List[ImportRow]) -> ImportReport:
+    """
+    Validates the rows, resolves room, desk and user references with one query per kind,
+    and inserts each kind with multi-row INSERT ... ON CONFLICT DO NOTHING statements.
+    Invalid rows and rows that already exist are reported, the other rows are imported.
+    """
+    report = ImportReport()
+    rows_by_kind: Dict[str, List[ImportRow]] = defaultdict(list)
+    for row in rows:
+        rows_by_kind[row.kind].append(row)
+    for kind, importer in IMPORTERS.items():
+        if rows_by_kind[kind]:
+            await importer(session, _validate(kind, rows_by_kind[kind], report), report)
+    return report
+
+
+def check_rows(rows: List[ImportRow]) -> ImportReport:
+    """Validates the rows without the database: references to rooms, desks and users and conflicts are not checked."""
+    report = ImportReport(dry_run=True)
+    rows_by_kind: Dict[str, List[ImportRow]] = defaultdict(list)
+    for row in rows:
+        rows_by_kind[row.kind].append(row)
+    for kind in IMPORTERS:
+        if rows_by_kind[kind]:
+            report.inserted[kind] = len(_validate(kind, rows_by_kind[kind], report))
+    return report
+
+
+async def bulk_import_file(session: AsyncSession, filename: str, content: bytes) -> ImportReport:
+    return await bulk_import(session, parse_import_file(filename, content))
@@ -5,6 +5,7 @@ from app.database.orm_queries import (
     orm_select_user_by_telegram_id_or_telegram_name,
     orm_insert_user,
     orm_select_user_from_waitlist_by_telegram_name)
+from app.database.registration_cache import registration_cache
 
 
 class UserInputError(Exception):
@@ -43,6 +44,7 @@ async def user_add_service_with_string_parsing(session: AsyncSession, user_input
         raise UserInputError("User already exists.")
 
     await orm_insert_user(session, telegram_id, telegram_name)
+    await registration_cache.invalidate(telegram_id)
     return f"User @{telegram_name} has been added"
 
 
@@ -69,4 +71,5 @@ async def user_add_service_by_telegram_name_from_wl(session: AsyncSession, teleg
         telegram_name,
         first_name,
         last_name)
+    await registration_cache.invalidate(telegram_id)
     return f"User @{telegram_name} has been added"
\ No newline at end of file
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import orm_select_user_by_telegram_id, orm_delete_user_by_telegram_id
+from app.database.registration_cache import registration_cache
 
 
 class UserInputError(Exception):
@@ -30,4 +31,5 @@ async def user_delete_by_id_service(session: AsyncSession, user_input: str) -> s
     
     # Delete the user by their Telegram ID
     await orm_delete_user_by_telegram_id(session, telegram_id)
+    await registration_cache.invalidate(telegram_id)
     return "User has been deleted."
\ No newline at end of file
@@ -2,6 +2,7 @@ import re
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import orm_select_user_by_telegram_name, orm_delete_user_by_telegram_name
+from app.database.registration_cache import registration_cache
 
 
 class UserInputError(Exception):
@@ -27,4 +28,5 @@ async def user_delete_by_username_service(session: AsyncSession, user_input: str
 
     # Perform the deletion
     await orm_delete_user_by_telegram_name(session, username)
+    await registration_cache.invalidate(existing_user.telegram_id)
     return "User has been deleted successfully."
\ No newline at end of file
@@ -1,6 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.orm_queries import orm_delete_user_from_waitlist_by_telegram_name
+from app.database.orm_queries import (
+    orm_select_user_from_waitlist_by_telegram_name,
+    orm_delete_user_from_waitlist_by_telegram_name)
+from app.database.registration_cache import registration_cache
 
 
 class InputError(Exception):
@@ -14,7 +17,10 @@ async def waitlist_user_delete_by_username_service(session: AsyncSession, telegr
         raise InputError("InputError: Telegram name missing.")
     
     try:
+        waitlist_user = await orm_select_user_from_waitlist_by_telegram_name(session, telegram_name)
         await orm_delete_user_from_waitlist_by_telegram_name(session, telegram_name)
+        if waitlist_user:
+            await registration_cache.invalidate(waitlist_user.telegram_id)
         return f"User @{telegram_name} has been deleted from the waitlist."
     except Exception as e:
         raise InputError(f"Error: {e}")
\ No newline at end of file
@@ -1,7 +1,8 @@
-from typing import Dict, List, TYPE_CHECKING, Tuple, Union
+from typing import Callable, Dict, Iterable, List, TYPE_CHECKING, Tuple, Union
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.fan_out import fan_out
 from app.database.models import Booking, DeskAssignment
 
 from app.database.orm_queries import (
@@ -9,8 +10,15 @@ from app.database.orm_queries import (
     orm_select_team_name_by_id,
     orm_select_bookings_by_team_id_joined_from_today,
     orm_select_desk_assignments_by_team_id_selectinload,
+    orm_select_booking_rows_by_telegram_id_from_today,
+    orm_select_booking_rows_by_room_id_from_today,
+    orm_select_booking_rows_by_team_id_from_today,
+    orm_select_desk_assignment_rows_by_room_id,
+    orm_select_desk_assignment_rows_by_team_id,
 )
 
+from app.database.view_cache import view_cache, locale_of, source_of
+
 if TYPE_CHECKING:
     from app.locales.stub import TranslatorRunner # type: ignore
 
@@ -19,6 +27,28 @@ class AllBookingsError(Exception):
     pass
 
 
+def render_grouped_list(
+    first_line: str,
+    rows: Iterable,
+    group_key: Callable[[object], str],
+    group_header: Callable[[str], str],
+    item_line: Callable[[object], str],
+    ) -> str:
+    """
+    Renders rows grouped by group_key (e.g. by date) in a single pass:
+    the first line, then each group header followed by its item lines, groups separated by blank lines.
+    """
+    groups: Dict[str, List[str]] = {}
+    for row in rows:
+        groups.setdefault(group_key(row), []).append(item_line(row))
+    parts: List[str] = [first_line, '\n\n']
+    for key, lines in groups.items():
+        parts.append(group_header(key) + '\n')
+        parts.extend(line + '\n' for line in lines)
+        parts.append('\n')
+    return ''.join(parts)
+
+
 async def generate_list_of_current_bookings_by_telegram_id(
     i18n,
     session: AsyncSession,
@@ -26,24 +56,40 @@ async def generate_list_of_current_bookings_by_telegram_id(
     date_format_short: str,
     telegram_id: int,
     telegram_name: str | None = "Anonymous user"
+) -> str:
+    # Cached until the next booking write
+    return await view_cache.get_or_render(
+        ('my-bookings', telegram_id, telegram_name, locale_of(i18n), date_format, date_format_short, source_of(session)),
+        lambda: _render_list_of_current_bookings_by_telegram_id(
+            i18n, session, date_format, date_format_short, telegram_id, telegram_name))
+
+
+async def _render_list_of_current_bookings_by_telegram_id(
+    i18n,
+    session: AsyncSession,
+    date_format: str,
+    date_format_short: str,
+    telegram_id: int,
+    telegram_name: str | None,
 ) -> str:
     i18n: TranslatorRunner = i18n
-    bookings_obj = await orm_select_bookings_by_telegram_id_joined_from_today(session, telegram_id)
+    bookings = await orm_select_booking_rows_by_telegram_id_from_today(session, telegram_id)
     try:
-        if not bookings_obj:
+        if not bookings:
             #! my-bookings-no-bookings
             return i18n.my.bookings.no.bookings()
         else:
             #! my-bookings-greeting
-            list_of_bookings: str = i18n.my.bookings.greeting(telegram_name=f'@{telegram_name}') + '\n\n'
-            for booking in bookings_obj:
-                date = booking.date.strftime(date_format)
-                room_name = booking.desk.room.name
-                desk_name = booking.desk.name
-                booked_on = booking.created_at.strftime(date_format_short)
+            parts: List[str] = [i18n.my.bookings.greeting(telegram_name=f'@{telegram_name}'), '\n\n']
+            for booking in bookings:
                 #! my-bookings-list
-                list_of_bookings += i18n.my.bookings.list(date=date, room_name=room_name, desk_name=desk_name, booked_on=booked_on) + '\n\n'
-            return list_of_bookings
+                parts.append(i18n.my.bookings.list(
+                    date=booking.date.strftime(date_format),
+                    room_name=booking.room_name,
+                    desk_name=booking.desk_name,
+                    booked_on=booking.created_at.strftime(date_format_short)))
+                parts.append('\n\n')
+            return ''.join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -122,89 +168,54 @@ async def generate_current_bookings_list_by_room_id(
     ) -> Tuple[str, str]:
     '''
     Returns a tuple of two strings: the first string a tag for the response, and the second string is the response message.
+    The response is cached until the next booking, desk assignment or out-of-office write.
     '''
+    return await view_cache.get_or_render(
+        ('room-bookings', room_id, locale_of(i18n), date_format, date_format_short, source_of(session)),
+        lambda: _render_current_bookings_list_by_room_id(i18n, session, date_format, date_format_short, room_id))
+
+
+async def _render_current_bookings_list_by_room_id(
+    i18n,
+    session: AsyncSession,
+    date_format: str,
+    date_format_short: str,
+    room_id: int
+    ) -> Tuple[str, str]:
     i18n: TranslatorRunner = i18n
-    # Fetch bookings for the given room from the database
-    bookings = await orm_select_bookings_by_room_id_joined_from_today(session, room_id)
-    assignments = await orm_select_desk_assignments_by_room_id_selectinload(session, room_id)
+    # Fetch only the needed columns of bookings and desk assignments for the given room, concurrently
+    bookings, assignments = await fan_out(
+        session,
+        lambda s: orm_select_booking_rows_by_room_id_from_today(s, room_id),
+        lambda s: orm_select_desk_assignment_rows_by_room_id(s, room_id))
     
     if bookings:
-        # Get room_name
-        room_name = bookings[0].desk.room.name
-        room_plan = bookings[0].desk.room.plan
-        # Initialize a dictionary to store bookings organized by date
-        bookings_by_date: Dict[str, List[Booking]] = {}
-
-        # Iterate over each booking
-        for booking in bookings:
-            # Format the booking date as per the given date format
-            booking_date = booking.date.strftime(date_format)
-
-            # If this date is not already a key in the dictionary, add it
-            if booking_date not in bookings_by_date:
-                bookings_by_date[booking_date] = []
-
-            # Append the current booking to the list of bookings for this date
-            bookings_by_date[booking_date].append(booking)
-
-        # Initialize an empty string to accumulate the formatted booking information
-        list_of_bookings: str = ''
-
-        # Iterate over each date and its associated bookings
-        for date, bookings in bookings_by_date.items():
-            # Add the date as a header
+        response_bookings: str = render_grouped_list(
+            #! all-bookings-greeting
+            first_line=i18n.all.bookings.greeting(room_name=bookings[0].room_name),
+            rows=bookings,
+            group_key=lambda booking: booking.date.strftime(date_format),
             #! all-bookings-date
-            list_of_bookings += i18n.all.bookings.date(date=date) + '\n'
-            # Add each booking under this date
-            for booking in bookings:
-                #! all-bookings-desk-user
-                list_of_bookings += i18n.all.bookings.desk.user(desk_name=booking.desk.name, telegram_name=f'@{booking.user.telegram_name}') + '\n'
-            # Add a newline for separation between different dates
-            list_of_bookings += '\n'
-        # The first line of the final output
-        #! all-bookings-greeting
-        first_line = i18n.all.bookings.greeting(room_name=room_name) + '\n\n'
-        
-        response_bookings: str = first_line + list_of_bookings
+            group_header=lambda date: i18n.all.bookings.date(date=date),
+            #! all-bookings-desk-user
+            item_line=lambda booking: i18n.all.bookings.desk.user(
+                desk_name=booking.desk_name,
+                telegram_name=f'@{booking.telegram_name}'),
+        )
     
     if assignments:
-        # Get room_name
-        room_name = assignments[0].desk.room.name
-        
-        # Desk assignments by weekday
-        assignments_by_weekday: Dict[str, List[DeskAssignment]] = {}
-        
-        # Iterate over each assignment
-        for assignment in assignments:
-            # Format the weekday
-            weekday = assignment.weekday.name
-            # If this weekday is not already a key in the dictionary, add it
-            if weekday not in assignments_by_weekday:
-                assignments_by_weekday[weekday] = []
-            # Append the current assignment to the list of assignments for this weekday
-            assignments_by_weekday[weekday].append(assignment)
-        
-        list_of_assignments: str = ''
-        
-        # Iterate over each weekday and its associated assignments
-        for weekday, assignments in assignments_by_weekday.items():
-            # Add the weekday as a header
+        response_assignments: str = render_grouped_list(
+            #! all-bookings-desk-assignments-first-line
+            first_line=i18n.all.bookings.desk.assignments.first.line(room_name=assignments[0].room_name),
+            rows=assignments,
+            group_key=lambda assignment: assignment.weekday.name,
             #! all-bookings-desk-assignments-weekday
-            list_of_assignments += i18n.all.bookings.desk.assignments.weekday(weekday=weekday) + '\n'
-            # Add each assignment under this weekday
-            for assignment in assignments:
-                #! all-bookings-desk-user
-                list_of_assignments += i18n.all.bookings.desk.user(
-                    desk_name=assignment.desk.name,
-                    telegram_name=f'@{assignment.user.telegram_name}'
-                ) + '\n'
-            # Add a newline for separation between different weekdays
-            list_of_assignments += '\n'
-        # The first line of the final output
-        #! all-bookings-desk-assignments-first-line
-        first_line = i18n.all.bookings.desk.assignments.first.line(room_name=room_name) + '\n\n'
-
-        response_assignments = first_line + list_of_assignments
+            group_header=lambda weekday: i18n.all.bookings.desk.assignments.weekday(weekday=weekday),
+            #! all-bookings-desk-user
+            item_line=lambda assignment: i18n.all.bookings.desk.user(
+                desk_name=assignment.desk_name,
+                telegram_name=f'@{assignment.telegram_name}'),
+        )
 
     if bookings and assignments:
         final_response = response_bookings + response_assignments
@@ -230,17 +241,37 @@ async def generate_current_bookings_list_by_team_id(
     session: AsyncSession,
     date_format: str,
     date_format_short: str,
-    team_id: int
+    team_id: int,
+    subtree: bool = False,
     ) -> Tuple[str, str]:
     '''
     Returns a tuple of two strings: the first string a tag for the response, and the second string is the response message.
+    With subtree=True the list includes the members of the sub-teams at any depth (e.g. a department's seating).
+    The response is cached until the next booking, desk assignment or out-of-office write.
     '''
+    return await view_cache.get_or_render(
+        ('team-bookings', team_id, subtree, locale_of(i18n), date_format, date_format_short, source_of(session)),
+        lambda: _render_current_bookings_list_by_team_id(i18n, session, date_format, date_format_short, team_id, subtree))
+
+
+async def _render_current_bookings_list_by_team_id(
+    i18n,
+    session: AsyncSession,
+    date_format: str,
+    date_format_short: str,
+    team_id: int,
+    subtree: bool = False,
+    ) -> Tuple[str, str]:
     i18n: TranslatorRunner = i18n
-    # Get team_name
-    team_name = await orm_select_team_name_by_id(session, team_id)
-    # Fetch bookings for the given team from the database
-    bookings = await orm_select_bookings_by_team_id_joined_from_today(session, team_id)
-    assignments = await orm_select_desk_assignments_by_team_id_selectinload(session, team_id)
+    # Fetch team_name and only the needed columns of bookings and desk assignments for the given team, concurrently
+    team_name, bookings, assignments = await fan_out(
+        session,
+        lambda s: orm_select_team_name_by_id(s, team_id),
+        lambda s: orm_select_booking_rows_by_team_id_from_today(s, team_id, subtree),
+        lambda s: orm_select_desk_assignment_rows_by_team_id(s, team_id, subtree))
+    if subtree:
+        #! team-subtree
+        team_name = i18n.team.subtree(team_name=team_name)
     
     if not bookings and not assignments:
         # Handle the case where both lists are empty
@@ -248,77 +279,34 @@ async def generate_current_bookings_list_by_team_id(
         return ("empty", i18n.team.bookings.no.bookings.assignments(team_name=team_name))
     
     if bookings:
-        # Initialize a dictionary to store bookings organized by date
-        bookings_by_date: Dict[str, List[Booking]] = {}
-
-        # Iterate over each booking
-        for booking in bookings:
-            # Format the booking date as per the given date format
-            booking_date = booking.date.strftime(date_format)
-    
-            # If this date is not already a key in the dictionary, add it
-            if booking_date not in bookings_by_date:
-                bookings_by_date[booking_date] = []
-
-            # Append the current booking to the list of bookings for this date
-            bookings_by_date[booking_date].append(booking)
-
-        # Initialize an empty string to accumulate the formatted booking information
-        list_of_bookings: str = ''
-
-        # Iterate over each date and its associated bookings
-        for date, bookings in bookings_by_date.items():
-            # Add the date as a header
+        response_bookings: str = render_grouped_list(
+            #! team-bookings-first-line
+            first_line=i18n.team.bookings.first.line(team_name=team_name),
+            rows=bookings,
+            group_key=lambda booking: booking.date.strftime(date_format),
             #! team-bookings-date
-            list_of_bookings += i18n.team.bookings.date(date=date) + '\n'
-            # Add each booking under this date
-            for booking in bookings:
-                #! team-bookings-room-desk-user
-                list_of_bookings += i18n.team.bookings.room.desk.user(room_name=booking.desk.room.name, desk_name=booking.desk.name, telegram_name=f'@{booking.user.telegram_name}') + '\n'
-            # Add a newline for separation between different dates
-            list_of_bookings += '\n'
-        # The first line of the final output
-        #! team-bookings-first-line
-        first_line = i18n.team.bookings.first.line(team_name=team_name) + '\n\n'
-        
-        response_bookings: str = first_line + list_of_bookings
+            group_header=lambda date: i18n.team.bookings.date(date=date),
+            #! team-bookings-room-desk-user
+            item_line=lambda booking: i18n.team.bookings.room.desk.user(
+                room_name=booking.room_name,
+                desk_name=booking.desk_name,
+                telegram_name=f'@{booking.telegram_name}'),
+        )
     
     if assignments:
-        # Desk assignments by weekday
-        assignments_by_weekday: Dict[str, List[DeskAssignment]] = {}
-        
-        # Iterate over each assignment
-        for assignment in assignments:
-            # Format the weekday
-            weekday = assignment.weekday.name
-            # If this weekday is not already a key in the dictionary, add it
-            if weekday not in assignments_by_weekday:
-                assignments_by_weekday[weekday] = []
-            # Append the current assignment to the list of assignments for this weekday
-            assignments_by_weekday[weekday].append(assignment)
-        
-        list_of_assignments: str = ''
-        
-        # Iterate over each weekday and its associated assignments
-        for weekday, assignments in assignments_by_weekday.items():
-            # Add the weekday as a header
+        response_assignments: str = render_grouped_list(
+            #! team-bookings-desk-assignments-first-line
+            first_line=i18n.team.bookings.desk.assignments.first.line(team_name=team_name),
+            rows=assignments,
+            group_key=lambda assignment: assignment.weekday.name,
             #! team-bookings-desk-assignments-weekday
-            list_of_assignments += i18n.team.bookings.desk.assignments.weekday(weekday=weekday) + '\n'
-            # Add each assignment under this weekday
-            for assignment in assignments:
-                #! team-bookings-room-desk-user
-                list_of_assignments += i18n.team.bookings.room.desk.user(
-                    room_name=assignment.desk.room.name,
-                    desk_name=assignment.desk.name,
-                    telegram_name=f'@{assignment.user.telegram_name}'
-                ) + '\n'
-            # Add a newline for separation between different weekdays
-            list_of_assignments += '\n'
-        # The first line of the final output
-        #! team-bookings-desk-assignments-first-line
-        first_line = i18n.team.bookings.desk.assignments.first.line(team_name=team_name) + '\n\n'
-
-        response_assignments = first_line + list_of_assignments
+            group_header=lambda weekday: i18n.team.bookings.desk.assignments.weekday(weekday=weekday),
+            #! team-bookings-room-desk-user
+            item_line=lambda assignment: i18n.team.bookings.room.desk.user(
+                room_name=assignment.room_name,
+                desk_name=assignment.desk_name,
+                telegram_name=f'@{assignment.telegram_name}'),
+        )
 
     if bookings and assignments:
         final_response = response_bookings + response_assignments
@@ -389,15 +377,15 @@ async def generate_current_bookings_by_telegram_id(
     """
     i18n: TranslatorRunner = i18n
     bookings_list: List[Tuple[int, str]] = []
-    bookings_obj = await orm_select_bookings_by_telegram_id_joined_from_today(session, telegram_id)
+    bookings = await orm_select_booking_rows_by_telegram_id_from_today(session, telegram_id)
     try:
-        if not bookings_obj:
+        if not bookings:
             return []
         else:
-            for booking in bookings_obj:
+            for booking in bookings:
                 date = booking.date.strftime(date_format)
-                room_name = booking.desk.room.name
-                desk_name = booking.desk.name
+                room_name = booking.room_name
+                desk_name = booking.desk_name
                 booking_data = i18n.bookings.to.cancel(date=date, room_name=room_name, desk_name=desk_name)
                 bookings_list.append((booking.id, booking_data))
             return bookings_list
@@ -0,0 +1,76 @@
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+import pytz
+import holidays
+
+
+#* Business days (Monday to Friday, excluding public holidays of the country) with NumPy busday_count semantics.
+#* Counting is O(1) in the length of the interval: full weeks are counted arithmetically
+#* and holidays are counted with a binary search over a sorted list of weekday holidays.
+
+
+@lru_cache(maxsize=None)
+def get_country_holidays(country_code: str, year: int) -> holidays.HolidayBase:
+    """Returns public holidays of the country for the year. Each (country, year) is built only once."""
+    return holidays.country_holidays(country_code, years=year)
+
+
+def is_holiday(day: date, country_code: Optional[str]) -> bool:
+    return bool(country_code) and day in get_country_holidays(country_code, day.year)
+
+
+@lru_cache(maxsize=None)
+def _weekday_holidays(country_code: str, first_year: int, last_year: int) -> Tuple[date, ...]:
+    """Sorted holidays falling on weekdays (holidays on weekends are not business days anyway)."""
+    days = set()
+    for year in range(first_year, last_year + 1):
+        days.update(day for day in get_country_holidays(country_code, year) if day.weekday() < 5)
+    return tuple(sorted(days))
+
+
+def _count_weekdays(begin: date, end: date) -> int:
+    """Counts Monday-Friday days in [begin, end)."""
+    days = (end - begin).days
+    full_weeks, remainder = divmod(days, 7)
+    start_weekday = begin.weekday()
+    # At most 6 remaining days
+    return full_weeks * 5 + sum(1 for i in range(remainder) if (start_weekday + i) % 7 < 5)
+
+
+def busday_count(begin: date, end: date, country_code: Optional[str] = None) -> int:
+    """
+    Counts business days in [begin, end), like numpy.busday_count.
+    If end is before begin, the result is negative.
+    """
+    if end < begin:
+        return -busday_count(end, begin, country_code)
+    count = _count_weekdays(begin, end)
+    if country_code:
+        holidays_list = _weekday_holidays(country_code, begin.year, end.year)
+        count -= bisect_left(holidays_list, end) - bisect_left(holidays_list, begin)
+    return count
+
+
+def local_today(timezone: Optional[str] = None) -> date:
+    """Returns today's date in the timezone (server local date if the timezone is not set)."""
+    if timezone:
+        return datetime.now(pytz.timezone(timezone)).date()
+    return datetime.now().date()
+
+
+def workdays_difference(
+    booking_date: date,
+    country_code: Optional[str] = None,
+    timezone: Optional[str] = None,
+    today: Optional[date] = None,
+    ) -> int:
+    """
+    Returns the number of business days from today to the booking date, both inclusive.
+    Used by the advanced mode to check if the booking date is within the standard access days.
+    """
+    if today is None:
+        today = local_today(timezone)
+    return max(0, busday_count(today, booking_date + timedelta(days=1), country_code))
+
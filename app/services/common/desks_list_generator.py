@@ -1,17 +1,14 @@
-from typing import List, Optional, Union
-from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import (
     orm_select_available_desks_by_room_name,
-    orm_select_room_id_by_name,
-    orm_select_available_desks_by_desks_id_and_weekday,
-    orm_select_team_id_by_telegram_id,
-    orm_select_team_preferred_room_id,
-    orm_select_available_not_booked_desks_by_room_id,
+    orm_select_room_plan_and_bookable_desks_by_room_name,
 )
-from app.database.enums.weekdays import Weekday
+from app.database.occupancy import occupancy_matrix
+from app.services.common.business_days import workdays_difference
 
 
 async def generate_available_desks_list(session: AsyncSession, room_name: str) -> List[str]:
@@ -26,23 +23,7 @@ async def parse_booking_date(date: str, date_format: str) -> Union[datetime.date
         return "Error: Incorrect date format. Parsing date to datetime.date failed."
 
 
-async def fetch_desks_list(
-    session: AsyncSession,
-    room_id: int,
-    weekday: Weekday,
-    booking_date: datetime.date,
-    ) -> List: # Alternative 
-    try:
-        not_booked_desks_obj = await orm_select_available_not_booked_desks_by_room_id(session, room_id, booking_date)
-        not_booked_desks_id = [desk.id for desk in not_booked_desks_obj]
-        # Get the desks that are not assigned and not booked by
-        desks_obj = await orm_select_available_desks_by_desks_id_and_weekday(session, not_booked_desks_id, weekday)
-        return [desk.name for desk in desks_obj if desks_obj] or []
-    except Exception as e:
-        raise RuntimeError(f"Error retrieving desks: {e}") from e
-
-
-async def generate_desks_list(
+async def generate_desks_list_with_room_plan(
     session: AsyncSession,
     room_name: str,
     date: str,
@@ -50,68 +31,77 @@ async def generate_desks_list(
     advanced_mode: Optional[bool],
     telegram_id: Optional[int],
     standard_access_days: Optional[int] = 1,
-    ) -> Union[List[str], str]:
+    country_code: Optional[str] = None,
+    timezone: Optional[str] = None,
+    ) -> Tuple[Optional[str], Union[List[str], str]]:
+    """
+    Returns a tuple of the room plan url and the list of bookable desk names for the selected room and date.
+    Both are fetched in a single query. If an error occurs, the second element is an error message.
+    """
     booking_date = await parse_booking_date(date, date_format)
     if isinstance(booking_date, str):
-        return booking_date  # Return error message if parsing failed
+        return None, booking_date  # Return error message if parsing failed
     
-    # Convert integer weekday to Weekday enum
-    weekday_enum = Weekday(booking_date.weekday())
-    today = datetime.now().date()
+    # Advanced mode logic. User can book if (one of the following conditions is met):
+    # - booking date is within standard access days
+    # - preferred room of the user's team matches selected room despite workdays_difference
+    preferred_room_only = (
+        bool(advanced_mode)
+        and workdays_difference(booking_date, country_code, timezone) > standard_access_days)
 
-    # Calculating workdays delta between today and booking date (excluding weekends)
-    workdays_difference = 0
-    current_day = today
-    while current_day <= booking_date:
-        if current_day.weekday() < 5:  # Weekdays are from 0 (Monday) to 4 (Friday)
-            workdays_difference += 1
-        current_day += timedelta(days=1)
-    # Fetch the room ID based on room name
-    room_id = await orm_select_room_id_by_name(session, room_name)
-    if not room_id:
-        return f"Error: Room '{room_name}' not found"
-    # Advanced mode logic
+    # Answer from the in-memory occupancy matrix if it is enabled and covers the booking date
     try:
-        if advanced_mode:
-            # User can book if (one of the following conditions is met):
-            # - no team_id but within standard access days
-            # - preferred_room_id != room_id but within standard access days
-            # - preferred room matches selected room despite workdays_difference
-            team_id = await orm_select_team_id_by_telegram_id(session, telegram_id)
-            
-            if team_id is None:
-                if workdays_difference > standard_access_days:
-                    return []
-                elif workdays_difference <= standard_access_days:
-                    desks = await fetch_desks_list(session, room_id, weekday_enum, booking_date)
-                    return desks if desks else []
-            
-            preferred_room_id = await orm_select_team_preferred_room_id(session, team_id)
-            
-            if preferred_room_id is None:
-                if workdays_difference > standard_access_days:
-                    return []
-                elif workdays_difference <= standard_access_days:
-                    desks = await fetch_desks_list(session, room_id, weekday_enum, booking_date)
-                    return desks if desks else []
-            
-            if preferred_room_id != room_id and workdays_difference > standard_access_days:
-                return []
-            
-            elif preferred_room_id == room_id or workdays_difference <= standard_access_days:
-                desks = await fetch_desks_list(session, room_id, weekday_enum, booking_date)
-                return desks if desks else []
-            
-            else:
-                raise RuntimeError("Error: Unknown advanced mode logic")
-    
+        await occupancy_matrix.refresh_if_stale(session)
     except Exception as e:
-        raise RuntimeError(f"Error in advanced mode logic: {e}")
-    
-    # Non-advanced mode logic
+        raise RuntimeError(f"Error retrieving desks: {e}") from e
+    cached = occupancy_matrix.select_room_plan_and_bookable_desks(
+        room_name,
+        booking_date,
+        telegram_id=telegram_id,
+        preferred_room_only=preferred_room_only)
+    if cached is not None:
+        room_found, room_plan, desks = cached
+        if not room_found:
+            return None, f"Error: Room '{room_name}' not found"
+        return room_plan, desks
+
     try:
-        if not advanced_mode:
-            desks = await fetch_desks_list(session, room_id, weekday_enum, booking_date)
-            return desks if desks else []
+        rows = await orm_select_room_plan_and_bookable_desks_by_room_name(
+            session,
+            room_name,
+            booking_date,
+            telegram_id=telegram_id,
+            preferred_room_only=preferred_room_only)
     except Exception as e:
-        raise RuntimeError(f"Error in non-advanced mode logic: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Error retrieving desks: {e}") from e
+    
+    if not rows:
+        return None, f"Error: Room '{room_name}' not found"
+    
+    room_plan = rows[0].plan
+    desks = [row.name for row in rows if row.name is not None]
+    return room_plan, desks
+
+
+async def generate_desks_list(
+    session: AsyncSession,
+    room_name: str,
+    date: str,
+    date_format: str,
+    advanced_mode: Optional[bool],
+    telegram_id: Optional[int],
+    standard_access_days: Optional[int] = 1,
+    country_code: Optional[str] = None,
+    timezone: Optional[str] = None,
+    ) -> Union[List[str], str]:
+    _, desks = await generate_desks_list_with_room_plan(
+        session,
+        room_name,
+        date,
+        date_format,
+        advanced_mode,
+        telegram_id,
+        standard_access_days,
+        country_code,
+        timezone)
+    return desks
@@ -0,0 +1,48 @@
+from typing import List
+
+
+# Telegram limits the text of a message to 4096 characters
+MESSAGE_MAX_LENGTH = 4096
+
+
+def split_into_pages(text: str, max_length: int = MESSAGE_MAX_LENGTH) -> List[str]:
+    """
+    Splits the text into pages of at most max_length characters.
+
+    The text is split between blocks separated by blank lines (e.g. the bookings of one date),
+    so HTML tags are never cut. Blocks longer than a page are split between lines,
+    and only lines longer than a page are cut.
+    """
+    if len(text) <= max_length:
+        return [text]
+
+    pages: List[str] = []
+    current: List[str] = []
+    current_length = 0
+
+    def flush() -> None:
+        nonlocal current, current_length
+        if current:
+            pages.append(''.join(current))
+            current = []
+            current_length = 0
+
+    for block in _split_keepends(text, '\n\n'):
+        parts = [block] if len(block) <= max_length else _split_keepends(block, '\n')
+        for part in parts:
+            while len(part) > max_length:
+                flush()
+                pages.append(part[:max_length])
+                part = part[max_length:]
+            if current_length + len(part) > max_length:
+                flush()
+            current.append(part)
+            current_length += len(part)
+    flush()
+    return pages
+
+
+def _split_keepends(text: str, separator: str) -> List[str]:
+    """Splits the text after each separator, keeping the separators, so that ''.join(result) == text."""
+    parts = text.split(separator)
+    return [part + separator for part in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
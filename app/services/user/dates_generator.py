@@ -1,6 +1,42 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
 import pytz
-import holidays
+
+from app.services.common.business_days import is_holiday
+
+
+# Bookable dates per (timezone, country_code, exclude_weekends, num_days, date_format),
+# stored together with the local date they were generated on
+_dates_cache: Dict[Tuple, Tuple[date, List[str]]] = {}
+
+
+def _generate_dates(
+    start_date: date,
+    num_days: int,
+    exclude_weekends: bool | None,
+    country_code: str | None,
+    date_format: str,
+    ) -> List[str]:
+    dates: List[str] = []
+    current_date = start_date
+
+    while len(dates) < num_days:
+        if exclude_weekends and current_date.weekday() >= 5:  # Skip weekends (5 and 6 corresponds to Saturday-Sunday)
+            current_date += timedelta(days=1) # Add one day to the current date
+            continue
+
+        # Check for public holidays (optional)
+        if is_holiday(current_date, country_code):  # Skip public holidays
+            current_date += timedelta(days=1)
+            continue
+
+        formatted_date = current_date.strftime(date_format) # Format the date as 'YYYY-MM-DD (Day)'
+
+        dates.append(formatted_date) # Add the formatted date to the list of dates
+
+        current_date += timedelta(days=1) # Add one day to the current date
+
+    return dates
 
 
 async def generate_dates(
@@ -13,6 +49,8 @@ async def generate_dates(
     """
     Generates a list of dates from the current date.
 
+    The dates are cached per configuration and regenerated on the first call after local midnight.
+
     :param num_days: Number of dates to generate.
     :param exclude_weekends: Exclude weekends if True.
     :param timezone: Time zone for date generation.
@@ -20,24 +58,12 @@ async def generate_dates(
     :param date_format: Date format for the generated dates.
     :return: List of formatted date strings.
     """
-    dates: list = []
-    
-    current_date = datetime.now(pytz.timezone(timezone))
-
-    while len(dates) < int(num_days):
-        if exclude_weekends and current_date.weekday() >= 5:  # Skip weekends (5 and 6 corresponds to Saturday-Sunday)
-            current_date += timedelta(days=1) # Add one day to the current date
-            continue
+    today = datetime.now(pytz.timezone(timezone)).date()
+    key = (timezone, country_code, exclude_weekends, int(num_days), date_format)
 
-        # Check for public holidays (optional)
-        if country_code and current_date in holidays.country_holidays(country_code):  # Skip public holidays
-            current_date += timedelta(days=1)
-            continue
-        
-        formatted_date = current_date.strftime(date_format) # Format the date as 'YYYY-MM-DD (Day)'
-
-        dates.append(formatted_date) # Add the formatted date to the list of dates
-
-        current_date += timedelta(days=1) # Add one day to the current date
+    cached = _dates_cache.get(key)
+    if cached is None or cached[0] != today:
+        cached = (today, _generate_dates(today, int(num_days), exclude_weekends, country_code, date_format))
+        _dates_cache[key] = cached
 
-    return dates
\ No newline at end of file
+    return list(cached[1]) # Return a copy, so that callers can't modify the cached list
@@ -1,24 +1,26 @@
-from typing import TYPE_CHECKING, Optional
-from datetime import datetime, timedelta
-import random
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from datetime import date, datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.orm_queries import (
-    orm_select_desk_id_by_name,
-    orm_select_booking_by_desk_id_and_date,
-    orm_insert_booking,
-    orm_select_available_desks_by_date,
-    orm_select_available_desks_by_desks_id_and_weekday,
-    orm_select_team_preferred_room_id_by_telegram_id,
+    orm_insert_booking_on_conflict_do_nothing,
+    orm_select_random_bookable_desks,
     DeskBookerError,
+    BookingConflictError,
 )
-from app.database.enums.weekdays import Weekday
+from app.database.enums.booking_conflicts import BookingConflict
+from app.database.occupancy import occupancy_matrix
+from app.services.common.business_days import workdays_difference
 
 if TYPE_CHECKING:
     from app.locales.stub import TranslatorRunner # type: ignore
 
 
+# Maximum number of candidate desks tried by desk_booker_random before giving up
+RANDOM_BOOKING_ATTEMPTS = 5
+
+
 async def desk_booker(
     i18n,
     session: AsyncSession,
@@ -43,25 +45,27 @@ async def desk_booker(
     - str: Response message
     """
     i18n: TranslatorRunner = i18n
-    desk_id = await orm_select_desk_id_by_name(session, desk_name)
     try:
         booking_date = datetime.strptime(date, date_format).date()
     except ValueError as e:
         return "Error: Incorrect date format. Parsing date to datetime.date failed."
     
-    # Check for an existing booking for the same desk and date
-    existing_booking = await orm_select_booking_by_desk_id_and_date(session, desk_id, booking_date)
-    
-    if existing_booking:
+    # Insert the booking in a single statement, the unique constraints resolve concurrent bookings
+    try:
+        await orm_insert_booking_on_conflict_do_nothing(session, telegram_id, booking_date, desk_name=desk_name)
+    except BookingConflictError as e:
+        if e.conflict == BookingConflict.USER_HAS_BOOKING:
+            #! desk-booker-already-booked
+            raise BookingConflictError(i18n.desk.booker.already.booked(date=date), e.conflict) from e
+        #! desk-booker-error
+        raise BookingConflictError(i18n.desk.booker.error(), e.conflict) from e
+    except DeskBookerError:
         #! desk-booker-error
         raise DeskBookerError(i18n.desk.booker.error())
-    
-    try:
-        await orm_insert_booking(session, telegram_id, desk_id, booking_date)
-        #! desk-booker-success
-        return i18n.desk.booker.success(date=date, room_name=room_name, desk_name=desk_name)
     except Exception as e:
         return f"Error: {e}"
+    #! desk-booker-success
+    return i18n.desk.booker.success(date=date, room_name=room_name, desk_name=desk_name)
 
     
 async def desk_booker_random(
@@ -72,9 +76,15 @@ async def desk_booker_random(
     date_format: str,
     advanced_mode: Optional[bool],
     standard_access_days: Optional[int] = 1,
+    country_code: Optional[str] = None,
+    timezone: Optional[str] = None,
 ) -> str:
     """
     Add a random booking to the database for any available desk on the given date.
+
+    Candidate desks are picked in the database (or in the occupancy matrix if it covers the date),
+    and each candidate is booked atomically. If someone books the candidate first,
+    the next one is tried, up to RANDOM_BOOKING_ATTEMPTS candidates.
     """
     i18n: TranslatorRunner = i18n
     try:
@@ -82,64 +92,60 @@ async def desk_booker_random(
     except ValueError:
         return "Error: Incorrect date format. Parsing date to datetime.date failed."
 
-    # Fetch all desks that are available and not booked on the specified date
-    available_desks = await orm_select_available_desks_by_date(session, booking_date)
-    if not available_desks:
-        return "No available desks for the selected date."
-    # Extract desk IDs for further filtering
-    desk_ids = [desk.id for desk in available_desks]
-    
-    # Convert integer weekday to Weekday enum
-    weekday_enum = Weekday(booking_date.weekday())
+    # Advanced mode logic. Outside of the standard access days user can book only desks in the preferred room of the team
+    preferred_room_only = (
+        bool(advanced_mode)
+        and workdays_difference(booking_date, country_code, timezone) > standard_access_days)
 
-    # Fetch desks that are not assigned or where the assigned user is out of office
-    desks_available_for_booking = await orm_select_available_desks_by_desks_id_and_weekday(session, desk_ids, weekday_enum)
-    if not desks_available_for_booking:
-        return "No desks are available due to assignments or office presence."
-    
-    try:
-        # Non-advanced mode logic
-        if not advanced_mode:
-            # Select a random desk from the available ones
-            desk = random.choice(desks_available_for_booking)
-        
-        # Advanced mode logic
-        if advanced_mode:
-            # Calculating workdays delta between today and booking date (excluding weekends)
-            today = datetime.now().date()
-            workdays_difference = 0
-            while today <= booking_date:
-                if today.weekday() < 5:  # Weekdays are from 0 (Monday) to 4 (Friday)
-                    workdays_difference += 1
-                today += timedelta(days=1)
-            if workdays_difference <= standard_access_days:
-                desk = random.choice(desks_available_for_booking)
-            
-            if workdays_difference > standard_access_days:
-                # Retrieve preffered_room_id by telegram_id
-                preferred_room_id = await orm_select_team_preferred_room_id_by_telegram_id(session, telegram_id)
-                
-                if not preferred_room_id:
-                    #! desk-booker-random-no-desks
-                    return i18n.desk.booker.random.no.desks(date=date)
-                
-                # Filter desks_available_for_booking by preferred_room_id
-                filtered_desks = [desk for desk in desks_available_for_booking if desk.room_id == preferred_room_id]
-                
-                if not filtered_desks:
-                    #! desk-booker-random-no-desks
-                    return i18n.desk.booker.random.no.desks(date=date)
-                
-                else:
-                    desk = random.choice(filtered_desks)
-            
-    except Exception as e:
-        return f"Error {e}"
-    
-    # Attempt to create a booking
-    try:
-        await orm_insert_booking(session, telegram_id, desk.id, booking_date)
-        #! desk-booker-success
-        return i18n.desk.booker.success(date=date, room_name=desk.room.name, desk_name=desk.name)
-    except Exception as e:
-        return f"Error while attempting to create booking: {e}"
\ No newline at end of file
+    attempts = 0
+    while attempts < RANDOM_BOOKING_ATTEMPTS:
+        candidates = await _select_random_candidates(
+            session, telegram_id, booking_date, preferred_room_only, RANDOM_BOOKING_ATTEMPTS - attempts)
+        if not candidates:
+            #! desk-booker-random-no-desks
+            return i18n.desk.booker.random.no.desks(date=date)
+        for desk_id, desk_name, room_name in candidates:
+            attempts += 1
+            try:
+                await orm_insert_booking_on_conflict_do_nothing(session, telegram_id, booking_date, desk_id=desk_id)
+                #! desk-booker-success
+                return i18n.desk.booker.success(date=date, room_name=room_name, desk_name=desk_name)
+            except BookingConflictError as e:
+                if e.conflict == BookingConflict.USER_HAS_BOOKING:
+                    #! desk-booker-already-booked
+                    return i18n.desk.booker.already.booked(date=date)
+                # Someone has booked the desk before, try the next candidate
+                continue
+            except Exception as e:
+                return f"Error while attempting to create booking: {e}"
+
+    #! desk-booker-error
+    return i18n.desk.booker.error()
+
+
+async def _select_random_candidates(
+    session: AsyncSession,
+    telegram_id: int,
+    booking_date: date,
+    preferred_room_only: bool,
+    limit: int,
+) -> List[Tuple[int, str, str]]:
+    """Returns up to `limit` random bookable desks as (desk_id, desk_name, room_name) tuples."""
+    # Pick a desk from the in-memory occupancy matrix if it is enabled and covers the booking date
+    await occupancy_matrix.refresh_if_stale(session)
+    if occupancy_matrix.covers(booking_date):
+        room_id = None
+        if preferred_room_only:
+            room_id = occupancy_matrix.preferred_room_id(telegram_id)
+            if not room_id:
+                return []
+        desk = occupancy_matrix.select_random_bookable_desk(booking_date, room_id=room_id)
+        return [desk] if desk else []
+
+    rows = await orm_select_random_bookable_desks(
+        session,
+        booking_date,
+        telegram_id=telegram_id,
+        preferred_room_only=preferred_room_only,
+        limit=limit)
+    return [(row.id, row.name, row.room_name) for row in rows]
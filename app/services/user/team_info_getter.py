@@ -2,23 +2,25 @@ from typing import TYPE_CHECKING, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.fan_out import fan_out
 from app.database.orm_queries import (
     orm_select_team_id_by_telegram_id,
     orm_select_team_info_by_team_id,
+    orm_select_team_tree,
 )
 
 if TYPE_CHECKING:
     from app.locales.stub import TranslatorRunner # type: ignore
 
 
-async def get_team_info_service(i18n, session: AsyncSession, telegram_id: int) -> Tuple[str, str] | Tuple[str, str, int]:
+async def get_team_info_service(i18n, session: AsyncSession, telegram_id: int) -> Tuple[str, str] | Tuple[str, str, int, bool]:
     """
     Get team information from the database.
 
     Returns:
         Tuple[str, str]: A tuple containing the status and response message
         or
-        Tuple[str, str, int]: A tuple containing the status, response message and team_id
+        Tuple[str, str, int, bool]: A tuple containing the status, response message, team_id and whether the team has sub-teams
     """
     i18n: TranslatorRunner = i18n
     team_id = await orm_select_team_id_by_telegram_id(session, telegram_id)
@@ -26,7 +28,11 @@ async def get_team_info_service(i18n, session: AsyncSession, telegram_id: int) -
         #! team-empty
         return "empty", i18n.team.empty()
     
-    team_info = await orm_select_team_info_by_team_id(session, team_id)
+    # The members and the sub-teams are read concurrently
+    team_info, sub_teams = await fan_out(
+        session,
+        lambda s: orm_select_team_info_by_team_id(s, team_id),
+        lambda s: orm_select_team_tree(s, team_id))
     if not team_info:
         #! team-no-info
         return "no-info", i18n.team.no.info()
@@ -40,4 +46,8 @@ async def get_team_info_service(i18n, session: AsyncSession, telegram_id: int) -
     for item in team_info:
         #! team-member-info
         response_message += i18n.team.member.info(telegram_name=f'@{item.user_name}', role=item.role) + '\n'
-    return "team-info", response_message, team_id
\ No newline at end of file
+
+    if sub_teams:
+        #! team-sub-teams
+        response_message += '\n' + i18n.team.sub.teams(team_names=', '.join(team.name for team in sub_teams)) + '\n'
+    return "team-info", response_message, team_id, bool(sub_teams)
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Runs several bot worker processes (app/bot.py) and restarts the ones that exit unexpectedly.
+
+Workers share the FSM storage and the per-chat event locks in Redis, and listen on the same webhook port (SO_REUSEPORT),
+so the kernel splits the incoming updates between them. Long polling cannot be shared, so several workers require WEBHOOK_MODE=true.
+
+Usage (from the project root):
+    python app/supervisor.py             # BOT_WORKERS processes
+    python app/supervisor.py --workers 4
+"""
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import time
+from typing import List, Optional
+
+from app.config_data.config import Config, load_config
+
+from app.utils.logger import Logger
+logger = Logger('supervisor')
+
+
+BOT_SCRIPT = Path(__file__).parent / "bot.py"
+RESTART_DELAY = 1.0 # seconds, doubled after each quick crash up to MAX_RESTART_DELAY
+MAX_RESTART_DELAY = 60.0
+STABLE_RUN_TIME = 30.0 # seconds, a worker running longer than this resets its restart delay
+SHUTDOWN_TIMEOUT = 30.0 # seconds to wait for the workers after SIGTERM before killing them
+
+
+class Supervisor:
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.processes: List[Optional[asyncio.subprocess.Process]] = [None] * workers
+        self.stopping = asyncio.Event()
+
+
+    async def _start(self, index: int) -> asyncio.subprocess.Process:
+        env = {**os.environ, "BOT_WORKERS": str(self.workers), "BOT_WORKER_INDEX": str(index)}
+        process = await asyncio.create_subprocess_exec(sys.executable, str(BOT_SCRIPT), env=env)
+        self.processes[index] = process
+        logger.info(f"Supervisor: worker {index} started (pid {process.pid})")
+        return process
+
+
+    async def _run_worker(self, index: int) -> None:
+        """Keeps worker `index` running until the supervisor stops."""
+        delay = RESTART_DELAY
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            process = await self._start(index)
+            code = await process.wait()
+            if self.stopping.is_set():
+                break
+            if time.monotonic() - started > STABLE_RUN_TIME:
+                delay = RESTART_DELAY
+            logger.error(f"Supervisor: worker {index} exited with code {code}, restarting in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+
+
+    def _signal(self, signal_number: int) -> None:
+        """Stops restarting the workers and forwards the signal to them."""
+        self.stopping.set()
+        for process in self.processes:
+            if process is not None and process.returncode is None:
+                process.send_signal(signal_number)
+
+
+    async def _stop(self) -> None:
+        await self.stopping.wait()
+        running = [process for process in self.processes if process is not None and process.returncode is None]
+        if not running:
+            return
+        _, pending = await asyncio.wait([asyncio.create_task(process.wait()) for process in running], timeout=SHUTDOWN_TIMEOUT)
+        if pending:
+            logger.warning(f"Supervisor: killing {len(pending)} workers that did not stop in {SHUTDOWN_TIMEOUT:.0f}s")
+            for process in running:
+                if process.returncode is None:
+                    process.kill()
+
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, self._signal, signal_number)
+        logger.info(f"Supervisor: starting {self.workers} bot workers")
+        await asyncio.gather(self._stop(), *(self._run_worker(index) for index in range(self.workers)))
+        logger.info("Supervisor: all workers stopped")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Runs several bot worker processes.")
+    parser.add_argument("--workers", type=int, help="Number of bot processes (default: BOT_WORKERS).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    config: Config = load_config()
+    workers = args.workers or config.workers.count
+    if workers > 1 and not config.webhook.enabled:
+        raise SystemExit("Several bot workers require the webhook mode (WEBHOOK_MODE=true): long polling cannot be shared.")
+    asyncio.run(Supervisor(workers).run())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    main()
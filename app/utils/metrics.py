@@ -0,0 +1,182 @@
+import asyncio
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.utils.logger import Logger
+
+
+logger = Logger('metrics')
+
+
+# Histogram buckets in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Exported metrics: name -> (type, help)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "bot_updates_total": ("counter", "Updates handled, by handler and router."),
+    "bot_handler_duration_seconds": ("histogram", "Time to process an update, by handler."),
+    "bot_handler_errors_total": ("counter", "Updates whose processing raised an exception, by handler."),
+    "bot_db_statements_total": ("counter", "SQL statements executed while processing updates, by handler."),
+    "bot_db_time_seconds_total": ("counter", "Time spent in the database while processing updates, by handler."),
+    "db_pool_checkout_wait_seconds": ("histogram", "Time to check out a connection from the pool, by process kind."),
+    "bot_telegram_request_duration_seconds": ("histogram", "Latency of Telegram Bot API calls, by method."),
+    "bot_telegram_request_errors_total": ("counter", "Failed Telegram Bot API calls, by method."),
+}
+
+
+class Metrics:
+    """
+    Prometheus-style counters and histograms shared by the bot and API processes.
+
+    Samples are accumulated in-process and periodically added to a Redis hash with HINCRBYFLOAT,
+    so every process contributes to the same totals (all exported metrics are counters or histograms, which are additive).
+    The /metrics endpoint of the API renders the hash in the Prometheus text format.
+    Without Redis, the totals of the current process are rendered.
+    """
+    REDIS_KEY = "metrics"
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.redis: Optional[Redis] = None
+        self.flush_interval: float = 10.0
+        self._pending: Dict[str, float] = defaultdict(float)
+        self._totals: Dict[str, float] = defaultdict(float)
+
+
+    def configure(self, redis: Optional[Redis] = None, flush_interval: float = 10.0) -> None:
+        """Enables collection. If redis is None, metrics are kept in the current process only."""
+        self.enabled = True
+        self.redis = redis
+        self.flush_interval = flush_interval
+
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0) -> None:
+        if not self.enabled:
+            return
+        self._add(_sample(name, labels), value)
+
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        ) -> None:
+        """Adds an observation to a histogram. Buckets are stored cumulatively, like Prometheus exports them."""
+        if not self.enabled:
+            return
+        labels = labels or {}
+        first = bisect_left(buckets, value)
+        for i, le in enumerate(buckets):
+            # Buckets below the value are added with 0, so that every series exports all buckets
+            self._add(_sample(f"{name}_bucket", {**labels, "le": repr(float(le))}), 1 if i >= first else 0)
+        self._add(_sample(f"{name}_bucket", {**labels, "le": "+Inf"}), 1)
+        self._add(_sample(f"{name}_sum", labels), value)
+        self._add(_sample(f"{name}_count", labels), 1)
+
+
+    def _add(self, sample: str, value: float) -> None:
+        if self.redis is not None:
+            self._pending[sample] += value
+        else:
+            self._totals[sample] += value
+
+
+    async def flush(self) -> None:
+        """Adds the pending samples to the shared Redis hash. On failure, they are kept for the next flush."""
+        if self.redis is None or not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(float)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for sample, value in pending.items():
+                    pipe.hincrbyfloat(self.REDIS_KEY, sample, value)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Metrics: Redis flush failed: {e}")
+            for sample, value in pending.items():
+                self._pending[sample] += value
+
+
+    async def run_flusher(self) -> None:
+        """Flushes the pending samples every flush_interval seconds. Runs until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        finally:
+            await self.flush()
+
+
+    async def collect(self) -> Dict[str, float]:
+        if self.redis is None:
+            return dict(self._totals)
+        try:
+            samples = await self.redis.hgetall(self.REDIS_KEY)
+        except RedisError as e:
+            logger.warning(f"Metrics: Redis read failed: {e}")
+            return {}
+        return {_decode(sample): float(value) for sample, value in samples.items()}
+
+
+    async def render(self) -> str:
+        """Returns all samples in the Prometheus text exposition format."""
+        return render_samples(await self.collect())
+
+
+def _sample(name: str, labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return name
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _family(sample: str) -> str:
+    name = sample.split("{", 1)[0]
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and METRICS.get(name[:-len(suffix)], ("",))[0] == "histogram":
+            return name[:-len(suffix)]
+    return name
+
+
+def render_samples(samples: Dict[str, float]) -> str:
+    families: Dict[str, list] = defaultdict(list)
+    for sample, value in samples.items():
+        families[_family(sample)].append((sample, value))
+    lines = []
+    for family in sorted(families):
+        if family in METRICS:
+            metric_type, help_text = METRICS[family]
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+        for sample, value in sorted(families[family], key=_sort_key):
+            lines.append(f"{sample} {int(value)}" if value.is_integer() else f"{sample} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+def _sort_key(item: Tuple[str, float]) -> Tuple:
+    """Sorts histogram buckets by their upper bound, then the _sum and _count samples."""
+    sample = item[0]
+    name, _, labels = sample.partition("{")
+    le = 0.0
+    if name.endswith("_bucket") and 'le="' in labels:
+        bound = labels.split('le="', 1)[1].split('"', 1)[0]
+        le = float("inf") if bound == "+Inf" else float(bound)
+        labels = labels.split('le="', 1)[0]
+    return (labels.rstrip(',}'), name, le)
+
+
+metrics = Metrics()
@@ -0,0 +1,113 @@
+import asyncio
+import signal
+from typing import Any, List, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from app.config_data.config import WebhookConfig
+
+from app.utils.logger import Logger
+logger = Logger('webhook')
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    Webhook request handler that processes updates in background tasks, at most max_concurrent_updates at a time.
+
+    Telegram gets its response as soon as a task has been started. When all slots are busy,
+    the response is delayed until one frees up, so Telegram keeps the remaining updates queued on its side
+    instead of this process piling up tasks.
+    """
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        max_concurrent_updates: int,
+        secret_token: Optional[str] = None,
+        shutdown_timeout: float = 10.0,
+        **data: Any,
+    ) -> None:
+        super().__init__(dispatcher=dispatcher, bot=bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self.shutdown_timeout = shutdown_timeout
+
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = await request.json(loads=bot.session.json_loads)
+        await self._slots.acquire()
+        task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        task.add_done_callback(lambda _: self._slots.release())
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+
+    async def close(self) -> None:
+        """Lets the updates in progress finish (up to shutdown_timeout seconds), then closes the bot session."""
+        if self._background_feed_update_tasks:
+            logger.info(f"Webhook: waiting for {len(self._background_feed_update_tasks)} updates in progress")
+            await asyncio.wait(self._background_feed_update_tasks, timeout=self.shutdown_timeout)
+        await super().close()
+
+
+async def health(request: web.Request) -> web.Response:
+    """Liveness endpoint for the load balancer."""
+    return web.Response(text="OK")
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    webhook_config: WebhookConfig,
+    allowed_updates: List[str],
+    set_webhook: bool = True,
+    reuse_port: bool = False,
+    **data: Any,
+) -> None:
+    """
+    Serves the webhook until SIGTERM/SIGINT or cancellation. Every replica behind the load balancer runs the same server:
+    setting the webhook is idempotent, and it is not deleted on shutdown, so that the other replicas keep receiving updates.
+    Worker processes of one replica (see app/supervisor.py) listen on the same port with reuse_port,
+    the kernel splits the connections of Telegram between them, and only the first worker sets the webhook.
+    """
+    async def setup_webhook(bot: Bot) -> None:
+        await bot.set_webhook(
+            url=webhook_config.url,
+            secret_token=webhook_config.secret_token,
+            allowed_updates=allowed_updates,
+            max_connections=webhook_config.max_connections,
+        )
+        logger.info(f"Webhook: set to {webhook_config.url}")
+
+    if set_webhook:
+        dp.startup.register(setup_webhook)
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    BoundedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        max_concurrent_updates=webhook_config.max_concurrent_updates,
+        secret_token=webhook_config.secret_token,
+        **data,
+    ).register(app, path=webhook_config.path)
+    setup_application(app, dp, bot=bot, **data) # Runs the dispatcher's startup and shutdown handlers
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=webhook_config.host, port=webhook_config.port, reuse_port=reuse_port or None)
+    await site.start()
+    logger.info(f"Webhook: listening on {webhook_config.host}:{webhook_config.port}{webhook_config.path}")
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signal_number, stopped.set)
+        except NotImplementedError: # Windows
+            pass
+    try:
+        await stopped.wait()
+    finally:
+        await runner.cleanup()
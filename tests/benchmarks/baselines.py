@@ -0,0 +1,110 @@
+"""
+Timing of the benchmark cases and the JSON baselines they are compared with.
+
+Baselines are stored per "<dialect>:<scale>" key (e.g. "sqlite:small"), since timings of different databases
+and office sizes are not comparable. A case fails if its median is slower than the baseline by more than
+the relative tolerance. The absolute slack keeps sub-millisecond cases from failing on timer noise.
+A case without a baseline fails on the keys that have baselines, so new cases get theirs committed;
+on the other keys (e.g. a new scale) the run only warns.
+"""
+import json
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+
+@dataclass(slots=True)
+class Timing:
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    rounds: int
+
+
+# Timings of the session, printed in the terminal summary
+RESULTS: Dict[str, Timing] = {}
+
+
+async def measure(
+    run: Callable[[], Awaitable[Any]],
+    rounds: int,
+    warmup: int = 2,
+    setup: Optional[Callable[[], Awaitable[Any]]] = None,
+    teardown: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Timing:
+    """
+    Runs the case warmup + rounds times and returns the statistics of the measured rounds.
+    The setup (e.g. creating the user to delete) and the teardown (e.g. deleting the created booking)
+    run before and after every round and are not measured.
+    """
+    samples = []
+    for i in range(warmup + rounds):
+        if setup is not None:
+            await setup()
+        start = time.perf_counter()
+        await run()
+        elapsed = (time.perf_counter() - start) * 1000
+        if teardown is not None:
+            await teardown()
+        if i >= warmup:
+            samples.append(elapsed)
+    samples.sort()
+    return Timing(
+        median_ms=statistics.median(samples),
+        p95_ms=samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        min_ms=samples[0],
+        rounds=rounds,
+    )
+
+
+class Baselines:
+    def __init__(self, key: str, path: Path = BASELINES_PATH):
+        self.key = key
+        self.path = path
+        self._data: Dict[str, Dict[str, float]] = json.loads(path.read_text()) if path.exists() else {}
+        self._updated = False
+
+
+    def get(self, name: str) -> Optional[float]:
+        return self._data.get(self.key, {}).get(name)
+
+
+    def record(self, name: str, timing: Timing) -> None:
+        self._data.setdefault(self.key, {})[name] = round(timing.median_ms, 3)
+        self._updated = True
+
+
+    @property
+    def tracked(self) -> bool:
+        """Whether baselines are committed for this key."""
+        return self.key in self._data
+
+
+    def check(self, name: str, timing: Timing, tolerance: float, slack_ms: float) -> Optional[str]:
+        """
+        Returns the regression message, or None if the case is within the baseline.
+        A case without a baseline fails if the key is tracked, otherwise it is not checked.
+        """
+        baseline = self.get(name)
+        if baseline is None:
+            if self.tracked:
+                return f"{name} has no baseline on {self.key}: record it with --update-baselines"
+            return None
+        limit = baseline * (1 + tolerance) + slack_ms
+        if timing.median_ms > limit:
+            return (
+                f"{name} regressed on {self.key}: median {timing.median_ms:.3f} ms "
+                f"> baseline {baseline:.3f} ms (limit {limit:.3f} ms)"
+            )
+        return None
+
+
+    def save(self) -> None:
+        if not self._updated:
+            return
+        data = {key: dict(sorted(values.items())) for key, values in sorted(self._data.items())}
+        self.path.write_text(json.dumps(data, indent=2) + "\n")
@@ -0,0 +1,646 @@
+"""
+Benchmark cases: every orm_* function of app/database/orm_queries.py and the booking services built on them.
+
+Each case is built from a BenchContext and runs its function in a new session, like a bot handler does.
+Write cases restore the seeded state in an unmeasured setup/teardown, so all rounds measure the same work.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import orm_queries as q
+from app.database.fan_out import fan_out
+from app.database.models import User, Waitlist, Room, Desk, DeskAssignment, Booking, BookingDailyStat
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.enums.weekdays import Weekday
+from app.services.common.desks_list_generator import generate_desks_list
+from app.services.user.desk_booker import desk_booker, desk_booker_random
+from app.services import bookings_list_generator as blg
+from app.services.admin.bulk_import import ImportRow, bulk_import
+from app.services.admin.bookings_export import stream_bookings_export
+from app.services.admin.analytics import build_report
+from app.services.admin.booking_explorer import PAGE_SIZE, fetch_bookings_page
+from app.services.user.team_info_getter import get_team_info_service
+
+from tests.benchmarks.seeding import Scale, user_id, user_name, room_name, desk_name, team_name
+
+
+DATE_FORMAT = "%d.%m.%Y (%a)"
+DATE_FORMAT_SHORT = "%d.%m.%Y"
+
+
+@dataclass(slots=True)
+class BenchContext:
+    session_pool: async_sessionmaker
+    i18n: Any
+    scale: Scale
+    today: date
+
+    @property
+    def free_date(self) -> date:
+        """A workday after the seeded bookings, on which nobody has booked yet."""
+        day = self.today + timedelta(weeks=self.scale.weeks + 1)
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return day
+
+    @property
+    def last_room(self) -> int:
+        return self.scale.rooms - 1
+
+
+@dataclass(slots=True)
+class Benchmark:
+    run: Callable[[], Awaitable[Any]]
+    setup: Optional[Callable[[], Awaitable[Any]]] = None
+    teardown: Optional[Callable[[], Awaitable[Any]]] = None
+
+
+CASES: Dict[str, Callable[[BenchContext], Benchmark]] = {}
+
+# Functions that are not benchmarked, with the reason
+SKIPPED: Dict[str, str] = {
+    "orm_insert_desk_assignment": "not implemented (the function has no body)",
+    "generate_dict_of_current_bookings_by_telegram_id_for_inline_kb": "fails on booking.room, not used by the bot",
+    "orm_update_desk_assignment_days": "references DeskAssignment columns that do not exist (user_id, is_monday, ...)",
+    "orm_delete_desk_assignment": "references a DeskAssignment column that does not exist (user_id)",
+}
+
+
+def case(name: str):
+    def decorator(builder: Callable[[BenchContext], Benchmark]) -> Callable[[BenchContext], Benchmark]:
+        CASES[name] = builder
+        return builder
+    return decorator
+
+
+def in_session(ctx: BenchContext, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Callable[[], Awaitable[Any]]:
+    """Returns a coroutine function which calls func(session, *args, **kwargs) in a new session."""
+    async def run() -> Any:
+        async with ctx.session_pool() as session:
+            return await func(session, *args, **kwargs)
+    return run
+
+
+def execute(ctx: BenchContext, *statements) -> Callable[[], Awaitable[None]]:
+    """Returns a coroutine function which executes the statements in a new transaction (used for setups and teardowns)."""
+    async def run() -> None:
+        async with ctx.session_pool() as session:
+            for statement in statements:
+                await session.execute(statement)
+            await session.commit()
+    return run
+
+
+def read_case(name: str, args: Callable[[BenchContext], tuple]) -> None:
+    """Registers a case for a read-only orm function called with args(ctx)."""
+    func = getattr(q, name)
+    CASES[name] = lambda ctx: Benchmark(in_session(ctx, func, *args(ctx)))
+
+
+#* Read-only queries
+read_case("get_user_teams_and_roles", lambda ctx: (user_id(1),))
+read_case("orm_select_users", lambda ctx: ())
+read_case("orm_select_user_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_user_by_telegram_name", lambda ctx: (user_name(1),))
+read_case("orm_select_user_by_telegram_id_or_telegram_name", lambda ctx: (user_id(1), user_name(1)))
+read_case("orm_select_is_out_of_office_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_team_name_by_id", lambda ctx: (1,))
+read_case("orm_select_team_id_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_team_preferred_room_id", lambda ctx: (1,))
+read_case("orm_select_team_preferred_room_id_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_team_info_by_team_id", lambda ctx: (1,))
+read_case("orm_select_team_tree", lambda ctx: (1,))
+read_case("orm_select_team_ids_by_names", lambda ctx: ([team_name(i) for i in range(ctx.scale.teams)],))
+read_case("orm_select_user_from_waitlist_by_telegram_id", lambda ctx: (9_000_000,))
+read_case("orm_select_user_from_waitlist_by_telegram_name", lambda ctx: ("waiting0",))
+read_case("orm_select_telegram_id_from_waitlist_by_telegram_name", lambda ctx: ("waiting0",))
+read_case("orm_select_users_from_waitlist", lambda ctx: ())
+read_case("orm_select_rooms", lambda ctx: ())
+read_case("orm_select_available_rooms", lambda ctx: ())
+read_case("orm_select_room_id_by_name", lambda ctx: (room_name(ctx.last_room),))
+read_case("orm_select_room_by_name", lambda ctx: (room_name(ctx.last_room),))
+read_case("orm_get_room_availability_by_name", lambda ctx: (room_name(ctx.last_room),))
+read_case("orm_get_room_data_by_name", lambda ctx: (room_name(ctx.last_room),))
+read_case("orm_select_room_plan_by_room_name", lambda ctx: (room_name(ctx.last_room),))
+read_case("orm_select_room_plan_by_room_id", lambda ctx: (1,))
+read_case("orm_select_desk_id_by_name", lambda ctx: (desk_name(ctx.last_room, 0),))
+read_case("orm_select_desk_by_name", lambda ctx: (desk_name(ctx.last_room, 0),))
+read_case("orm_get_desk_availability_by_name", lambda ctx: (desk_name(ctx.last_room, 0),))
+read_case("orm_select_desks_by_room_id", lambda ctx: (1,))
+read_case("orm_select_available_desks_by_room_id", lambda ctx: (1,))
+read_case("orm_select_desks_by_room_name", lambda ctx: (room_name(0),))
+read_case("orm_select_available_desks_by_room_name", lambda ctx: (room_name(0),))
+read_case("orm_select_available_not_booked_desks_by_room_id", lambda ctx: (1, ctx.today))
+read_case("orm_select_available_not_booked_desks_by_room_name", lambda ctx: (room_name(0), ctx.today))
+read_case("orm_select_not_assigned_desks_by_desks_id_and_weekday",
+          lambda ctx: (list(range(1, ctx.scale.desks_per_room + 1)), Weekday.MONDAY))
+read_case("orm_select_available_desks_by_desks_id_and_weekday",
+          lambda ctx: (list(range(1, ctx.scale.desks_per_room + 1)), Weekday.MONDAY))
+read_case("orm_select_available_not_assigned_desks_by_room_id", lambda ctx: (1, Weekday.MONDAY))
+read_case("orm_select_available_desks_by_date", lambda ctx: (ctx.today,))
+read_case("orm_select_room_plan_and_bookable_desks_by_room_name", lambda ctx: (room_name(0), ctx.today))
+read_case("orm_select_random_bookable_desks", lambda ctx: (ctx.today,))
+read_case("orm_select_desk_assignment_by_telegram_id_and_weekday", lambda ctx: (user_id(1), Weekday.MONDAY))
+read_case("orm_select_desk_assignments_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_desk_assignments_by_telegram_id_selectinload", lambda ctx: (user_id(1),))
+read_case("orm_select_desk_assignments_by_room_id_selectinload", lambda ctx: (1,))
+read_case("orm_select_desk_assignments_by_team_id_selectinload", lambda ctx: (1,))
+read_case("orm_select_desk_assignments_by_desk_id", lambda ctx: (1,))
+read_case("orm_select_desk_assignment_rows_by_room_id", lambda ctx: (1,))
+read_case("orm_select_desk_assignment_rows_by_team_id", lambda ctx: (1,))
+read_case("orm_select_bookings_by_telegram_id_joined", lambda ctx: (user_id(1),))
+read_case("orm_select_bookings_by_telegram_id_joined_from_today", lambda ctx: (user_id(1),))
+read_case("orm_select_bookings_by_room_id_joined_from_today", lambda ctx: (1,))
+read_case("orm_select_bookings_by_team_id_joined_from_today", lambda ctx: (1,))
+read_case("orm_select_booking_rows_by_telegram_id_from_today", lambda ctx: (user_id(1),))
+read_case("orm_select_booking_rows_by_room_id_from_today", lambda ctx: (1,))
+read_case("orm_select_booking_rows_by_team_id_from_today", lambda ctx: (1,))
+read_case("orm_select_bookings_by_telegram_id", lambda ctx: (user_id(1),))
+read_case("orm_select_booking_by_telegram_id_and_date", lambda ctx: (user_id(1), ctx.today))
+read_case("orm_select_booking_by_telegram_id_and_date_selectinload", lambda ctx: (user_id(1), ctx.today))
+read_case("orm_select_booking_by_desk_id_and_date", lambda ctx: (1, ctx.today))
+read_case("orm_select_booking_by_id", lambda ctx: (1,))
+read_case("orm_select_bookings_by_desk_id", lambda ctx: (1,))
+
+
+@case("orm_select_desk_assignment_rows_by_team_id[subtree]")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_select_desk_assignment_rows_by_team_id, 1, subtree=True))
+
+
+@case("orm_select_booking_rows_by_team_id_from_today[subtree]")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_select_booking_rows_by_team_id_from_today, 1, subtree=True))
+read_case("orm_select_bookings_by_date", lambda ctx: (ctx.today,))
+read_case("orm_select_room_ids_by_names", lambda ctx: ([room_name(i) for i in range(ctx.scale.rooms)],))
+read_case("orm_select_desk_ids_by_names",
+          lambda ctx: ([desk_name(0, d) for d in range(ctx.scale.desks_per_room)],))
+read_case("orm_select_telegram_ids_by_telegram_names", lambda ctx: ([user_name(i) for i in range(100)],))
+read_case("orm_select_existing_telegram_ids", lambda ctx: ([user_id(i) for i in range(100)],))
+
+
+#* Users
+NEW_USER_ID = 8_000_000
+NEW_USER_NAME = "bench_user"
+
+
+def _delete_new_users(ctx: BenchContext):
+    return execute(ctx, delete(User).where(User.telegram_id >= NEW_USER_ID, User.telegram_id < NEW_USER_ID + 100))
+
+
+def _insert_new_user(ctx: BenchContext):
+    return execute(ctx, insert(User).values(telegram_id=NEW_USER_ID, telegram_name=NEW_USER_NAME))
+
+
+@case("orm_insert_user")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_insert_user, NEW_USER_ID, NEW_USER_NAME), teardown=_delete_new_users(ctx))
+
+
+@case("orm_insert_users")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> None:
+        users = [User(telegram_id=NEW_USER_ID + i, telegram_name=f"{NEW_USER_NAME}{i}") for i in range(10)]
+        async with ctx.session_pool() as session:
+            await q.orm_insert_users(session, users)
+    return Benchmark(run, teardown=_delete_new_users(ctx))
+
+
+@case("orm_delete_user_by_telegram_id")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_delete_user_by_telegram_id, NEW_USER_ID), setup=_insert_new_user(ctx))
+
+
+@case("orm_delete_user_by_telegram_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_delete_user_by_telegram_name, NEW_USER_NAME), setup=_insert_new_user(ctx))
+
+
+@case("orm_switch_is_out_of_office_by_telegram_id")
+def _(ctx: BenchContext) -> Benchmark:
+    # Switching twice restores the seeded status
+    switch = in_session(ctx, q.orm_switch_is_out_of_office_by_telegram_id, user_id(1))
+    return Benchmark(switch, teardown=switch)
+
+
+@case("orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings")
+def _(ctx: BenchContext) -> Benchmark:
+    # Switching into the office would delete the seeded bookings, so the status is restored without the function
+    return Benchmark(
+        in_session(ctx, q.orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings, user_id(1)),
+        setup=execute(ctx, update(User).where(User.telegram_id == user_id(1)).values(is_out_of_office=False)),
+        teardown=execute(ctx, update(User).where(User.telegram_id == user_id(1)).values(is_out_of_office=False)),
+    )
+
+
+@case("orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings[back to office]")
+def _(ctx: BenchContext) -> Benchmark:
+    # A new user out of the office, with a desk assigned on every workday that other users booked for four weeks
+    desk_id = 10_000_001
+    days = [ctx.free_date + timedelta(days=i) for i in range(28)]
+    workdays = [day for day in days if day.weekday() < 5]
+    return Benchmark(
+        in_session(ctx, q.orm_switch_is_out_of_office_by_telegram_id_and_clear_bookings, NEW_USER_ID),
+        setup=execute(
+            ctx,
+            insert(User).values(telegram_id=NEW_USER_ID, telegram_name=NEW_USER_NAME, is_out_of_office=True),
+            insert(Desk).values(id=desk_id, room_id=1, name=NEW_DESK_NAME),
+            insert(DeskAssignment).values([
+                {"telegram_id": NEW_USER_ID, "desk_id": desk_id, "weekday": weekday} for weekday in list(Weekday)[:5]]),
+            insert(Booking).values([
+                {"telegram_id": user_id(i), "desk_id": desk_id, "date": day} for i, day in enumerate(workdays, start=2)])),
+        teardown=execute(
+            ctx,
+            delete(Booking).where(Booking.desk_id == desk_id),
+            delete(DeskAssignment).where(DeskAssignment.desk_id == desk_id),
+            delete(Desk).where(Desk.id == desk_id),
+            delete(User).where(User.telegram_id == NEW_USER_ID)),
+    )
+
+
+#* Waitlist
+def _delete_waitlist_user(ctx: BenchContext):
+    return execute(ctx, delete(Waitlist).where(Waitlist.telegram_id == NEW_USER_ID))
+
+
+def _insert_waitlist_user(ctx: BenchContext):
+    return execute(ctx, insert(Waitlist).values(telegram_id=NEW_USER_ID, telegram_name=NEW_USER_NAME))
+
+
+@case("orm_insert_user_to_waitlist")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_insert_user_to_waitlist, NEW_USER_ID, NEW_USER_NAME), teardown=_delete_waitlist_user(ctx))
+
+
+@case("orm_delete_user_from_waitlist_by_telegram_id")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_delete_user_from_waitlist_by_telegram_id, NEW_USER_ID), setup=_insert_waitlist_user(ctx))
+
+
+@case("orm_delete_user_from_waitlist_by_telegram_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_delete_user_from_waitlist_by_telegram_name, NEW_USER_NAME), setup=_insert_waitlist_user(ctx))
+
+
+#* Rooms
+NEW_ROOM_NAME = "Bench room"
+
+
+def _delete_new_rooms(ctx: BenchContext):
+    return execute(ctx, delete(Room).where(Room.name.like(f"{NEW_ROOM_NAME}%")))
+
+
+@case("orm_insert_room")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_insert_room, NEW_ROOM_NAME), teardown=_delete_new_rooms(ctx))
+
+
+@case("orm_insert_rooms")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> None:
+        rooms = [Room(name=f"{NEW_ROOM_NAME} {i}") for i in range(10)]
+        async with ctx.session_pool() as session:
+            await q.orm_insert_rooms(session, rooms)
+    return Benchmark(run, teardown=_delete_new_rooms(ctx))
+
+
+@case("orm_delete_room_by_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_delete_room_by_name, NEW_ROOM_NAME),
+        setup=execute(ctx, insert(Room).values(name=NEW_ROOM_NAME)))
+
+
+@case("orm_update_room_name_by_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_update_room_name_by_name, room_name(0), NEW_ROOM_NAME),
+        teardown=in_session(ctx, q.orm_update_room_name_by_name, NEW_ROOM_NAME, room_name(0)))
+
+
+@case("orm_update_room_availability_by_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_update_room_availability_by_name, room_name(0), True))
+
+
+#* Desks
+NEW_DESK_NAME = "Bench desk"
+
+
+def _delete_new_desks(ctx: BenchContext):
+    return execute(ctx, delete(Desk).where(Desk.name.like(f"{NEW_DESK_NAME}%")))
+
+
+@case("orm_insert_desk_with_room_id")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_insert_desk_with_room_id, 1, NEW_DESK_NAME), teardown=_delete_new_desks(ctx))
+
+
+@case("orm_insert_desks")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> None:
+        desks = [Desk(room_id=1, name=f"{NEW_DESK_NAME} {i}") for i in range(10)]
+        async with ctx.session_pool() as session:
+            await q.orm_insert_desks(session, desks)
+    return Benchmark(run, teardown=_delete_new_desks(ctx))
+
+
+@case("orm_delete_desk_by_id")
+def _(ctx: BenchContext) -> Benchmark:
+    desk_id = 10_000_000
+    return Benchmark(
+        in_session(ctx, q.orm_delete_desk_by_id, desk_id),
+        setup=execute(ctx, insert(Desk).values(id=desk_id, room_id=1, name=NEW_DESK_NAME)))
+
+
+@case("orm_update_desk_name_by_id")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_update_desk_name_by_id, 1, NEW_DESK_NAME),
+        teardown=in_session(ctx, q.orm_update_desk_name_by_id, 1, desk_name(0, 0)))
+
+
+@case("orm_update_desk_name_by_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_update_desk_name_by_name, desk_name(0, 0), NEW_DESK_NAME),
+        teardown=in_session(ctx, q.orm_update_desk_name_by_name, NEW_DESK_NAME, desk_name(0, 0)))
+
+
+@case("orm_update_desk_availability_by_name")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, q.orm_update_desk_availability_by_name, desk_name(0, 0), True))
+
+
+#* Bookings
+def _delete_bookings_on_free_date(ctx: BenchContext):
+    return execute(ctx, delete(Booking).where(Booking.date == ctx.free_date))
+
+
+@case("orm_insert_booking_on_conflict_do_nothing")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_insert_booking_on_conflict_do_nothing, user_id(1), ctx.free_date, desk_id=1),
+        teardown=_delete_bookings_on_free_date(ctx))
+
+
+@case("orm_insert_booking")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(
+        in_session(ctx, q.orm_insert_booking, user_id(1), 1, ctx.free_date),
+        teardown=_delete_bookings_on_free_date(ctx))
+
+
+@case("orm_delete_booking_by_id")
+def _(ctx: BenchContext) -> Benchmark:
+    booking_id = 10_000_000
+    return Benchmark(
+        in_session(ctx, q.orm_delete_booking_by_id, booking_id),
+        setup=execute(ctx, insert(Booking).values(id=booking_id, telegram_id=user_id(1), desk_id=1, date=ctx.free_date)))
+
+
+#* Teams
+# The rebuild leaves the seeded closure as it was, so it runs on the seeded database without a teardown
+read_case("orm_rebuild_team_closure", lambda ctx: ())
+
+
+#* Services
+def _date_str(day: date) -> str:
+    return day.strftime(DATE_FORMAT)
+
+
+@case("generate_desks_list")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(
+        ctx, generate_desks_list, room_name(0), _date_str(ctx.today), DATE_FORMAT, False, user_id(1)))
+
+
+@case("generate_desks_list[advanced_mode]")
+def _(ctx: BenchContext) -> Benchmark:
+    # The free date is outside of the standard access days, so the preferred room check is included
+    return Benchmark(in_session(
+        ctx, generate_desks_list, room_name(0), _date_str(ctx.free_date), DATE_FORMAT, True, user_id(1)))
+
+
+@case("desk_booker")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> str:
+        async with ctx.session_pool() as session:
+            return await desk_booker(
+                ctx.i18n, session, user_id(1), desk_name(0, 0), room_name(0), _date_str(ctx.free_date), DATE_FORMAT)
+    return Benchmark(run, teardown=_delete_bookings_on_free_date(ctx))
+
+
+@case("desk_booker_random")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> str:
+        async with ctx.session_pool() as session:
+            return await desk_booker_random(
+                ctx.i18n, session, user_id(1), _date_str(ctx.free_date), DATE_FORMAT, advanced_mode=False)
+    return Benchmark(run, teardown=_delete_bookings_on_free_date(ctx))
+
+
+@case("generate_list_of_current_bookings_by_telegram_id")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> str:
+        async with ctx.session_pool() as session:
+            return await blg.generate_list_of_current_bookings_by_telegram_id(
+                ctx.i18n, session, DATE_FORMAT, DATE_FORMAT_SHORT, user_id(1), user_name(1))
+    return Benchmark(run)
+
+
+@case("generate_list_of_all_current_bookings_by_room_id")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, blg.generate_list_of_all_current_bookings_by_room_id, DATE_FORMAT, DATE_FORMAT_SHORT, 1))
+
+
+@case("generate_current_bookings_list_by_room_id")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> tuple:
+        async with ctx.session_pool() as session:
+            return await blg.generate_current_bookings_list_by_room_id(
+                ctx.i18n, session, DATE_FORMAT, DATE_FORMAT_SHORT, 1)
+    return Benchmark(run)
+
+
+@case("generate_current_bookings_list_by_team_id")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> tuple:
+        async with ctx.session_pool() as session:
+            return await blg.generate_current_bookings_list_by_team_id(
+                ctx.i18n, session, DATE_FORMAT, DATE_FORMAT_SHORT, 1)
+    return Benchmark(run)
+
+
+@case("generate_current_bookings_list_by_team_id[subtree]")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> tuple:
+        async with ctx.session_pool() as session:
+            return await blg.generate_current_bookings_list_by_team_id(
+                ctx.i18n, session, DATE_FORMAT, DATE_FORMAT_SHORT, 1, subtree=True)
+    return Benchmark(run)
+
+
+@case("get_team_info_service")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> tuple:
+        async with ctx.session_pool() as session:
+            return await get_team_info_service(ctx.i18n, session, user_id(1))
+    return Benchmark(run)
+
+
+@case("fan_out[team bookings reads, snapshot]")
+def _(ctx: BenchContext) -> Benchmark:
+    """The reads of generate_current_bookings_list_by_team_id in one shared snapshot, the cost of snapshot=True."""
+    return Benchmark(in_session(
+        ctx,
+        fan_out,
+        lambda s: q.orm_select_team_name_by_id(s, 1),
+        lambda s: q.orm_select_booking_rows_by_team_id_from_today(s, 1),
+        lambda s: q.orm_select_desk_assignment_rows_by_team_id(s, 1),
+        snapshot=True))
+
+
+@case("generate_current_bookings_by_telegram_id")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> Any:
+        async with ctx.session_pool() as session:
+            return await blg.generate_current_bookings_by_telegram_id(ctx.i18n, session, DATE_FORMAT, user_id(1))
+    return Benchmark(run)
+
+
+#* Bulk import
+BULK_DESKS = 500
+BULK_DESK_PREFIX = "BD"
+
+
+def _delete_bulk_desks(ctx: BenchContext):
+    return execute(ctx, delete(Desk).where(Desk.name.like(f"{BULK_DESK_PREFIX}%")))
+
+
+@case("orm_bulk_insert_on_conflict_do_nothing")
+def _(ctx: BenchContext) -> Benchmark:
+    rows = [{"name": f"{BULK_DESK_PREFIX}{i}", "room_id": 1, "is_available": True} for i in range(BULK_DESKS)]
+    return Benchmark(
+        in_session(ctx, q.orm_bulk_insert_on_conflict_do_nothing, Desk, rows, (Desk.name,)),
+        teardown=_delete_bulk_desks(ctx))
+
+
+@case("bulk_import[desks]")
+def _(ctx: BenchContext) -> Benchmark:
+    rows = [
+        ImportRow("desks", f"line {i + 2}", {"room": room_name(0), "name": f"{BULK_DESK_PREFIX}{i}"})
+        for i in range(BULK_DESKS)
+    ]
+    return Benchmark(in_session(ctx, bulk_import, rows), teardown=_delete_bulk_desks(ctx))
+
+
+#* Bookings export (streamed, so the case consumes the whole stream)
+async def _consume(chunks) -> int:
+    return sum([len(chunk) async for chunk in chunks])
+
+
+@case("stream_bookings_export[csv, 4 weeks]")
+def _(ctx: BenchContext) -> Benchmark:
+    async def run() -> int:
+        async with ctx.session_pool() as session:
+            return await _consume(stream_bookings_export(session, ctx.today, ctx.today + timedelta(weeks=4), "csv"))
+    return Benchmark(run)
+
+
+#* Analytics (over all seeded weeks, so the rollup is aggregated over the whole history)
+def _history(ctx: BenchContext) -> tuple:
+    return ctx.today - timedelta(weeks=ctx.scale.weeks), ctx.today + timedelta(weeks=ctx.scale.weeks)
+
+
+read_case("orm_select_booking_stats_totals", lambda ctx: _history(ctx))
+read_case("orm_select_booked_days_by_weekday", lambda ctx: _history(ctx))
+read_case("orm_select_most_cancelled_desks", lambda ctx: _history(ctx))
+read_case("orm_select_top_users_by_booked_days", lambda ctx: _history(ctx))
+read_case("orm_count_analytics_capacity", lambda ctx: ())
+
+
+@case("orm_backfill_booking_daily_stats")
+def _(ctx: BenchContext) -> Benchmark:
+    # Every booking is already counted, so this measures the anti-join over all bookings
+    return Benchmark(in_session(ctx, q.orm_backfill_booking_daily_stats))
+
+
+@case("orm_record_booking_cancellations")
+def _(ctx: BenchContext) -> Benchmark:
+    # A booking deleted in sqladmin, counted in its booking_daily_stats row. The booking cases on free_date
+    # leave their stats rows behind, so this one uses the week after
+    day = ctx.free_date + timedelta(weeks=1)
+    return Benchmark(
+        in_session(ctx, q.orm_record_booking_cancellations, [(day, 1, user_id(1))]),
+        setup=execute(ctx, insert(BookingDailyStat).values(
+            date=day, desk_id=1, telegram_id=user_id(1), room_id=1, team_id=None,
+            bookings=1, cancellations=0, late_cancellations=0)),
+        teardown=execute(ctx, delete(BookingDailyStat).where(BookingDailyStat.date == day)))
+
+
+@case("orm_record_booking_change")
+def _(ctx: BenchContext) -> Benchmark:
+    # A booking moved in sqladmin to another desk: the old key is cancelled and the new one counted
+    day = ctx.free_date + timedelta(weeks=1)
+    booking_id = 10 ** 9
+    booking = Booking(id=booking_id, telegram_id=user_id(1), desk_id=2, date=day)
+    return Benchmark(
+        in_session(ctx, q.orm_record_booking_change, booking, (day, 1, user_id(1))),
+        setup=execute(
+            ctx,
+            insert(Booking).values(id=booking_id, telegram_id=user_id(1), desk_id=2, date=day),
+            insert(BookingDailyStat).values(
+                date=day, desk_id=1, telegram_id=user_id(1), room_id=1, team_id=None,
+                bookings=1, cancellations=0, late_cancellations=0)),
+        teardown=execute(
+            ctx,
+            delete(Booking).where(Booking.id == booking_id),
+            delete(BookingDailyStat).where(BookingDailyStat.date == day)))
+
+
+@case("build_report[office]")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, build_report, *_history(ctx)))
+
+
+@case("build_report[room]")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, build_report, *_history(ctx), scope=AnalyticsScope.ROOM, scope_id=1, name=room_name(0)))
+
+
+#* Booking explorer (keyset pagination): the deep pages should cost the same as the first one
+def _explorer_filters(**filters) -> dict:
+    return {"scope": AnalyticsScope.ALL.value, "name": None, "scope_id": None, "start_date": None, "end_date": None, **filters}
+
+
+def _deep_key(ctx: BenchContext) -> tuple:
+    """Key of a page near the oldest seeded bookings."""
+    return ctx.today - timedelta(weeks=ctx.scale.weeks) + timedelta(days=1), 0
+
+
+read_case("orm_select_bookings_page", lambda ctx: (PAGE_SIZE + 1,))
+
+
+@case("fetch_bookings_page[deep]")
+def _(ctx: BenchContext) -> Benchmark:
+    return Benchmark(in_session(ctx, fetch_bookings_page, _explorer_filters(), "older", _deep_key(ctx)))
+
+
+@case("fetch_bookings_page[user, deep]")
+def _(ctx: BenchContext) -> Benchmark:
+    filters = _explorer_filters(scope=AnalyticsScope.USER.value, name=user_name(1), scope_id=user_id(1))
+    return Benchmark(in_session(ctx, fetch_bookings_page, filters, "older", _deep_key(ctx)))
+
+
+@case("fetch_bookings_page[room, newer]")
+def _(ctx: BenchContext) -> Benchmark:
+    filters = _explorer_filters(scope=AnalyticsScope.ROOM.value, name=room_name(0), scope_id=1)
+    return Benchmark(in_session(ctx, fetch_bookings_page, filters, "newer", _deep_key(ctx)))
@@ -0,0 +1,196 @@
+"""
+Seeds a synthetic office into an empty database for the benchmarks.
+
+The office is generated deterministically from a Scale, so the timings of two runs at the same scale are comparable.
+Rows are inserted with bulk INSERT statements, which is much faster than the orm_insert_* functions.
+"""
+import random
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.database.models import (
+    Base,
+    User,
+    UserRoleAssignment,
+    Team,
+    TeamTree,
+    TeamClosure,
+    Waitlist,
+    Room,
+    Desk,
+    DeskAssignment,
+    Booking,
+    BookingDailyStat,
+)
+from app.database.enums.user_roles import UserRole
+from app.database.enums.weekdays import Weekday
+
+
+@dataclass(frozen=True, slots=True)
+class Scale:
+    users: int
+    rooms: int
+    desks_per_room: int
+    weeks: int # Weeks of bookings around today: half in the past, half in the future
+    teams: int
+    booking_ratio: float = 0.7 # Share of desks booked on a workday
+    assignment_ratio: float = 0.1 # Share of desks permanently assigned on a weekday
+    out_of_office_ratio: float = 0.05
+    cancellation_ratio: float = 0.05 # Share of the booking_daily_stats rows with a cancelled booking before the current one
+    waitlist: int = 20
+    seed: int = 42
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(users=100, rooms=5, desks_per_room=20, weeks=4, teams=5),
+    "medium": Scale(users=1000, rooms=20, desks_per_room=50, weeks=8, teams=20),
+    "large": Scale(users=5000, rooms=50, desks_per_room=100, weeks=12, teams=50),
+}
+
+
+# Names of the seeded objects, used by the benchmark cases
+def user_id(i: int) -> int:
+    return 1_000_000 + i
+
+
+def user_name(i: int) -> str:
+    return f"user{i}"
+
+
+def room_name(i: int) -> str:
+    return f"Room {i}"
+
+
+def desk_name(room: int, desk: int) -> str:
+    return f"R{room}-D{desk}"
+
+
+def team_name(i: int) -> str:
+    return f"Team {i}"
+
+
+def workdays(scale: Scale, today: date) -> List[date]:
+    """Workdays with bookings: scale.weeks weeks starting scale.weeks // 2 weeks before today."""
+    start = today - timedelta(weeks=scale.weeks // 2)
+    days = (start + timedelta(days=i) for i in range(scale.weeks * 7))
+    return [day for day in days if day.weekday() < 5]
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_office(engine: AsyncEngine, scale: Scale, today: date | None = None) -> None:
+    """Recreates the schema and fills it with the office described by the scale."""
+    today = today or date.today()
+    rnd = random.Random(scale.seed)
+    await create_schema(engine)
+
+    users = [
+        {
+            "telegram_id": user_id(i),
+            "telegram_name": user_name(i),
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "is_out_of_office": rnd.random() < scale.out_of_office_ratio,
+        }
+        for i in range(scale.users)
+    ]
+    rooms = [
+        {"id": r + 1, "name": room_name(r), "plan": f"https://example.com/plans/{r}.png"}
+        for r in range(scale.rooms)
+    ]
+    desks = [
+        {"id": r * scale.desks_per_room + d + 1, "name": desk_name(r, d), "room_id": r + 1, "is_available": d % 10 != 9}
+        for r in range(scale.rooms)
+        for d in range(scale.desks_per_room)
+    ]
+    teams = [{"id": t + 1, "name": team_name(t), "room_id": t % scale.rooms + 1} for t in range(scale.teams)]
+    # Teams form a chain: Team 0 -> Team 1 -> ...
+    team_tree = [{"parent_team_id": t, "child_team_id": t + 1} for t in range(1, scale.teams)]
+    # The closure of the chain, as rebuilt by the ORM writes: every team is an ancestor of the teams after it
+    team_closure = [
+        {"ancestor_team_id": a, "descendant_team_id": d, "depth": d - a}
+        for a in range(1, scale.teams + 1)
+        for d in range(a, scale.teams + 1)
+    ]
+    role_assignments = [
+        {
+            "telegram_id": user_id(i),
+            "team_id": i % scale.teams + 1,
+            "role": UserRole.Manager if i < scale.teams else UserRole.Member,
+        }
+        for i in range(scale.users)
+    ]
+    waitlist = [
+        {"telegram_id": 9_000_000 + i, "telegram_name": f"waiting{i}"}
+        for i in range(scale.waitlist)
+    ]
+
+    desk_ids = [desk["id"] for desk in desks]
+    user_ids = [user["telegram_id"] for user in users]
+    per_day = int(min(len(desk_ids), len(user_ids)) * scale.booking_ratio)
+    per_weekday = int(min(len(desk_ids), len(user_ids)) * scale.assignment_ratio)
+
+    assignments = []
+    for weekday in list(Weekday)[:5]:
+        # Each (desk, weekday) and (user, weekday) pair is unique
+        for telegram_id, desk_id in zip(rnd.sample(user_ids, per_weekday), rnd.sample(desk_ids, per_weekday)):
+            assignments.append({"telegram_id": telegram_id, "desk_id": desk_id, "weekday": weekday})
+
+    bookings = []
+    for day in workdays(scale, today):
+        # Each (desk, date) and (user, date) pair is unique
+        for telegram_id, desk_id in zip(rnd.sample(user_ids, per_day), rnd.sample(desk_ids, per_day)):
+            bookings.append({"telegram_id": telegram_id, "desk_id": desk_id, "date": day})
+
+    # The analytics rollup, as maintained by the booking writes
+    desk_rooms = {desk["id"]: desk["room_id"] for desk in desks}
+    user_teams = {assignment["telegram_id"]: assignment["team_id"] for assignment in role_assignments}
+    booking_stats = []
+    for booking in bookings:
+        cancelled = int(rnd.random() < scale.cancellation_ratio)
+        booking_stats.append({
+            **booking,
+            "room_id": desk_rooms[booking["desk_id"]],
+            "team_id": user_teams.get(booking["telegram_id"]),
+            "bookings": 1 + cancelled,
+            "cancellations": cancelled,
+            "late_cancellations": cancelled if booking["date"] <= today else 0,
+        })
+
+    session_pool = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_pool() as session:
+        for model, rows in (
+            (User, users),
+            (Room, rooms),
+            (Desk, desks),
+            (Team, teams),
+            (TeamTree, team_tree),
+            (TeamClosure, team_closure),
+            (UserRoleAssignment, role_assignments),
+            (Waitlist, waitlist),
+            (DeskAssignment, assignments),
+            (Booking, bookings),
+            (BookingDailyStat, booking_stats),
+        ):
+            if rows:
+                await session.execute(insert(model), rows)
+        await session.commit()
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids were inserted, move the sequences past them
+        async with engine.begin() as conn:
+            for table in ("rooms", "desks", "teams"):
+                await conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+            await conn.exec_driver_sql("ANALYZE")
@@ -0,0 +1,54 @@
+import inspect
+import sys
+import warnings
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from app.database import orm_queries
+from tests.benchmarks.baselines import RESULTS, Baselines, measure
+from tests.benchmarks.cases import CASES, SKIPPED, BenchContext
+
+
+def test_every_orm_function_has_a_case() -> None:
+    """A new orm_* function must get a benchmark case (or a reason in SKIPPED)."""
+    orm_functions = {
+        name for name, func in inspect.getmembers(orm_queries, inspect.iscoroutinefunction)
+        if name.startswith("orm_") and func.__module__ == orm_queries.__name__
+    }
+    missing = orm_functions - CASES.keys() - SKIPPED.keys()
+    assert not missing, f"orm functions without a benchmark case: {sorted(missing)}"
+
+
+@pytest.mark.asyncio(scope="session")
+@pytest.mark.parametrize("name", sorted(CASES))
+async def test_benchmark(
+    name: str,
+    bench_context: BenchContext,
+    baselines: Baselines,
+    request: pytest.FixtureRequest,
+    ) -> None:
+    benchmark = CASES[name](bench_context)
+    timing = await measure(
+        benchmark.run,
+        rounds=request.config.getoption("rounds"),
+        setup=benchmark.setup,
+        teardown=benchmark.teardown,
+    )
+    RESULTS[name] = timing
+
+    if request.config.getoption("update_baselines"):
+        baselines.record(name, timing)
+        return
+
+    if not baselines.tracked:
+        warnings.warn(f"No baselines on {baselines.key}: {name} is not checked for regressions")
+    regression = baselines.check(
+        name, timing,
+        tolerance=request.config.getoption("tolerance"),
+        slack_ms=request.config.getoption("slack_ms"),
+    )
+    assert regression is None, regression
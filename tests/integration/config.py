@@ -92,6 +92,7 @@ class BotOperationConfig:
     date_format: Optional[str] = field(default="%d.%m.%Y (%a)")
     date_format_short: Optional[str] = field(default="%d.%m.%Y")
     advanced_mode: Optional[bool] = field(default=False)
+    occupancy_cache: Optional[bool] = field(default=False)
     
     def to_dict(self) -> dict:
         """Convert the BotOperationConfig dataclass instance into a dictionary."""
@@ -168,6 +169,7 @@ def load_config(overrides: Optional[dict] = None) -> Config:
             date_format=get_env("DATE_FORMAT"),
             date_format_short=get_env("DATE_FORMAT_SHORT"),
             advanced_mode=get_env("ADVANCED_MODE", "bool"),
+            occupancy_cache=get_env("OCCUPANCY_CACHE", "bool"),
         ),
         bot_advanced_mode=BotAdvancedModeConfig(
             standard_access_days=get_env("STANDARD_ACCESS_DAYS", "int"),
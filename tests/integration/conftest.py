@@ -33,6 +33,8 @@ from app.dialogs import register_dialogs
 from app.middlewares.i18n import TranslatorRunnerMiddleware
 from app.middlewares.db_middleware import DataBaseSession
 from app.middlewares.user_middleware import UserMiddleware
+from app.middlewares.query_stats_middleware import QueryStatsMiddleware, HandlerNameMiddleware
+from app.database.query_stats import instrument_engine
 from app.routers import router
 
 from app.utils.logger import Logger
@@ -76,6 +78,7 @@ def i18n() -> Translator:
 def engine(config: Config):
     logger.debug(f"Creating engine using DB URL: {config.db.url}.")
     engine = create_async_engine(config.db.url, echo=False)
+    instrument_engine(engine) # Count statements for assert_max_queries
     yield engine
     # engine.sync_engine.dispose()
 
@@ -103,8 +106,11 @@ def dp(engine,
         
     sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
     
-    dispatcher.message.outer_middleware(UserMiddleware(session_pool=sessionmaker))
-    dispatcher.callback_query.outer_middleware(UserMiddleware(session_pool=sessionmaker))
+    dispatcher.update.outer_middleware(QueryStatsMiddleware())
+    dispatcher.message.middleware(HandlerNameMiddleware())
+    dispatcher.callback_query.middleware(HandlerNameMiddleware())
+    dispatcher.message.outer_middleware(UserMiddleware())
+    dispatcher.callback_query.outer_middleware(UserMiddleware())
     dispatcher.update.middleware(DataBaseSession(session_pool=sessionmaker))
 
     return dispatcher
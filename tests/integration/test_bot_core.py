@@ -27,6 +27,7 @@ from tests.integration.utils import (
     log_inline_keyboard_buttons,
     assert_message_text,
     log_sent_messages,
+    assert_max_queries,
 )
 from tests.integration.config import Config
 from app.database.models import User, Room, Desk, Booking
@@ -167,12 +168,13 @@ async def booking_dialog(
     message_manager.reset_history()
     
     logger.info(f"Clicking on the first date button: {first_date_button}")
-    date_button_callback_id = await click_inline_keyboard_button_by_location(
-        test_user=test_user,
-        message=date_selection_message,
-        row=0,
-        column=0,
-    )
+    with assert_max_queries(4, "select date"):
+        date_button_callback_id = await click_inline_keyboard_button_by_location(
+            test_user=test_user,
+            message=date_selection_message,
+            row=0,
+            column=0,
+        )
     
     message_manager.assert_answered(callback_id=date_button_callback_id)
     logger.debug(f"Callback message has been answered. Callback ID: {date_button_callback_id}")
@@ -208,12 +210,13 @@ async def booking_dialog(
     message_manager.reset_history()
     
     logger.info(f"Clicking on the first room button: {first_room_button}")
-    room_button_callback_id = await click_inline_keyboard_button_by_location(
-        test_user=test_user,
-        message=room_selection_message,
-        row=0,
-        column=0,
-    )
+    with assert_max_queries(3, "select room"):
+        room_button_callback_id = await click_inline_keyboard_button_by_location(
+            test_user=test_user,
+            message=room_selection_message,
+            row=0,
+            column=0,
+        )
     
     message_manager.assert_answered(callback_id=room_button_callback_id)
     logger.debug(f"Callback message has been answered. Callback ID: {room_button_callback_id}")
@@ -235,7 +238,9 @@ async def booking_dialog(
             date_format=str(c.date_format),
             telegram_id=telegram_id,
             advanced_mode=c.advanced_mode,
-            standard_access_days=ca.standard_access_days)
+            standard_access_days=ca.standard_access_days,
+            country_code=c.country_code,
+            timezone=c.timezone)
     
     log_inline_keyboard_buttons(desk_selection_message)
     
@@ -258,12 +263,13 @@ async def booking_dialog(
         
         logger.info(f"Clicking on the first desk button: {first_desk_button}")
         
-        desk_button_callback_id: str = await click_inline_keyboard_button_by_location(
-            test_user=test_user,
-            message=desk_selection_message,
-            row=0,
-            column=0,
-        )
+        with assert_max_queries(3, "select desk"):
+            desk_button_callback_id: str = await click_inline_keyboard_button_by_location(
+                test_user=test_user,
+                message=desk_selection_message,
+                row=0,
+                column=0,
+            )
         
         message_manager.assert_answered(callback_id=desk_button_callback_id)
         logger.debug(f"Callback message has been answered. Callback ID: {desk_button_callback_id}")
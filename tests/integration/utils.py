@@ -1,4 +1,5 @@
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
 from aiogram.types import Message, CallbackQuery
@@ -6,6 +7,7 @@ from aiogram_dialog.test_tools import MockMessageManager, BotClient
 from aiogram_dialog.test_tools.keyboard import InlineButtonTextLocator, InlineButtonPositionLocator
 
 from tests.integration.config import Config
+from app.database.query_stats import QueryStats, query_stats
 from app.database.models import Base, User, Room, Desk
 from app.database.orm_queries import (
     orm_insert_users,
@@ -260,4 +262,28 @@ async def click_inline_keyboard_button_by_text(
         return callback_id
     except ValueError as e:
         logger.error(f"Failed to simulate button click: {e}")
-        raise AssertionError(f"Button with text '{button_text}' not found on the inline keyboard.")
\ No newline at end of file
+        raise AssertionError(f"Button with text '{button_text}' not found on the inline keyboard.")
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, step: str = "test step") -> Iterator[QueryStats]:
+    """
+    Asserts that the dialog step run inside the block executes at most max_queries SQL statements.
+    The engine must be instrumented with app.database.query_stats.instrument_engine.
+
+    Example:
+        with assert_max_queries(4, "select room"):
+            await click_inline_keyboard_button_by_location(test_user, message, row=0, column=0)
+
+    Args:
+        max_queries (int): The maximum number of statements.
+        step (str): The name of the step used in the assertion message.
+
+    Yields:
+        QueryStats: The statements and database time counted so far.
+    """
+    with query_stats.track(f"test:{step}") as stats:
+        yield stats
+    logger.debug(f"{step}: {stats.statements} statements, {stats.db_time * 1000:.1f} ms in the database.")
+    assert stats.statements <= max_queries, (
+        f"{step} executed {stats.statements} SQL statements, expected at most {max_queries}.")
@@ -0,0 +1,117 @@
+"""
+Dispatcher set up like in app/bot.py, but driven by simulated users instead of Telegram.
+
+LoadBot answers every Telegram API call with a successful response, so handlers that call the API directly
+(e.g. /my_bookings) work without preparing responses like in the integration tests.
+LoadMessageManager keeps only the last dialog message per chat, so memory does not grow with the number of updates.
+"""
+from datetime import datetime
+from itertools import count
+from typing import Dict, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import CallbackQuery, Chat, Message
+from aiogram_dialog import setup_dialogs
+from aiogram_dialog.api.entities import NewMessage, OldMessage
+from aiogram_dialog.test_tools import MockMessageManager
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.dialogs import register_dialogs
+from app.middlewares.db_middleware import DataBaseSession, SessionReleaseMiddleware
+from app.middlewares.i18n import TranslatorRunnerMiddleware
+from app.middlewares.user_middleware import UserMiddleware
+from app.routers import router
+from app.utils.i18n import Translator
+
+from tests.integration.config import (
+    Config,
+    DBConfig,
+    BotConfig,
+    BotOperationConfig,
+    BotAdvancedModeConfig,
+    RedisConfig,
+)
+from tests.integration.mocked_bot import MockedBot, MockedSession
+
+
+class LoadSession(MockedSession):
+    """Answers every request with a successful result instead of a prepared response."""
+    def __init__(self):
+        super().__init__()
+        self._message_ids = count(1)
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: Optional[int] = None,
+    ) -> TelegramType:
+        if method.__returning__ is Message:
+            chat_id = getattr(method, 'chat_id', 0)
+            return Message(  # type: ignore
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=chat_id, type='private'),
+                text=getattr(method, 'text', None),
+            )
+        return True  # type: ignore
+
+
+class LoadBot(MockedBot):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session = LoadSession()
+        # Like in production, release database connections before Telegram API calls
+        self.session.middleware(SessionReleaseMiddleware())
+
+
+class LoadMessageManager(MockMessageManager):
+    def __init__(self):
+        super().__init__()
+        self.last_by_chat: Dict[int, Message] = {}
+
+    async def show_message(self, bot: Bot, new_message: NewMessage, old_message: Optional[OldMessage]) -> OldMessage:
+        result = await super().show_message(bot, new_message, old_message)
+        self.last_by_chat[new_message.chat.id] = self.sent_messages.pop()
+        return result
+
+    async def remove_kbd(self, bot, show_mode, old_message: Optional[OldMessage]) -> Optional[Message]:
+        message = await super().remove_kbd(bot, show_mode, old_message)
+        if message is not None:
+            self.sent_messages.pop()
+        return message
+
+    async def answer_callback(self, bot: Bot, callback_query: CallbackQuery) -> None:
+        pass
+
+    def last_message_in_chat(self, chat_id: int) -> Optional[Message]:
+        return self.last_by_chat.get(chat_id)
+
+
+def build_config(advanced_mode: bool = False, standard_access_days: int = 1) -> Config:
+    return Config(
+        db=DBConfig(uri='', name=''),
+        bot=BotConfig(token='42:TEST', admins=[]),
+        bot_operation=BotOperationConfig(advanced_mode=advanced_mode),
+        bot_advanced_mode=BotAdvancedModeConfig(standard_access_days=standard_access_days),
+        redis=RedisConfig(),
+    )
+
+
+def build_dispatcher(engine: AsyncEngine, bot: Bot, message_manager: LoadMessageManager, config: Config) -> Dispatcher:
+    """Builds the dispatcher with the routers, dialogs and middlewares of app/bot.py. The main router can be attached only once per process."""
+    dp = Dispatcher(storage=MemoryStorage(), events_isolation=SimpleEventIsolation(), bot=bot)
+    dp['config'] = config
+    dp.include_router(router)
+    register_dialogs(router)
+    setup_dialogs(dp, message_manager=message_manager)
+
+    session_pool = async_sessionmaker(engine, expire_on_commit=False)
+    dp.message.outer_middleware(UserMiddleware())
+    dp.callback_query.outer_middleware(UserMiddleware())
+    dp.update.middleware(DataBaseSession(session_pool=session_pool))
+    dp.update.middleware(TranslatorRunnerMiddleware(translator=Translator()))
+    return dp
@@ -0,0 +1,146 @@
+"""
+Simulated users and the scenarios they run against the dispatcher.
+
+Each step (a command or a button click) is one update fed through the full middleware stack,
+and its latency is recorded under the step name in LoadStats.
+"""
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import InlineKeyboardButton, Message
+from aiogram_dialog.test_tools import BotClient
+
+from tests.load.harness import LoadMessageManager
+from tests.load.stats import LoadStats
+
+from app.utils.logger import Logger
+logger = Logger('load')
+
+
+# aiogram_dialog prefixes the callback data of widgets with the intent id and this separator
+CALLBACK_SEPARATOR = "\x1d"
+
+
+class _ButtonLocator:
+    def __init__(self, button: InlineKeyboardButton):
+        self.button = button
+
+    def find_button(self, message: Message) -> Optional[InlineKeyboardButton]:
+        return self.button
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        message_manager: LoadMessageManager,
+        stats: LoadStats,
+        telegram_id: int,
+        rnd: random.Random,
+        ):
+        self.client = BotClient(dp, user_id=telegram_id, chat_id=telegram_id, bot=bot)
+        self.message_manager = message_manager
+        self.stats = stats
+        self.telegram_id = telegram_id
+        self.rnd = rnd
+
+
+    async def _timed(self, step: str, update: Awaitable) -> bool:
+        start = time.perf_counter()
+        try:
+            await update
+        except Exception as e:
+            self.stats.add_error(step)
+            logger.debug(f"{step} failed for user {self.telegram_id}: {e!r}")
+            return False
+        self.stats.add(step, (time.perf_counter() - start) * 1000)
+        return True
+
+
+    async def send(self, text: str) -> bool:
+        return await self._timed(text, self.client.send(text))
+
+
+    async def click(self, widget_id: str) -> bool:
+        """Clicks a random button of the widget in the last dialog message. Returns False if there is no such button."""
+        message = self.message_manager.last_message_in_chat(self.telegram_id)
+        if message is None or message.reply_markup is None:
+            return False
+        buttons = [
+            button
+            for row in message.reply_markup.inline_keyboard
+            for button in row
+            if button.callback_data and _widget_of(button.callback_data) == widget_id
+        ]
+        if not buttons:
+            return False
+        button = self.rnd.choice(buttons)
+        return await self._timed(f"click:{widget_id}", self.client.click(message, _ButtonLocator(button)))
+
+
+def _widget_of(callback_data: str) -> str:
+    """Returns the widget id of the callback data "<intent id>\\x1d<widget id>[:<item id>]"."""
+    data = callback_data.split(CALLBACK_SEPARATOR, 1)[-1]
+    return data.split(':', 1)[0]
+
+
+#* Scenarios
+async def book(user: VirtualUser) -> None:
+    """/book, then a random date, room and desk."""
+    if await user.send('/book') and await user.click('date') and await user.click('room_name'):
+        await user.click('desk_name')
+
+
+async def book_random(user: VirtualUser) -> None:
+    """/book, then a random date and the random desk button."""
+    if await user.send('/book') and await user.click('date'):
+        await user.click('random')
+
+
+async def my_bookings(user: VirtualUser) -> None:
+    await user.send('/my_bookings')
+
+
+async def team_bookings(user: VirtualUser) -> None:
+    """/team, then the team bookings view."""
+    if await user.send('/team'):
+        await user.click('bookings')
+
+
+# Scenario name: (scenario, weight). The weights approximate a Monday morning, when most users book.
+SCENARIOS: Dict[str, Tuple[Callable[[VirtualUser], Awaitable[None]], int]] = {
+    'book': (book, 5),
+    'book_random': (book_random, 1),
+    'my_bookings': (my_bookings, 3),
+    'team_bookings': (team_bookings, 2),
+}
+
+
+async def run_users(
+    users: List[VirtualUser],
+    iterations: int,
+    concurrency: int,
+    think_time: float = 0.0,
+    scenarios: Optional[List[str]] = None,
+    ) -> None:
+    """
+    Every user runs `iterations` scenarios picked by weight, all users at once.
+    At most `concurrency` scenarios are in progress at a time; think_time (seconds) is a pause between the scenarios of a user.
+    """
+    names = scenarios or list(SCENARIOS)
+    weights = [SCENARIOS[name][1] for name in names]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_user(user: VirtualUser) -> None:
+        for _ in range(iterations):
+            scenario = SCENARIOS[user.rnd.choices(names, weights)[0]][0]
+            async with semaphore:
+                await scenario(user)
+            if think_time:
+                await asyncio.sleep(user.rnd.uniform(0, 2 * think_time))
+
+    await asyncio.gather(*(run_user(user) for user in users))
@@ -0,0 +1,50 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+@dataclass(slots=True)
+class LoadStats:
+    """Latencies (ms) and errors per step (e.g. "/book", "click:date"), and the wall time of the run."""
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    wall_time: float = 0.0
+
+    def add(self, step: str, elapsed_ms: float) -> None:
+        self.latencies[step].append(elapsed_ms)
+
+    def add_error(self, step: str) -> None:
+        self.errors[step] += 1
+
+    @property
+    def updates(self) -> int:
+        return sum(len(samples) for samples in self.latencies.values()) + sum(self.errors.values())
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.updates / self.wall_time if self.wall_time else 0.0
+
+    def report(self) -> str:
+        steps = sorted(set(self.latencies) | set(self.errors))
+        width = max([len(step) for step in steps] + [len('step')])
+        lines = [
+            f"{self.updates} updates in {self.wall_time:.2f} s: {self.updates_per_second:.1f} updates/s",
+            f"{'step':<{width}}  {'count':>7}  {'errors':>6}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'max':>9}",
+        ]
+        for step in steps:
+            samples = sorted(self.latencies.get(step, []))
+            lines.append(
+                f"{step:<{width}}  {len(samples):>7}  {self.errors.get(step, 0):>6}  "
+                f"{percentile(samples, 50):>9.2f}  {percentile(samples, 95):>9.2f}  "
+                f"{percentile(samples, 99):>9.2f}  {(samples[-1] if samples else 0.0):>9.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from tests.benchmarks.seeding import SCALES, seed_office
+from tests.load.run_load import run_load
+from tests.load.scenarios import SCENARIOS
+
+
+@pytest.mark.asyncio
+async def test_load_smoke(tmp_path: Path) -> None:
+    """A short run of every scenario: all steps are handled without errors."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'load.db'}")
+    await seed_office(engine, SCALES["small"])
+    stats = await run_load(engine, users=10, iterations=4, scenarios=list(SCENARIOS))
+    await engine.dispose()
+
+    assert stats.updates > 0
+    assert not stats.errors, stats.report()
+    assert {"/book", "click:date", "/my_bookings", "/team", "click:bookings"} <= set(stats.latencies)
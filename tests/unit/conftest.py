@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from datetime import date, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.engine import create_db, get_engine, get_session_pool
+from app.database.models import User, Room, Desk
+
+
+# A small office: Room A with three desks (A-3 is not available) and Room B, which is not available
+USERS = [1, 2, 3]
+ROOM_A, ROOM_B = 1, 2
+DESK_A1, DESK_A2, DESK_A3, DESK_B1 = 1, 2, 3, 4
+
+
+def next_workday(day: date) -> date:
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def holds_connection(session) -> bool:
+    """Whether the session (an AsyncSession or a LazySession) has a connection checked out of the pool."""
+    transaction = session.sync_session.get_transaction()
+    return transaction is not None and bool(transaction._connections)
+
+
+def enable_foreign_keys(dbapi_connection, connection_record) -> None:
+    """SQLite enforces the foreign keys (and their ON DELETE CASCADE) only when asked to, like Postgres always does."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path: Path) -> AsyncEngine:
+    engine = get_engine(db_url=f"sqlite+aiosqlite:///{tmp_path / 'unit.db'}", name="unit")
+    event.listen(engine.sync_engine, "connect", enable_foreign_keys)
+    await create_db(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_pool(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return get_session_pool(engine)
+
+
+@pytest_asyncio.fixture
+async def office(session_pool: async_sessionmaker[AsyncSession]) -> None:
+    async with session_pool() as session:
+        await session.execute(insert(User), [
+            {"telegram_id": telegram_id, "telegram_name": f"user{telegram_id}"} for telegram_id in USERS])
+        await session.execute(insert(Room), [
+            {"id": ROOM_A, "name": "Room A", "is_available": True},
+            {"id": ROOM_B, "name": "Room B", "is_available": False},
+        ])
+        await session.execute(insert(Desk), [
+            {"id": DESK_A1, "name": "A-1", "room_id": ROOM_A, "is_available": True},
+            {"id": DESK_A2, "name": "A-2", "room_id": ROOM_A, "is_available": True},
+            {"id": DESK_A3, "name": "A-3", "room_id": ROOM_A, "is_available": False},
+            {"id": DESK_B1, "name": "B-1", "room_id": ROOM_B, "is_available": True},
+        ])
+        await session.commit()
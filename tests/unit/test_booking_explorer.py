@@ -0,0 +1,111 @@
+import random
+from datetime import date, timedelta
+from typing import List
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.enums.analytics_scopes import AnalyticsScope
+from app.database.models import Booking
+from app.services.admin.booking_explorer import BookingPage, fetch_bookings_page
+
+from tests.unit.conftest import USERS
+
+
+PAGE_SIZE = 5
+START_DATE = date(2024, 1, 1)
+ALL = {"scope": AnalyticsScope.ALL.value, "start_date": None, "end_date": None}
+
+
+def user_filter(telegram_id: int) -> dict:
+    return {"scope": AnalyticsScope.USER.value, "scope_id": telegram_id, "start_date": None, "end_date": None}
+
+
+def keys(page: BookingPage) -> list:
+    return [(row.date, row.id) for row in page.rows]
+
+
+async def seed_bookings(session_pool: async_sessionmaker[AsyncSession], count: int) -> List[tuple]:
+    """
+    Inserts `count` bookings, up to three per day, in a shuffled order, so the ids don't follow the dates.
+    Returns their (date, id) keys, newest first.
+    """
+    bookings = [
+        {"date": START_DATE + timedelta(days=i // len(USERS)), "telegram_id": USERS[i % len(USERS)], "desk_id": i % len(USERS) + 1}
+        for i in range(count)
+    ]
+    random.Random(1).shuffle(bookings)
+    async with session_pool() as session:
+        for booking in bookings:
+            await session.execute(insert(Booking).values(**booking))
+        await session.commit()
+        result = await session.execute(select(Booking.date, Booking.id).order_by(Booking.date.desc(), Booking.id.desc()))
+        return [tuple(row) for row in result.all()]
+
+
+async def walk_older(session: AsyncSession, filters: dict) -> List[BookingPage]:
+    pages = [await fetch_bookings_page(session, filters, page_size=PAGE_SIZE)]
+    while pages[-1].older:
+        pages.append(await fetch_bookings_page(session, filters, "older", pages[-1].older, page_size=PAGE_SIZE))
+    return pages
+
+
+async def walk_newer(session: AsyncSession, filters: dict, page: BookingPage) -> List[BookingPage]:
+    pages = [page]
+    while pages[-1].newer:
+        pages.append(await fetch_bookings_page(session, filters, "newer", pages[-1].newer, page_size=PAGE_SIZE))
+    return pages
+
+
+@pytest.mark.parametrize("count", [23, 20, 5, 1])
+@pytest.mark.asyncio
+async def test_walk_forward_and_back(session_pool: async_sessionmaker[AsyncSession], office, count: int) -> None:
+    """Every booking is shown exactly once in each direction, and going back shows the same pages."""
+    expected = await seed_bookings(session_pool, count)
+    async with session_pool() as session:
+        pages = await walk_older(session, ALL)
+        back = await walk_newer(session, ALL, pages[-1])
+
+    assert [key for page in pages for key in keys(page)] == expected
+    assert [len(page.rows) for page in pages[:-1]] == [PAGE_SIZE] * (len(pages) - 1)
+    assert 0 < len(pages[-1].rows) <= PAGE_SIZE # No empty page at the end, even if the count is a multiple of the page
+    assert pages[0].newer is None
+    assert pages[-1].older is None
+
+    # Newer pages are shown newest first, like the older ones
+    assert [keys(page) for page in reversed(back)] == [keys(page) for page in pages]
+    assert back[-1].newer is None
+    # A newer page always has older bookings: at least the page it was reached from
+    assert all(page.older == (page.rows[-1].date, page.rows[-1].id) for page in back[1:])
+
+
+@pytest.mark.asyncio
+async def test_walk_filtered(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    await seed_bookings(session_pool, 23)
+    async with session_pool() as session:
+        expected = [
+            tuple(row) for row in (await session.execute(
+                select(Booking.date, Booking.id).where(Booking.telegram_id == USERS[0])
+                .order_by(Booking.date.desc(), Booking.id.desc()))).all()]
+        pages = await walk_older(session, user_filter(USERS[0]))
+        back = await walk_newer(session, user_filter(USERS[0]), pages[-1])
+
+    assert [key for page in pages for key in keys(page)] == expected
+    assert [keys(page) for page in reversed(back)] == [keys(page) for page in pages]
+
+
+@pytest.mark.asyncio
+async def test_empty_pages(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """No bookings, or the older bookings deleted since the previous page: an empty page without buttons."""
+    async with session_pool() as session:
+        assert await fetch_bookings_page(session, ALL, page_size=PAGE_SIZE) == BookingPage()
+
+    await seed_bookings(session_pool, 8)
+    async with session_pool() as session:
+        first = await fetch_bookings_page(session, ALL, page_size=PAGE_SIZE)
+        await session.execute(delete(Booking).where(Booking.date < first.older[0]))
+        await session.execute(delete(Booking).where(Booking.date == first.older[0], Booking.id < first.older[1]))
+        await session.commit()
+        assert await fetch_bookings_page(session, ALL, "older", first.older, page_size=PAGE_SIZE) == BookingPage()
+        assert await fetch_bookings_page(session, user_filter(999999), page_size=PAGE_SIZE) == BookingPage()
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.models import Booking, BookingDailyStat
+from app.database.orm_queries import (
+    orm_backfill_booking_daily_stats,
+    orm_delete_booking_by_id,
+    orm_insert_booking_on_conflict_do_nothing,
+    orm_record_booking_cancellations,
+    orm_record_booking_change,
+)
+from app.services.common.business_days import local_today
+
+from tests.unit.conftest import DESK_A1, DESK_A2
+
+
+TIMEZONE = "Pacific/Kiritimati" # UTC+14, a day ahead of the server for most of the day
+
+
+async def stats(session: AsyncSession) -> list:
+    result = await session.execute(
+        select(
+            BookingDailyStat.date,
+            BookingDailyStat.desk_id,
+            BookingDailyStat.bookings,
+            BookingDailyStat.cancellations,
+            BookingDailyStat.late_cancellations)
+        .order_by(BookingDailyStat.date))
+    return [tuple(row) for row in result.all()]
+
+
+@pytest.mark.asyncio
+async def test_late_cancellations_use_the_timezone(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """Cancelling a booking of today in the bot's timezone is late, cancelling tomorrow's booking is not."""
+    today = local_today(TIMEZONE)
+    tomorrow = today + timedelta(days=1)
+    async with session_pool() as session:
+        today_id = await orm_insert_booking_on_conflict_do_nothing(session, 1, today, desk_id=DESK_A1)
+        tomorrow_id = await orm_insert_booking_on_conflict_do_nothing(session, 1, tomorrow, desk_id=DESK_A1)
+        await orm_delete_booking_by_id(session, today_id, TIMEZONE)
+        await orm_delete_booking_by_id(session, tomorrow_id, TIMEZONE)
+
+        assert await stats(session) == [(today, DESK_A1, 1, 1, 1), (tomorrow, DESK_A1, 1, 1, 0)]
+
+
+@pytest.mark.asyncio
+async def test_bookings_written_outside_the_bot(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """Bookings inserted and deleted without the bot (as in sqladmin) are counted by the backfill and the cancellations."""
+    day = local_today(TIMEZONE) + timedelta(days=7)
+    async with session_pool() as session:
+        await session.execute(insert(Booking), [
+            {"telegram_id": 1, "desk_id": DESK_A1, "date": day},
+            {"telegram_id": 2, "desk_id": DESK_A2, "date": day},
+        ])
+        await session.commit()
+
+        assert await orm_backfill_booking_daily_stats(session) == 2
+        assert await orm_backfill_booking_daily_stats(session) == 0
+        await orm_record_booking_cancellations(session, [(day, DESK_A2, 2)], TIMEZONE)
+
+        assert await stats(session) == [(day, DESK_A1, 1, 0, 0), (day, DESK_A2, 1, 1, 0)]
+
+
+@pytest.mark.asyncio
+async def test_booking_edits_outside_the_bot(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """Moving a booking (as in sqladmin) cancels the old key, re-creating a cancelled booking counts it again."""
+    day = local_today(TIMEZONE) + timedelta(days=7)
+    async with session_pool() as session:
+        booking = Booking(telegram_id=1, desk_id=DESK_A1, date=day)
+        session.add(booking)
+        await session.commit()
+        await orm_record_booking_change(session, booking, timezone=TIMEZONE)
+
+        booking.desk_id = DESK_A2
+        await session.commit()
+        await orm_record_booking_change(session, booking, (day, DESK_A1, 1), TIMEZONE)
+        assert await stats(session) == [(day, DESK_A1, 1, 1, 0), (day, DESK_A2, 1, 0, 0)]
+
+        # An edit that keeps the key changes nothing
+        await orm_record_booking_change(session, booking, (day, DESK_A2, 1), TIMEZONE)
+        assert await stats(session) == [(day, DESK_A1, 1, 1, 0), (day, DESK_A2, 1, 0, 0)]
+
+        booking.desk_id = DESK_A1
+        await session.commit()
+        await orm_record_booking_change(session, booking, (day, DESK_A2, 1), TIMEZONE)
+        assert await stats(session) == [(day, DESK_A1, 2, 1, 0), (day, DESK_A2, 1, 1, 0)]
@@ -0,0 +1,143 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.enums.weekdays import Weekday
+from app.database.models import Desk, DeskAssignment
+from app.services.admin.bulk_import import ImportFileError, bulk_import_file, parse_import_file
+
+
+OFFICE = {
+    "rooms": [{"name": "Main"}, {"name": "Annex", "is_available": False}],
+    "desks": [{"room": "Main", "name": "M1"}, {"room": "Main", "name": "M2"}, {"room": "Annex", "name": "X1"}],
+    "users": [
+        {"telegram_id": 100001, "telegram_name": "alice_1"},
+        {"telegram_id": "100002", "telegram_name": "@bob_22"},
+    ],
+    "desk_assignments": [
+        {"desk": "M1", "telegram_id": 100001, "weekday": "monday"},
+        {"desk": "M2", "telegram_name": "bob_22", "weekday": 1},
+    ],
+}
+
+
+def json_file(data) -> bytes:
+    return json.dumps(data).encode("utf-8")
+
+
+def errors(report) -> dict:
+    return {error.location: error.message for error in report.errors}
+
+
+#* Parsing
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_csv_delimiter_is_sniffed(delimiter: str) -> None:
+    content = f"﻿Room{delimiter}Name{delimiter}is_available\nMain{delimiter}M1{delimiter}no\n\nMain{delimiter}M2{delimiter}\n"
+    rows = parse_import_file("desks.CSV", content.encode("utf-8"))
+
+    assert [row.kind for row in rows] == ["desks", "desks"]
+    assert [row.location for row in rows] == ["line 2", "line 4"]
+    assert rows[0].values == {"room": "Main", "name": "M1", "is_available": "no"}
+
+
+@pytest.mark.parametrize("content, kind", [
+    ("name,plan\nMain,\n", "rooms"),
+    ("telegram_id,telegram_name\n100001,alice_1\n", "users"),
+    ("desk,weekday,telegram_name\nM1,Monday,alice_1\n", "desk_assignments"),
+])
+def test_csv_kind_is_detected_from_columns(content: str, kind: str) -> None:
+    assert parse_import_file("import.csv", content.encode("utf-8"))[0].kind == kind
+
+
+@pytest.mark.parametrize("filename, content, message", [
+    ("import.csv", b"room;desk\nMain;M1\n", "Unknown CSV columns"),
+    ("import.txt", b"name\nMain\n", ".csv or .json"),
+    ("import.csv", "name\nMain\n".encode("utf-16"), "UTF-8"),
+    ("import.json", b"{", "Invalid JSON"),
+    ("import.json", b"[]", "must be an object"),
+    ("import.json", b"{}", "must be an object"),
+    ("import.json", b'{"rooms": [], "teams": []}', "must be an object"),
+    ("import.json", b'{"rooms": {"name": "Main"}}', '"rooms" must be a list'),
+], ids=[
+    "unknown columns", "unknown extension", "not utf-8", "invalid json",
+    "json list", "empty json object", "unknown json key", "json value not a list",
+])
+def test_file_errors(filename: str, content: bytes, message: str) -> None:
+    with pytest.raises(ImportFileError, match=message):
+        parse_import_file(filename, content)
+
+
+#* Import
+@pytest.mark.asyncio
+async def test_import_json(session_pool: async_sessionmaker[AsyncSession]) -> None:
+    async with session_pool() as session:
+        report = await bulk_import_file(session, "office.json", json_file(OFFICE))
+        assignments = (await session.execute(
+            select(Desk.name, DeskAssignment.telegram_id, DeskAssignment.weekday)
+            .join(Desk, Desk.id == DeskAssignment.desk_id)
+            .order_by(Desk.name))).all()
+
+    assert report.errors == []
+    assert report.inserted == {"rooms": 2, "desks": 3, "users": 2, "desk_assignments": 2}
+    assert assignments == [("M1", 100001, Weekday.MONDAY), ("M2", 100002, Weekday.TUESDAY)]
+
+
+@pytest.mark.asyncio
+async def test_import_reports_rows_that_already_exist(session_pool: async_sessionmaker[AsyncSession]) -> None:
+    async with session_pool() as session:
+        await bulk_import_file(session, "office.json", json_file(OFFICE))
+        office = dict(OFFICE, rooms=OFFICE["rooms"] + [{"name": "Lab"}])
+        report = await bulk_import_file(session, "office.json", json_file(office))
+
+    assert report.inserted == {"rooms": 1, "desks": 0, "users": 0, "desk_assignments": 0}
+    assert set(errors(report).values()) == {"already exists"}
+    assert len(report.errors) == 2 + 3 + 2 + 2
+
+
+@pytest.mark.asyncio
+async def test_import_reports_duplicates_within_the_file(session_pool: async_sessionmaker[AsyncSession]) -> None:
+    content = (
+        "telegram_id,telegram_name\n"
+        "100001,alice_1\n"
+        "100001,alice_2\n" # Same telegram_id
+        "100003,ALICE_1\n" # Same telegram_name, usernames are case-insensitive
+        "100004,carol_3\n"
+    ).encode("utf-8")
+    async with session_pool() as session:
+        report = await bulk_import_file(session, "users.csv", content)
+
+    assert report.inserted == {"users": 2}
+    assert errors(report) == {"line 3": "duplicate of line 2", "line 4": "duplicate of line 2"}
+
+
+@pytest.mark.asyncio
+async def test_import_reports_unknown_references(session_pool: async_sessionmaker[AsyncSession]) -> None:
+    data = {
+        "rooms": [{"name": "Main"}],
+        "desks": [{"room": "Main", "name": "M1"}, {"room": "Lab", "name": "L1"}],
+        "users": [{"telegram_id": 100001, "telegram_name": "alice_1"}],
+        "desk_assignments": [
+            {"desk": "M1", "telegram_id": 100001, "weekday": "Monday"},
+            {"desk": "L1", "telegram_id": 100001, "weekday": "Tuesday"},
+            {"desk": "M1", "telegram_id": 999999, "weekday": "Tuesday"},
+            {"desk": "M1", "telegram_name": "nobody", "weekday": "Wednesday"},
+            {"desk": "M1", "telegram_id": 100001, "weekday": "Someday"},
+            "M1",
+        ],
+    }
+    async with session_pool() as session:
+        report = await bulk_import_file(session, "office.json", json_file(data))
+        desks = await session.scalar(select(func.count()).select_from(Desk))
+
+    assert report.inserted == {"rooms": 1, "desks": 1, "users": 1, "desk_assignments": 1}
+    assert desks == 1
+    assert errors(report) == {
+        "desks #2": "room Lab does not exist",
+        "desk_assignments #2": "desk L1 does not exist",
+        "desk_assignments #3": "user 999999 does not exist",
+        "desk_assignments #4": "user @nobody does not exist",
+        "desk_assignments #5": "weekday must be a day name (e.g. Monday) or a number from 0 (Monday) to 6 (Sunday)",
+        "desk_assignments #6": "telegram_id or telegram_name is required",
+    }
@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.common.business_days import busday_count, is_holiday, workdays_difference
+
+
+def count_day_by_day(begin: date, end: date, country_code) -> int:
+    """Reference for busday_count: walks the days of [begin, end)."""
+    days = (begin + timedelta(days=i) for i in range((end - begin).days))
+    return sum(1 for day in days if day.weekday() < 5 and not is_holiday(day, country_code))
+
+
+@pytest.mark.parametrize("today, booking_date, country_code, expected", [
+    (date(2026, 10, 19), date(2026, 10, 19), None, 1), # Monday, the same day
+    (date(2026, 10, 19), date(2026, 10, 23), None, 5), # Monday to Friday
+    (date(2026, 10, 23), date(2026, 10, 24), None, 1), # Friday to Saturday
+    (date(2026, 10, 23), date(2026, 10, 26), None, 2), # Friday to Monday, over the weekend
+    (date(2026, 10, 24), date(2026, 10, 25), None, 0), # Saturday to Sunday
+    (date(2026, 10, 23), date(2026, 10, 22), None, 0), # The booking date has passed
+    (date(2026, 12, 24), date(2026, 12, 28), None, 3),
+    (date(2026, 12, 24), date(2026, 12, 28), "DE", 2), # Christmas falls on Friday
+    (date(2026, 12, 25), date(2026, 12, 25), "DE", 0), # Booking on the holiday itself
+    (date(2026, 12, 21), date(2027, 1, 4), None, 11),
+    (date(2026, 12, 21), date(2027, 1, 4), "DE", 9), # Over Christmas, a weekend holiday and New Year
+])
+def test_workdays_difference(today: date, booking_date: date, country_code, expected: int) -> None:
+    assert workdays_difference(booking_date, country_code, today=today) == expected
+
+
+@pytest.mark.parametrize("country_code", [None, "DE", "RU"])
+def test_busday_count_matches_counting_day_by_day(country_code) -> None:
+    """Ranges of every length up to five weeks from every weekday, over the holidays around New Year."""
+    for start in range(7):
+        begin = date(2026, 12, 21) + timedelta(days=start)
+        for length in range(36):
+            end = begin + timedelta(days=length)
+            expected = count_day_by_day(begin, end, country_code)
+            assert busday_count(begin, end, country_code) == expected
+            assert busday_count(end, begin, country_code) == -expected
@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.models import Desk, Room, User
+from app.middlewares.db_middleware import LazySession, SessionReleaseMiddleware, current_session
+
+from tests.unit.conftest import DESK_A1, holds_connection
+
+
+async def room_a_name(session_pool: async_sessionmaker[AsyncSession]) -> str:
+    async with session_pool() as session:
+        return await session.scalar(select(Room.name).where(Room.id == 1))
+
+
+@pytest.mark.asyncio
+async def test_release_rolls_back_read_only_transaction(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """A read-only transaction is ended, and the loaded objects stay readable."""
+    session = LazySession(session_pool)
+    user = await session.get(User, 1)
+    assert holds_connection(session)
+
+    await session.release()
+
+    assert not holds_connection(session)
+    assert user.telegram_name == "user1"
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_loaded_objects_stay_in_the_session(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """The objects a handler loaded before a Telegram call still lazy load and have their changes committed."""
+    session = LazySession(session_pool)
+    desk = await session.get(Desk, DESK_A1)
+
+    await session.release()
+
+    assert inspect(desk).persistent
+    assert await session.run_sync(lambda _: desk.room.name) == "Room A"
+    desk.name = "A-10"
+    await session.commit()
+    await session.close()
+    async with session_pool() as new_session:
+        assert await new_session.scalar(select(Desk.name).where(Desk.id == DESK_A1)) == "A-10"
+
+
+async def execute_update(session: LazySession) -> None:
+    await session.execute(update(Room).where(Room.id == 1).values(name="Room X"))
+
+
+async def flush_insert(session: LazySession) -> None:
+    session.add(Room(name="Room X"))
+    await session.flush()
+
+
+@pytest.mark.parametrize("write", [execute_update, flush_insert])
+@pytest.mark.asyncio
+async def test_release_keeps_transaction_with_writes(session_pool: async_sessionmaker[AsyncSession], office, write) -> None:
+    """A transaction that has written is neither committed nor rolled back on the handler's behalf."""
+    session = LazySession(session_pool)
+    await write(session)
+
+    await session.release()
+
+    assert session.in_transaction()
+    await session.rollback()
+    await session.close()
+    assert await room_a_name(session_pool) == "Room A"
+
+
+@pytest.mark.asyncio
+async def test_release_keeps_pending_changes(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """Changes not flushed yet keep the transaction open too."""
+    session = LazySession(session_pool)
+    room = await session.get(Room, 1)
+    room.name = "Room X"
+
+    await session.release()
+
+    assert session.in_transaction()
+    assert room in session.dirty
+    await session.close()
+    assert await room_a_name(session_pool) == "Room A"
+
+
+@pytest.mark.asyncio
+async def test_release_after_commit(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """The writes committed by the handler don't keep the next read-only transaction open."""
+    session = LazySession(session_pool)
+    await session.execute(update(Room).where(Room.id == 1).values(name="Room X"))
+    await session.commit()
+    await session.get(User, 1)
+
+    await session.release()
+
+    assert not holds_connection(session)
+    assert session.wrote
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_middleware_releases_current_session(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    session = LazySession(session_pool)
+    await session.get(User, 1)
+    holding = []
+
+    async def make_request(bot, method):
+        holding.append(holds_connection(session))
+
+    token = current_session.set(session)
+    try:
+        await SessionReleaseMiddleware()(make_request, None, None)
+    finally:
+        current_session.reset(token)
+        await session.close()
+    assert holding == [False]
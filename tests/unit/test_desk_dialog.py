@@ -0,0 +1,69 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.enums.weekdays import Weekday
+from app.database.models import Booking, DeskAssignment, User
+from app.dialogs.desk import handlers
+from app.services.common.business_days import local_today
+from app.states.states import Desk
+
+from tests.unit.conftest import DESK_A1
+
+
+TIMEZONE = "Pacific/Kiritimati" # UTC+14, a day ahead of the server for most of the day
+
+
+class FakeBot:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        await asyncio.sleep(0)
+        self.calls.append(("send_message", chat_id, text))
+
+
+class FakeDialogManager:
+    def __init__(self, session: AsyncSession, calls: list) -> None:
+        i18n = SimpleNamespace(desk=SimpleNamespace(assignment=SimpleNamespace(booking=SimpleNamespace(
+            cancelled=lambda date: f"cancelled {date}"))))
+        self.middleware_data = {"session": session, "i18n": i18n}
+        self.start_data = {"bot_operation_config": {"timezone": TIMEZONE, "date_format": "%Y-%m-%d"}}
+        self.calls = calls
+
+    async def switch_to(self, state) -> None:
+        self.calls.append(("switch_to", state))
+
+
+@pytest.mark.asyncio
+async def test_back_to_office_clears_bookings_and_notifies_after_switching(
+    session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """
+    Coming back to the office frees the assigned desk from today in the bot's timezone on, and the colleagues
+    are notified in the background, after the user has been switched to the main menu.
+    """
+    today = local_today(TIMEZONE)
+    days = [today - timedelta(days=1), today, today + timedelta(days=1)]
+    async with session_pool() as session:
+        await session.execute(insert(DeskAssignment), [
+            {"telegram_id": 1, "desk_id": DESK_A1, "weekday": Weekday(day.weekday())} for day in days])
+        await session.execute(insert(Booking), [{"telegram_id": 2, "desk_id": DESK_A1, "date": day} for day in days])
+        await session.execute(User.__table__.update().where(User.telegram_id == 1).values(is_out_of_office=True))
+        await session.commit()
+
+    calls = []
+    async with session_pool() as session:
+        query = SimpleNamespace(from_user=SimpleNamespace(id=1), bot=FakeBot(calls))
+        await handlers.toggle_is_out_of_office_status(query, None, FakeDialogManager(session, calls))
+        assert calls == [("switch_to", Desk.main_menu)]
+        await asyncio.gather(*handlers._notification_tasks)
+
+        remaining = (await session.execute(select(Booking.date))).scalars().all()
+
+    assert remaining == [days[0]]
+    assert sorted(calls[1:]) == [("send_message", 2, f"cancelled {day.isoformat()}") for day in days[1:]]
+    assert not handlers._notification_tasks
@@ -0,0 +1,122 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import fan_out as fan_out_module
+from app.database.engine import create_db, get_engine, get_session_pool
+from app.database.fan_out import fan_out
+from app.database.models import Room, User
+from app.middlewares.db_middleware import LazySession
+
+from tests.unit.conftest import holds_connection
+
+
+@pytest.fixture
+def concurrent(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Runs the reads on their own sessions on SQLite too (a file database is shared by its connections)."""
+    monkeypatch.setattr(fan_out_module, "SEQUENTIAL_DIALECTS", set())
+
+
+async def count_users(session: AsyncSession) -> int:
+    return len((await session.execute(select(User.telegram_id))).all())
+
+
+@pytest.mark.asyncio
+async def test_reads_run_on_the_session_on_sqlite(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    async with session_pool() as session:
+        sessions = []
+
+        async def read(s: AsyncSession) -> int:
+            sessions.append(s)
+            return await count_users(s)
+
+        assert await fan_out(session, read, read) == [3, 3]
+        assert sessions == [session, session]
+
+
+@pytest.mark.asyncio
+async def test_reads_run_on_their_own_sessions(
+    session_pool: async_sessionmaker[AsyncSession], office, concurrent) -> None:
+    """Every read gets its own session, and the caller's read-only transaction is ended before they start."""
+    async with session_pool() as session:
+        await count_users(session)
+        assert session.in_transaction()
+        sessions = []
+
+        async def read(s: AsyncSession) -> int:
+            sessions.append(s)
+            assert not holds_connection(session)
+            return await count_users(s)
+
+        assert await fan_out(session, read, read, read) == [3, 3, 3]
+        assert len(set(map(id, sessions))) == 3
+        assert session not in sessions
+
+
+@pytest.mark.asyncio
+async def test_update_session(session_pool: async_sessionmaker[AsyncSession], office, concurrent) -> None:
+    """The list generators pass the update's LazySession, whose loaded objects stay usable after the reads."""
+    session = LazySession(session_pool)
+    user = await session.get(User, 1)
+
+    assert await fan_out(session, count_users, count_users) == [3, 3]
+    assert not holds_connection(session)
+    assert user.telegram_name == "user1"
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_transaction_with_writes_is_kept(
+    session_pool: async_sessionmaker[AsyncSession], office, concurrent) -> None:
+    async with session_pool() as session:
+        await session.execute(update(Room).where(Room.id == 1).values(plan="plan.png"))
+        await fan_out(session, count_users, count_users)
+
+        assert session.in_transaction()
+        await session.commit()
+        assert await session.scalar(select(Room.plan).where(Room.id == 1)) == "plan.png"
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_after_all_reads_finish(
+    session_pool: async_sessionmaker[AsyncSession], office, concurrent) -> None:
+    finished = []
+
+    async def failing(s: AsyncSession) -> None:
+        raise ValueError("read failed")
+
+    async def slow(s: AsyncSession) -> int:
+        await asyncio.sleep(0.05)
+        users = await count_users(s)
+        finished.append(users)
+        return users
+
+    async with session_pool() as session:
+        with pytest.raises(ValueError, match="read failed"):
+            await fan_out(session, failing, slow, slow)
+    assert finished == [3, 3]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_are_capped(tmp_path: Path, concurrent) -> None:
+    """The reads of all fan-outs on an engine use at most POOL_SHARE of its pool."""
+    engine = get_engine(db_url=f"sqlite+aiosqlite:///{tmp_path / 'capped.db'}", pool_size=4, name="unit")
+    await create_db(engine)
+    running, peak = 0, 0
+
+    async def read(s: AsyncSession) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        await count_users(s)
+        running -= 1
+
+    session_pool = get_session_pool(engine)
+    async with session_pool() as first, session_pool() as second:
+        await asyncio.gather(fan_out(first, read, read, read), fan_out(second, read, read, read))
+    await engine.dispose()
+    assert peak == 2
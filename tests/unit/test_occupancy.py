@@ -0,0 +1,126 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.models import Room
+from app.database.occupancy import OccupancyMatrix, occupancy_matrix
+from app.database.orm_queries import (
+    DeskBookerError,
+    orm_delete_booking_by_id,
+    orm_delete_desk_by_id,
+    orm_delete_user_by_telegram_id,
+    orm_delete_user_by_telegram_name,
+    orm_insert_booking_on_conflict_do_nothing,
+    orm_insert_desk_with_room_id,
+    orm_insert_room,
+    orm_update_desk_availability_by_name,
+    orm_update_desk_name_by_name,
+    orm_update_room_availability_by_name,
+)
+from app.services.common.business_days import local_today
+
+from tests.unit.conftest import DESK_A1, DESK_A3, DESK_B1, next_workday
+
+
+TIMEZONE = "Pacific/Kiritimati" # UTC+14, a day ahead of the server for most of the day
+
+
+@pytest_asyncio.fixture
+async def matrix(office, session_pool: async_sessionmaker[AsyncSession]) -> OccupancyMatrix:
+    """The process-wide matrix used by the ORM writes, loaded from the office."""
+    occupancy_matrix.configure(num_days=5, timezone=TIMEZONE)
+    async with session_pool() as session:
+        await occupancy_matrix.refresh_if_stale(session)
+    yield occupancy_matrix
+    occupancy_matrix.enabled = False
+    occupancy_matrix.invalidate()
+
+
+def bookable_desks(matrix: OccupancyMatrix, room_name: str, booking_date) -> list:
+    return matrix.select_room_plan_and_bookable_desks(room_name, booking_date)[2]
+
+
+@pytest.mark.asyncio
+async def test_load(matrix: OccupancyMatrix) -> None:
+    """Only the available desks of the available rooms are bookable, starting from today in the timezone."""
+    today = local_today(TIMEZONE)
+    booking_date = next_workday(today)
+
+    assert matrix.covers(today)
+    assert not matrix.covers(today.replace(year=today.year - 1))
+    assert bookable_desks(matrix, "Room A", booking_date) == ["A-1", "A-2"]
+    assert bookable_desks(matrix, "Room B", booking_date) == []
+    assert matrix.select_room_plan_and_bookable_desks("Room C", booking_date) == (False, None, [])
+    assert matrix.select_random_bookable_desk(booking_date, room_id=2) is None
+
+
+@pytest.mark.asyncio
+async def test_mark_booked_and_cancelled(matrix: OccupancyMatrix, session_pool: async_sessionmaker[AsyncSession]) -> None:
+    """Bookings and cancellations update the loaded matrix without a reload."""
+    booking_date = next_workday(local_today(TIMEZONE))
+    async with session_pool() as session:
+        booking_id = await orm_insert_booking_on_conflict_do_nothing(session, 1, booking_date, desk_id=DESK_A1)
+    assert not matrix._is_stale()
+    assert bookable_desks(matrix, "Room A", booking_date) == ["A-2"]
+    assert bookable_desks(matrix, "Room A", next_workday(booking_date)) == ["A-1", "A-2"]
+
+    async with session_pool() as session:
+        await orm_delete_booking_by_id(session, booking_id)
+    assert not matrix._is_stale()
+    assert bookable_desks(matrix, "Room A", booking_date) == ["A-1", "A-2"]
+
+
+@pytest.mark.parametrize("write", [
+    lambda session: orm_update_desk_availability_by_name(session, "A-1", False),
+    lambda session: orm_update_desk_name_by_name(session, "A-1", "A-10"),
+    lambda session: orm_delete_desk_by_id(session, DESK_A1),
+    lambda session: orm_update_room_availability_by_name(session, "Room A", False),
+])
+@pytest.mark.asyncio
+async def test_admin_writes_invalidate(matrix: OccupancyMatrix, session_pool: async_sessionmaker[AsyncSession], write) -> None:
+    """The admin writes to desks and rooms make the matrix reload, so A-1 is no longer offered under its old state."""
+    booking_date = next_workday(local_today(TIMEZONE))
+    async with session_pool() as session:
+        await write(session)
+        assert matrix._is_stale()
+        await matrix.refresh_if_stale(session)
+    assert "A-1" not in bookable_desks(matrix, "Room A", booking_date)
+
+
+@pytest.mark.parametrize("delete_user", [
+    lambda session: orm_delete_user_by_telegram_id(session, 1),
+    lambda session: orm_delete_user_by_telegram_name(session, "user1"),
+])
+@pytest.mark.asyncio
+async def test_user_deletion_frees_the_desks(
+    matrix: OccupancyMatrix, session_pool: async_sessionmaker[AsyncSession], delete_user) -> None:
+    """The bookings deleted by cascade with the user are not kept as booked in the matrix."""
+    booking_date = next_workday(local_today(TIMEZONE))
+    async with session_pool() as session:
+        await orm_insert_booking_on_conflict_do_nothing(session, 1, booking_date, desk_id=DESK_A1)
+        await delete_user(session)
+        assert matrix._is_stale()
+        await matrix.refresh_if_stale(session)
+    assert bookable_desks(matrix, "Room A", booking_date) == ["A-1", "A-2"]
+
+
+@pytest.mark.asyncio
+async def test_new_rooms_and_desks(matrix: OccupancyMatrix, session_pool: async_sessionmaker[AsyncSession]) -> None:
+    """A room and a desk added by the admin can be booked without waiting for the refresh interval."""
+    booking_date = next_workday(local_today(TIMEZONE))
+    async with session_pool() as session:
+        await orm_insert_room(session, "Room C")
+        room_id = await session.scalar(select(Room.id).where(Room.name == "Room C"))
+        await orm_insert_desk_with_room_id(session, room_id, "C-1")
+        await matrix.refresh_if_stale(session)
+    assert bookable_desks(matrix, "Room C", booking_date) == ["C-1"]
+
+
+@pytest.mark.parametrize("desk_id", [DESK_A3, DESK_B1])
+@pytest.mark.asyncio
+async def test_insert_booking_rejects_unavailable_desks(session_pool: async_sessionmaker[AsyncSession], office, desk_id: int) -> None:
+    """A desk that is not available, or is in a room that is not available, can't be booked."""
+    async with session_pool() as session:
+        with pytest.raises(DeskBookerError, match="not available"):
+            await orm_insert_booking_on_conflict_do_nothing(session, 1, next_workday(local_today()), desk_id=desk_id)
@@ -0,0 +1,151 @@
+import asyncio
+import socket
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.engine import create_db, get_engine
+from app.database.models import Room
+from app.database.replicas import ReplicaRouter, get_routing_session_pool, replica_router
+from app.database.view_cache import source_of, view_cache
+from app.middlewares.db_middleware import DataBaseSession, LazyReadSession
+
+
+WINDOW = 0.2
+USER = SimpleNamespace(id=1)
+
+
+@pytest_asyncio.fixture
+async def replica(tmp_path: Path, engine: AsyncEngine) -> AsyncEngine:
+    """A second database standing in for a replica, told apart from the primary by its room's name."""
+    replica = get_engine(db_url=f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", name="unit-replica")
+    await create_db(replica)
+    for db, name in ((engine, "Primary"), (replica, "Replica")):
+        async with db.begin() as conn:
+            await conn.execute(insert(Room).values(id=1, name=name))
+    yield replica
+    await replica.dispose()
+
+
+@pytest.fixture
+def router(replica: AsyncEngine) -> ReplicaRouter:
+    replica_router.configure([replica], window=WINDOW)
+    yield replica_router
+    replica_router.engines = []
+    replica_router.session_pools = []
+    replica_router.redis = None
+    replica_router._writers.clear()
+
+
+async def room_name(session) -> str:
+    return await session.scalar(select(Room.name).where(Room.id == 1))
+
+
+async def handle_update(session_pool: async_sessionmaker[AsyncSession], handler):
+    """Runs the handler like the dispatcher does, with the sessions of DataBaseSession."""
+    return await DataBaseSession(session_pool=session_pool)(handler, None, {"event_from_user": USER})
+
+
+def closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window(session_pool: async_sessionmaker[AsyncSession], router: ReplicaRouter) -> None:
+    """The reads go to the replica until the user writes, then to the primary for the window."""
+    async def read(event, data) -> str:
+        return await room_name(data["read_session"])
+
+    async def write(event, data) -> None:
+        await data["session"].execute(update(Room).where(Room.id == 1).values(plan="plan.png"))
+        await data["session"].commit()
+
+    assert await handle_update(session_pool, read) == "Replica"
+    await handle_update(session_pool, write)
+    assert await router.wrote_recently(USER.id)
+    assert await handle_update(session_pool, read) == "Primary"
+
+    await asyncio.sleep(WINDOW * 1.5)
+    assert not await router.wrote_recently(USER.id)
+    assert await handle_update(session_pool, read) == "Replica"
+
+
+@pytest.mark.asyncio
+async def test_read_session_falls_back_after_a_write(session_pool: async_sessionmaker[AsyncSession], router: ReplicaRouter) -> None:
+    """Within one update, the reads after a write go to the primary, even before the commit."""
+    async def handler(event, data) -> list:
+        read_session = data["read_session"]
+        assert isinstance(read_session, LazyReadSession)
+        names = [await room_name(read_session)]
+        await data["session"].execute(update(Room).where(Room.id == 1).values(name="Updated"))
+        names.append(await room_name(read_session))
+        await data["session"].commit()
+        return names
+
+    assert await handle_update(session_pool, handler) == ["Replica", "Updated"]
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_the_primary(session_pool: async_sessionmaker[AsyncSession], router: ReplicaRouter) -> None:
+    """Without the shared record of the recent writers, every read goes to the primary."""
+    router.redis = Redis(host="127.0.0.1", port=closed_port(), retry=Retry(NoBackoff(), 0))
+    try:
+        await router.mark_write(2) # Logged, not raised
+        assert await router.wrote_recently(USER.id)
+
+        async def read(event, data) -> str:
+            return await room_name(data["read_session"])
+
+        assert await handle_update(session_pool, read) == "Primary"
+    finally:
+        await router.redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_routing_session_get_bind(engine: AsyncEngine, router: ReplicaRouter) -> None:
+    """sqladmin's sessions read from the replica and write to the primary, then read from the primary for the window."""
+    routing_session_pool = get_routing_session_pool(engine)
+    async with routing_session_pool() as session:
+        assert await room_name(session) == "Replica"
+        assert session.sync_session.get_bind(clause=select(Room)) is router.engines[0].sync_engine
+
+        room = Room(name="New")
+        session.add(room)
+        await session.commit() # The flush goes to the primary
+        assert await session.scalar(select(Room.name).where(Room.id == room.id)) == "New"
+        assert await room_name(session) == "Primary"
+
+        await asyncio.sleep(WINDOW * 1.5)
+        assert await room_name(session) == "Replica"
+        assert session.sync_session.get_bind(clause=update(Room).values(name="X")) is engine.sync_engine
+
+
+@pytest.mark.asyncio
+async def test_views_rendered_on_a_lagging_replica(session_pool: async_sessionmaker[AsyncSession], router: ReplicaRouter) -> None:
+    """A view rendered from the replica after a write is not served to the writer, whose reads go to the primary."""
+    view_cache.configure()
+    try:
+        async def read(event, data) -> str:
+            read_session = data["read_session"]
+            return await view_cache.get_or_render(("room", source_of(read_session)), lambda: room_name(read_session))
+
+        await router.mark_write(USER.id)
+        await view_cache.bump_version()
+        # Another user renders the view from the replica, which has not caught up with the write
+        other = SimpleNamespace(id=2)
+        assert await DataBaseSession(session_pool=session_pool)(read, None, {"event_from_user": other}) == "Replica"
+
+        assert await handle_update(session_pool, read) == "Primary"
+        assert await DataBaseSession(session_pool=session_pool)(read, None, {"event_from_user": other}) == "Replica"
+    finally:
+        view_cache.enabled = False
+        view_cache._entries.clear()
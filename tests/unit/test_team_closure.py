@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.models import Team, TeamClosure, TeamTree
+from app.database.orm_queries import orm_rebuild_team_closure
+from app.database.team_closure import TeamTreeCycleError, team_closure_statements
+
+from tests.unit.conftest import ROOM_A
+
+
+async def add_teams(session: AsyncSession, count: int) -> None:
+    session.add_all([Team(id=i, name=f"Team {i}", room_id=ROOM_A) for i in range(1, count + 1)])
+    await session.commit()
+
+
+async def add_edges(session: AsyncSession, *edges) -> None:
+    session.add_all([TeamTree(parent_team_id=parent, child_team_id=child) for parent, child in edges])
+    await session.commit()
+
+
+async def closure(session: AsyncSession) -> set:
+    result = await session.execute(
+        select(TeamClosure.ancestor_team_id, TeamClosure.descendant_team_id, TeamClosure.depth)
+        .where(TeamClosure.ancestor_team_id != TeamClosure.descendant_team_id))
+    return {tuple(row) for row in result.all()}
+
+
+@pytest.mark.asyncio
+async def test_closure_follows_orm_writes(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """The closure is rebuilt on every flush that writes teams or team_tree, with the shortest depths."""
+    async with session_pool() as session:
+        await add_teams(session, 4)
+        assert await closure(session) == set()
+        assert len((await session.execute(select(TeamClosure))).all()) == 4 # Every team is its own ancestor
+
+        # 1 -> 2 -> 3 -> 4 and a shortcut 1 -> 3
+        await add_edges(session, (1, 2), (2, 3), (3, 4), (1, 3))
+        assert await closure(session) == {(1, 2, 1), (1, 3, 1), (1, 4, 2), (2, 3, 1), (2, 4, 2), (3, 4, 1)}
+
+        await session.delete(await session.get(TeamTree, (2, 3)))
+        await session.commit()
+        assert await closure(session) == {(1, 2, 1), (1, 3, 1), (1, 4, 2), (3, 4, 1)}
+
+        await session.delete(await session.get(TeamTree, (1, 3)))
+        await session.commit()
+        assert await closure(session) == {(1, 2, 1), (3, 4, 1)}
+
+
+@pytest.mark.asyncio
+async def test_team_renames_keep_the_closure(
+    engine: AsyncEngine, session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    """Only the flushes that change the tree rebuild the closure."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    async with session_pool() as session:
+        await add_teams(session, 2)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            team = await session.get(Team, 1)
+            team.name = "Renamed"
+            await session.commit()
+            assert not any("team_closure" in statement for statement in statements)
+
+            await add_edges(session, (1, 2))
+            assert any(statement.startswith("DELETE FROM team_closure") for statement in statements)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        assert await closure(session) == {(1, 2, 1)}
+
+
+def test_rebuild_locks_the_closure_on_postgres() -> None:
+    """Concurrent rebuilds on PostgreSQL wait for each other instead of inserting the same primary keys."""
+    assert str(team_closure_statements("postgresql")[0]) == "LOCK TABLE team_closure IN EXCLUSIVE MODE"
+    assert len(team_closure_statements("sqlite")) == 2
+
+
+@pytest.mark.parametrize("edge, message", [
+    ((3, 1), "Team 1 cannot be a sub-team of team 3"),
+    ((2, 1), "Team 1 cannot be a sub-team of team 2"),
+    ((3, 3), "Team 3 cannot be a sub-team of team 3"),
+])
+@pytest.mark.asyncio
+async def test_cycle_is_rejected(session_pool: async_sessionmaker[AsyncSession], office, edge, message: str) -> None:
+    """An edge closing a cycle is rejected, naming that edge, and nothing of the flush is written."""
+    async with session_pool() as session:
+        await add_teams(session, 3)
+        await add_edges(session, (1, 2), (2, 3))
+
+        with pytest.raises(TeamTreeCycleError, match=message):
+            await add_edges(session, edge)
+        await session.rollback()
+
+        assert len((await session.execute(select(TeamTree))).all()) == 2
+        assert await closure(session) == {(1, 2, 1), (1, 3, 2), (2, 3, 1)}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_after_core_writes(session_pool: async_sessionmaker[AsyncSession], office) -> None:
+    async with session_pool() as session:
+        await add_teams(session, 3)
+        await session.execute(insert(TeamTree), [
+            {"parent_team_id": 1, "child_team_id": 2}, {"parent_team_id": 2, "child_team_id": 3}])
+        await session.commit()
+        assert await closure(session) == set() # Core inserts bypass the flush
+
+        await orm_rebuild_team_closure(session)
+        assert await closure(session) == {(1, 2, 1), (1, 3, 2), (2, 3, 1)}
+
+        await session.execute(insert(TeamTree).values(parent_team_id=3, child_team_id=1))
+        await session.commit()
+        with pytest.raises(TeamTreeCycleError, match="cycle"):
+            await orm_rebuild_team_closure(session)
+
+        await session.execute(delete(TeamTree).where(TeamTree.parent_team_id == 3))
+        await session.commit()
+        await orm_rebuild_team_closure(session)
+        assert await closure(session) == {(1, 2, 1), (1, 3, 2), (2, 3, 1)}
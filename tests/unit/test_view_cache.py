@@ -0,0 +1,53 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.orm_queries import (
+    orm_delete_desk_by_id,
+    orm_delete_room_by_name,
+    orm_update_desk_availability_by_name,
+    orm_update_desk_name_by_id,
+    orm_update_desk_name_by_name,
+    orm_update_room_availability_by_name,
+    orm_update_room_name_by_name,
+)
+from app.database.view_cache import ViewCache, view_cache
+
+from tests.unit.conftest import DESK_A1
+
+
+@pytest_asyncio.fixture
+async def cache() -> ViewCache:
+    view_cache.configure()
+    yield view_cache
+    view_cache.enabled = False
+    view_cache._entries.clear()
+
+
+@pytest.mark.parametrize("write", [
+    lambda session: orm_update_room_name_by_name(session, "Room A", "Room X"),
+    lambda session: orm_delete_room_by_name(session, "Room A"),
+    lambda session: orm_update_room_availability_by_name(session, "Room A", False),
+    lambda session: orm_update_desk_name_by_id(session, DESK_A1, "A-10"),
+    lambda session: orm_update_desk_name_by_name(session, "A-1", "A-10"),
+    lambda session: orm_update_desk_availability_by_name(session, "A-1", False),
+    lambda session: orm_delete_desk_by_id(session, DESK_A1),
+])
+@pytest.mark.asyncio
+async def test_room_and_desk_writes_invalidate_views(
+    cache: ViewCache, session_pool: async_sessionmaker[AsyncSession], office, write) -> None:
+    """A rendered bookings list mentioning the old room or desk is rendered again after the write."""
+    renders = []
+
+    async def render() -> str:
+        renders.append(1)
+        return "Room A, A-1"
+
+    await cache.get_or_render(("all_bookings",), render)
+    await cache.get_or_render(("all_bookings",), render)
+    assert len(renders) == 1
+
+    async with session_pool() as session:
+        await write(session)
+    await cache.get_or_render(("all_bookings",), render)
+    assert len(renders) == 2